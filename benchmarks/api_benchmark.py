@@ -0,0 +1,186 @@
+"""
+Throughput and latency of every method of UserAPI, GuestAPI and VendorAPI, measured against the local StubServer.
+
+    python benchmarks/api_benchmark.py --calls 500 --threads 8 --latency 0.005
+    python benchmarks/api_benchmark.py --only guest --fixtures recorded/ --json results.json
+
+The server runs in the same process by default, so it shares the GIL with the client:
+start it with "python -m fivesim.testing.stub_server" and pass --base-url to measure only the client.
+"""
+import argparse
+import json
+import threading
+import time
+from benchmark_stats import percentile
+from concurrent.futures import ThreadPoolExecutor
+from fivesim import (
+    ActivationProduct,
+    Category,
+    Country,
+    ErrorType,
+    FiveSim,
+    FiveSimError,
+    Language,
+    Operator,
+    Order,
+    OrderAction,
+    VendorPaymentMethod,
+    VendorPaymentSystem
+)
+from fivesim.testing import StubServer
+from typing import Any, Callable, NamedTuple
+
+
+class Case(NamedTuple):
+    name: str
+    # Called once for every measured call, with the value prepared for it
+    call: Callable[[FiveSim, Any], Any]
+    # Prepares the values of the calls before the measure, like the orders to finish
+    prepare: Callable[[FiveSim, int], list] = lambda client, calls: [None] * calls
+
+
+def _buy(client: FiveSim, calls: int) -> list[Order]:
+    orders: list[Order] = []
+    while len(orders) < calls:
+        try:
+            orders.append(client.user.buy_number(Country.ENGLAND, Operator.ANY_OPERATOR, ActivationProduct.TELEGRAM))
+        except FiveSimError:
+            # Injected by the server
+            pass
+    return orders
+
+
+def _buy_batches(client: FiveSim, calls: int) -> list[list[Order]]:
+    orders = _buy(client, calls * 10)
+    return [orders[index:index + 10] for index in range(0, len(orders), 10)]
+
+
+CASES = [
+    Case("user.get_profile_data", lambda client, _: client.user.get_profile_data()),
+    Case("user.get_profile_data(vendor)", lambda client, _: client.user.get_profile_data(vendor=True)),
+    Case("user.get_orders_history", lambda client, _: client.user.get_orders_history(Category.ACTIVATION)),
+    Case("user.get_orders_history(lazy)", lambda client, _: client.user.get_orders_history(Category.ACTIVATION, lazy=True)),
+    Case("user.get_payments_history", lambda client, _: client.user.get_payments_history()),
+    Case("user.iter_orders(5 per page)", lambda client, _: list(client.user.iter_orders(Category.ACTIVATION, results_per_page=5))),
+    Case("user.export_orders(5 per page)", lambda client, _: client.user.export_orders(Category.ACTIVATION, results_per_page=5)),
+    Case("user.buy_number", lambda client, _: client.user.buy_number(Country.ENGLAND, Operator.ANY_OPERATOR, ActivationProduct.TELEGRAM)),
+    Case("user.reuse_number", lambda client, _: client.user.reuse_number(ActivationProduct.TELEGRAM, "447000000001")),
+    Case("user.order(check)", lambda client, order: client.user.order(OrderAction.CHECK, order), _buy),
+    Case("user.order(finish)", lambda client, order: client.user.order(OrderAction.FINISH, order), _buy),
+    Case("user.order(cancel)", lambda client, order: client.user.order(OrderAction.CANCEL, order), _buy),
+    Case("user.order(ban)", lambda client, order: client.user.order(OrderAction.BAN, order), _buy),
+    Case("user.get_sms_inbox_list", lambda client, order: client.user.get_sms_inbox_list(order), _buy),
+    Case("user.buy_many(10)", lambda client, _: client.user.buy_many(ActivationProduct.TELEGRAM, 10)),
+    Case("user.order_many(check, 10)", lambda client, orders: client.user.order_many(OrderAction.CHECK, orders), _buy_batches),
+    Case("guest.get_products", lambda client, _: client.guest.get_products(Country.ENGLAND, Operator.ANY_OPERATOR)),
+    Case("guest.get_prices", lambda client, _: client.guest.get_prices()),
+    Case("guest.get_prices(country)", lambda client, _: client.guest.get_prices(country=Country.ENGLAND)),
+    Case("guest.get_prices(product)", lambda client, _: client.guest.get_prices(product=ActivationProduct.TELEGRAM)),
+    Case("guest.get_price_matrix", lambda client, _: client.guest.get_price_matrix()),
+    Case("guest.get_notification", lambda client, _: client.guest.get_notification(Language.ENGLISH)),
+    Case("guest.get_countries", lambda client, _: client.guest.get_countries()),
+    Case("vendor.get_wallets_reserve", lambda client, _: client.vendor.get_wallets_reserve()),
+    Case("vendor.get_orders_history", lambda client, _: client.vendor.get_orders_history(Category.ACTIVATION)),
+    Case("vendor.get_payments_history", lambda client, _: client.vendor.get_payments_history()),
+    Case("vendor.create_payout", lambda client, _: client.vendor.create_payout("4000000000000000", VendorPaymentMethod.VISA, 100, VendorPaymentSystem.FKWALLET))
+]
+
+
+def run_case(client: FiveSim, case: Case, calls: int, threads: int) -> dict[str, Any]:
+    """
+    Measure the calls of a case, sent by a pool of threads.
+
+    :return: Dictionary with calls, errors by type, throughput (calls per second), p50 and p99 (seconds)
+    """
+    values = case.prepare(client, calls)
+    latencies: list[float] = []
+    errors: dict[str, int] = dict()
+    lock = threading.Lock()
+
+    def measure(value: Any) -> None:
+        start = time.perf_counter()
+        try:
+            case.call(client, value)
+        except FiveSimError as e:
+            with lock:
+                errors[e.get_error().name] = errors.get(e.get_error().name, 0) + 1
+        with lock:
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        list(executor.map(measure, values))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return {
+        "name": case.name,
+        "calls": calls,
+        "errors": errors,
+        "throughput": calls / elapsed,
+        "p50": percentile(latencies, 50),
+        "p99": percentile(latencies, 99)
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark of the 5SIM API methods against a local stub server")
+    parser.add_argument("--calls", type=int, default=200, help="calls measured for every method")
+    parser.add_argument("--threads", type=int, default=4, help="threads sending the calls")
+    parser.add_argument("--only", default="", help="run only the methods whose name contains this text")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds every response of the server is delayed")
+    parser.add_argument("--jitter", type=float, default=0.0, help="maximum random seconds added to the latency")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="probability of a 429 response for the API key limit (API_KEY_LIMIT)")
+    parser.add_argument("--ip-limit", type=float, default=0.0, help="probability of a 503 response for the IP address limit (LIMIT_ERROR)")
+    parser.add_argument("--server-error", type=float, default=0.0, help="probability of a 500 internal error response (SERVER_ERROR)")
+    parser.add_argument("--no-free-phones", type=float, default=0.0, help="probability of no free phones for a purchase")
+    parser.add_argument("--fixtures", help="directory with the fixtures recorded by record_fixtures")
+    parser.add_argument("--base-url", help="URL of a stub server already running, like http://127.0.0.1:8080/v1/")
+    parser.add_argument("--json", metavar="FILE", help="also save the results as JSON")
+    args = parser.parse_args()
+
+    server = StubServer(
+        latency=args.latency,
+        jitter=args.jitter,
+        errors={
+            ErrorType.API_KEY_LIMIT: args.rate_limit,
+            ErrorType.LIMIT_ERROR: args.ip_limit,
+            ErrorType.SERVER_ERROR: args.server_error,
+            ErrorType.NO_FREE_PHONES: args.no_free_phones
+        },
+        retry_after=0.01,
+        fixtures=args.fixtures,
+        seed=0
+    ) if args.base_url is None else None
+    if server is not None:
+        server.start()
+    results: list[dict[str, Any]] = []
+    base_url = args.base_url if server is None else server.get_base_url()
+    with FiveSim("stub", pool_size=args.threads, base_url=base_url) as client:
+        print("{:<32} {:>7} {:>7} {:>10} {:>10} {:>10}".format("method", "calls", "errors", "calls/s", "p50 ms", "p99 ms"))
+        for case in CASES:
+            if args.only not in case.name:
+                continue
+            try:
+                result = run_case(client, case, args.calls, args.threads)
+            except ImportError as e:
+                # get_price_matrix without numpy
+                print("{:<32} skipped: {}".format(case.name, e))
+                continue
+            results.append(result)
+            print("{:<32} {:>7} {:>7} {:>10.1f} {:>10.3f} {:>10.3f}".format(
+                result["name"],
+                result["calls"],
+                sum(result["errors"].values()),
+                result["throughput"],
+                result["p50"] * 1000,
+                result["p99"] * 1000
+            ))
+    if server is not None:
+        server.close()
+    if args.json is not None:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
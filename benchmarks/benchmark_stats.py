@@ -0,0 +1,12 @@
+"""
+Statistics shared by the benchmarks, which import it from the directory of the script.
+"""
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """
+    :param values: Sorted values
+    :param percent: Percentile to get, from 0 to 100
+    :return: The value at the nearest rank
+    """
+    return values[min(len(values) - 1, max(0, round(percent / 100 * len(values) + 0.5) - 1))]
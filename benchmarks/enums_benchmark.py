@@ -0,0 +1,104 @@
+"""
+Micro-benchmarks of the conversion from the API values to the enum members: the frozen tables of enums.py and
+errors.py compared with the enum calls and the try/except they replaced.
+
+    python benchmarks/enums_benchmark.py --number 100000
+    python benchmarks/enums_benchmark.py --fixture recorded/guest/prices.json
+
+The catalogue case converts every country, product and operator key of the get_prices catalogue,
+the one of the StubServer when --fixture isn't used.
+"""
+import argparse
+import json
+import timeit
+from fivesim.enums import ActivationProduct, Country, Operator, Status, _ACTIVATION_PRODUCTS, _COUNTRIES, _OPERATORS
+from fivesim.errors import ErrorType
+from fivesim.testing.stub_server import _default_fixtures
+from typing import Any, Callable
+
+
+def legacy_contains(value: str) -> bool:
+    try:
+        ErrorType(value)
+    except:
+        return False
+    return True
+
+
+def legacy_from_status_string(status: str) -> Status:
+    try:
+        return Status[status]
+    except:
+        return Status.INVALID
+
+
+def legacy_index(catalogue: dict[str, dict[str, dict[str, Any]]]) -> int:
+    converted = 0
+    for country, products in catalogue.items():
+        try:
+            Country(country)
+        except ValueError:
+            continue
+        for product, operators in products.items():
+            try:
+                ActivationProduct(product)
+            except ValueError:
+                continue
+            for operator in operators:
+                try:
+                    Operator(operator)
+                    converted += 1
+                except ValueError:
+                    pass
+    return converted
+
+
+def table_index(catalogue: dict[str, dict[str, dict[str, Any]]]) -> int:
+    converted = 0
+    for country, products in catalogue.items():
+        if _COUNTRIES.get(country) is None:
+            continue
+        for product, operators in products.items():
+            if _ACTIVATION_PRODUCTS.get(product) is None:
+                continue
+            for operator in operators:
+                if _OPERATORS.get(operator) is not None:
+                    converted += 1
+    return converted
+
+
+def best(call: Callable[[], Any], number: int) -> float:
+    """
+    :return: Best time of a single call in microseconds
+    """
+    return min(timeit.repeat(call, number=number, repeat=5)) / number * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Enum lookup tables compared with enum calls")
+    parser.add_argument("--number", type=int, default=100_000, help="calls of every micro-benchmark")
+    parser.add_argument("--fixture", help="recorded guest/prices.json, the stub catalogue by default")
+    args = parser.parse_args()
+
+    if args.fixture is not None:
+        with open(args.fixture, "rb") as file:
+            catalogue = json.load(file)
+    else:
+        catalogue = _default_fixtures()["guest/prices"]
+
+    cases: list[tuple[str, Callable[[], Any], Callable[[], Any], int]] = [
+        ("ErrorType.contains hit", lambda: legacy_contains("no free phones"), lambda: ErrorType.contains("no free phones"), args.number),
+        ("ErrorType.contains miss", lambda: legacy_contains("ok"), lambda: ErrorType.contains("ok"), args.number),
+        ("Status.from_status_string hit", lambda: legacy_from_status_string("RECEIVED"), lambda: Status.from_status_string("RECEIVED"), args.number),
+        ("Status.from_status_string miss", lambda: legacy_from_status_string("UNKNOWN"), lambda: Status.from_status_string("UNKNOWN"), args.number),
+        ("price catalogue indexing", lambda: legacy_index(catalogue), lambda: table_index(catalogue), max(1, args.number // 10_000))
+    ]
+    print("{:<32} {:>14} {:>14} {:>8}".format("case", "enum call us", "table us", "speedup"))
+    for name, legacy, table, number in cases:
+        before = best(legacy, number)
+        after = best(table, number)
+        print("{:<32} {:>14.3f} {:>14.3f} {:>7.1f}x".format(name, before, after, before / after))
+
+
+if __name__ == "__main__":
+    main()
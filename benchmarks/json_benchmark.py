@@ -0,0 +1,71 @@
+"""
+Decode time of the response of every endpoint with every JSON backend installed, applying the same object hook
+used by the API method of that endpoint.
+
+    python benchmarks/json_benchmark.py --number 200
+    python benchmarks/json_benchmark.py --fixtures recorded/
+
+The built-in fixtures of the StubServer are used, replaced by the ones of --fixtures when they exist,
+record them with fivesim.testing.record_fixtures for numbers closer to production.
+"""
+import argparse
+import json
+import timeit
+from fivesim.json_backend import _BACKENDS
+from fivesim.json_response import (
+    _parse_guest_countries,
+    _parse_guest_prices_information,
+    _parse_guest_products,
+    _parse_order,
+    _parse_orders_history,
+    _parse_payments_history,
+    _parse_profile_data
+)
+from fivesim.testing.stub_server import _default_fixtures, _load_fixtures
+from typing import Any, Callable
+
+# Object hook of every fixture, None when the method reads the plain dictionary
+HOOKS: dict[str, Callable[[dict], Any] | None] = {
+    "guest/countries": _parse_guest_countries,
+    "guest/prices": _parse_guest_prices_information,
+    "guest/products": _parse_guest_products,
+    "guest/flash": None,
+    "user/profile": _parse_profile_data,
+    "user/vendor": _parse_profile_data,
+    "user/orders": _parse_orders_history,
+    "user/payments": _parse_payments_history,
+    "user/order": _parse_order,
+    "vendor/wallets": None,
+    "vendor/orders": _parse_orders_history,
+    "vendor/payments": _parse_payments_history
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Decode time of every endpoint with every JSON backend")
+    parser.add_argument("--number", type=int, default=200, help="decodes measured for every endpoint")
+    parser.add_argument("--fixtures", help="directory with the fixtures recorded by record_fixtures")
+    args = parser.parse_args()
+
+    fixtures = _default_fixtures()
+    if args.fixtures is not None:
+        fixtures.update(_load_fixtures(args.fixtures))
+    backends = []
+    for name, backend in _BACKENDS.items():
+        try:
+            backends.append((name, backend()))
+        except ImportError:
+            print("{} not installed, skipped".format(name))
+
+    print("{:<18} {:>10}".format("endpoint", "bytes") + "".join(" {:>12}".format(name + " us") for name, _ in backends))
+    for endpoint, hook in HOOKS.items():
+        body = json.dumps(fixtures[endpoint]).encode()
+        times = [
+            min(timeit.repeat(lambda: backend.loads(body, object_hook=hook), number=args.number, repeat=3)) / args.number * 1_000_000
+            for _, backend in backends
+        ]
+        print("{:<18} {:>10}".format(endpoint, len(body)) + "".join(" {:>12.1f}".format(elapsed) for elapsed in times))
+
+
+if __name__ == "__main__":
+    main()
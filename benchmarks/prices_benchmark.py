@@ -0,0 +1,110 @@
+"""
+Parse time and peak memory of the full get_prices catalogue: the current top-down parser
+compared with the object_hook that sniffed the level of every dictionary.
+
+    python benchmarks/prices_benchmark.py
+    python benchmarks/prices_benchmark.py --fixture recorded/guest/prices.json
+
+Without --fixture the catalogue of the StubServer is used, record the real one with
+fivesim.testing.record_fixtures for numbers closer to production.
+"""
+import argparse
+import json
+import time
+import tracemalloc
+from fivesim.enums import ActivationProduct, Category, Country, Operator
+from fivesim.json_response import _parse_guest_prices, _parse_guest_prices_information
+from fivesim.response import ProductInformation
+from fivesim.testing.stub_server import _default_fixtures
+from typing import Any, Callable
+
+
+def _legacy_hook(input: dict[str, Any]) -> Any:
+    # The object_hook used before the top-down parser, kept here as the reference
+    if len(input) > 0:
+        if "count" in input:
+            return ProductInformation(
+                category=Category.ACTIVATION,
+                quantity=input["count"],
+                price=input["cost"]
+            )
+
+        result = dict()
+        hasProductInformation = isinstance(
+            next(iter(input.values())), ProductInformation
+        )
+        if not hasProductInformation:
+            keyOfChildDictionary = next(
+                iter(next(iter(input.values())).keys())
+            )
+
+        for key, value in input.items():
+            try:
+                if hasProductInformation:
+                    result[Operator(key)] = value
+                elif isinstance(keyOfChildDictionary, Operator):
+                    try:
+                        result[Country(key)] = value
+                    except:
+                        result[ActivationProduct(key)] = value
+                elif isinstance(keyOfChildDictionary, Country):
+                    for key2, value2 in value.items():
+                        try:
+                            result[key2] = {ActivationProduct(key): value2}
+                        except:
+                            pass
+                elif isinstance(keyOfChildDictionary, ActivationProduct):
+                    result[Country(key)] = value
+                else:
+                    break
+            except:
+                pass
+        else:
+            return result
+    return input
+
+
+def legacy(body: bytes) -> Any:
+    return json.loads(body, object_hook=_legacy_hook)
+
+
+def top_down(body: bytes) -> Any:
+    return _parse_guest_prices(json.loads(body, object_hook=_parse_guest_prices_information), by_product=False)
+
+
+def measure(parse: Callable[[bytes], Any], body: bytes, repeat: int) -> tuple[float, float]:
+    """
+    :return: Best parse time in seconds and peak memory in MB
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parse(body)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    parse(body)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best, peak / 1024 / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Parse time and peak memory of the get_prices catalogue")
+    parser.add_argument("--fixture", help="recorded guest/prices.json, the stub catalogue by default")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.fixture is not None:
+        with open(args.fixture, "rb") as file:
+            body = file.read()
+    else:
+        body = json.dumps(_default_fixtures()["guest/prices"]).encode()
+    print("catalogue: {:.1f} MB".format(len(body) / 1024 / 1024))
+    print("{:<12} {:>10} {:>10}".format("parser", "time s", "peak MB"))
+    for name, parse in (("object_hook", legacy), ("top-down", top_down)):
+        elapsed, peak = measure(parse, body, args.repeat)
+        print("{:<12} {:>10.3f} {:>10.1f}".format(name, elapsed, peak))
+
+
+if __name__ == "__main__":
+    main()
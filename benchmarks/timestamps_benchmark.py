@@ -0,0 +1,83 @@
+"""
+Parse throughput of an orders history with every TimestampFormat, compared with dateutil.parser.isoparse
+that parsed every timestamp before the fromisoformat fast path.
+
+    python benchmarks/timestamps_benchmark.py --orders 10000
+
+Every order has its own created_at and an SMS, expires is shared by groups of orders like in the real history,
+so the memo of the timestamps is measured too. The memo is cleared before every run.
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from fivesim.enums import TimestampFormat
+from fivesim.json_response import _parse_orders_history
+from fivesim.testing.stub_server import _default_fixtures
+from fivesim.timestamps import _parse_datetime, _parse_epoch, _with_timestamp_format
+from functools import partial
+from typing import Any, Callable
+
+
+def _timestamp(value: datetime) -> str:
+    # Nanoseconds like the API
+    return value.strftime("%Y-%m-%dT%H:%M:%S.%f") + "123Z"
+
+
+def make_history(orders: int) -> bytes:
+    """
+    Build an orders history with the orders of the stub fixtures as template.
+    """
+    fixtures = _default_fixtures()
+    template = fixtures["user/orders"]["Data"][0]
+    start = datetime(2026, 1, 1, tzinfo=timezone.utc)
+    data: list[dict[str, Any]] = []
+    for index in range(orders):
+        created_at = start + timedelta(seconds=37 * index, microseconds=index)
+        data.append(dict(
+            template,
+            id=index + 1,
+            created_at=_timestamp(created_at),
+            expires=_timestamp(start + timedelta(minutes=20 * (index // 50))),
+            sms=[dict(fixtures["user/sms"], created_at=_timestamp(created_at + timedelta(seconds=30)), date=_timestamp(created_at + timedelta(seconds=30)))]
+        ))
+    return json.dumps({"Data": data, "ProductNames": [], "Statuses": [], "Total": orders}).encode()
+
+
+def measure(hook: Callable[[dict], Any], body: bytes, repeat: int) -> float:
+    """
+    :return: Best parse time in seconds
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        _parse_datetime.cache_clear()
+        _parse_epoch.cache_clear()
+        start = time.perf_counter()
+        json.loads(body, object_hook=hook)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Parse throughput of an orders history for every timestamp format")
+    parser.add_argument("--orders", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    import dateutil.parser
+    body = make_history(args.orders)
+    hooks = [
+        ("dateutil isoparse", partial(_parse_orders_history, parse_timestamp=dateutil.parser.isoparse)),
+        ("DATETIME", _with_timestamp_format(_parse_orders_history, TimestampFormat.DATETIME)),
+        ("EPOCH", _with_timestamp_format(_parse_orders_history, TimestampFormat.EPOCH)),
+        ("STRING", _with_timestamp_format(_parse_orders_history, TimestampFormat.STRING))
+    ]
+    print("history: {} orders, {:.1f} MB".format(args.orders, len(body) / 1024 / 1024))
+    print("{:<20} {:>10} {:>12}".format("timestamps", "time s", "orders/s"))
+    for name, hook in hooks:
+        elapsed = measure(hook, body, args.repeat)
+        print("{:<20} {:>10.3f} {:>12.0f}".format(name, elapsed, args.orders / elapsed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Per-call latency of order(CHECK) with the pooled keep-alive transport, compared with a new connection for every
+request, which is what the module-level requests.get did before the transport was shared.
+
+    python benchmarks/transport_benchmark.py --calls 500 --threads 4
+
+The stub server speaks plain HTTP: against the real API every new connection also pays the TLS handshake,
+so the difference is larger.
+"""
+import argparse
+import time
+from benchmark_stats import percentile
+from concurrent.futures import ThreadPoolExecutor
+from fivesim import ActivationProduct, Country, FiveSim, Operator, OrderAction
+from fivesim.testing import StubServer
+
+
+def measure(base_url: str, keep_alive: bool, calls: int, threads: int) -> tuple[float, float, float]:
+    """
+    :return: Calls per second, p50 and p99 latency in seconds
+    """
+    with FiveSim("stub", pool_size=threads, keep_alive=keep_alive, base_url=base_url) as client:
+        order = client.user.buy_number(Country.ENGLAND, Operator.ANY_OPERATOR, ActivationProduct.TELEGRAM)
+
+        def call(_: int) -> float:
+            start = time.perf_counter()
+            client.user.order(OrderAction.CHECK, order)
+            return time.perf_counter() - start
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            latencies = sorted(executor.map(call, range(calls)))
+        elapsed = time.perf_counter() - start
+    return calls / elapsed, percentile(latencies, 50), percentile(latencies, 99)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Latency of the pooled transport against a local stub server")
+    parser.add_argument("--calls", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=1)
+    args = parser.parse_args()
+
+    with StubServer() as server:
+        print("{:<24} {:>10} {:>10} {:>10}".format("transport", "calls/s", "p50 ms", "p99 ms"))
+        for name, keep_alive in (("pooled keep-alive", True), ("new connection", False)):
+            throughput, p50, p99 = measure(server.get_base_url(), keep_alive, args.calls, args.threads)
+            print("{:<24} {:>10.1f} {:>10.3f} {:>10.3f}".format(name, throughput, p50 * 1000, p99 * 1000))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,107 @@
-from .fivesim import FiveSim
-from .enums import *
-from .api import *
-from .errors import *
-from .response import *
+import importlib
+from typing import TYPE_CHECKING
+
+# The submodules are imported on first access (PEP 562), so that "import fivesim" doesn't load
+# requests, aiohttp and the large enums until they are used
+_MODULES = {
+    "fivesim": ("FiveSim",),
+    "async_fivesim": ("AsyncFiveSim",),
+    "enums": (
+        "OrderAction",
+        "Status",
+        "Language",
+        "TimestampFormat",
+        "Category",
+        "VendorPaymentMethod",
+        "VendorPaymentSystem",
+        "Operator",
+        "Country",
+        "HostingProduct",
+        "ActivationProduct"
+    ),
+    "api": ("UserAPI", "GuestAPI", "VendorAPI"),
+    "async_api": ("AsyncUserAPI", "AsyncGuestAPI", "AsyncVendorAPI"),
+    "errors": ("ErrorType", "FiveSimError"),
+    "response": (
+        "ProductInformation",
+        "PriceEntry",
+        "BulkPurchaseResult",
+        "CountryInformation",
+        "VendorWallet",
+        "ProfileInformation",
+        "Payment",
+        "PaymentsHistory",
+        "SMS",
+        "Order",
+        "OrdersHistory"
+    ),
+    "hooks": ("RequestHooks", "RequestInfo"),
+    "json_backend": ("JSONBackend", "OrjsonBackend", "UjsonBackend", "get_json_backend"),
+    "lazy_response": ("LazyOrder",),
+    "lifecycle": ("OrderManager",),
+    "registry": ("Symbol", "CountrySymbol", "OperatorSymbol", "ProductSymbol", "HostingProductSymbol", "get_symbols", "refresh_registry"),
+    "cache": ("ResponseCache",),
+    "disk_cache": ("DiskCache",),
+    "metrics": ("MetricsCollector",),
+    "rate_limit": ("FileRateLimiter", "RateLimiter", "RateLimiterStats"),
+    "retry": ("RetryPolicy",),
+    "routing": ("CheapestNumberRouter", "RoutingAttempt", "RoutingResult"),
+    "sync": ("HistorySync", "SyncCheckpoint"),
+    "waiter": ("SmsWaiter",)
+}
+_ATTRIBUTES = {name: module for module, names in _MODULES.items() for name in names}
+
+if TYPE_CHECKING:
+    from .fivesim import FiveSim
+    from .async_fivesim import AsyncFiveSim
+    from .enums import *
+    from .api import *
+    from .async_api import *
+    from .errors import *
+    from .response import *
+    from .hooks import RequestHooks, RequestInfo
+    from .json_backend import JSONBackend, OrjsonBackend, UjsonBackend, get_json_backend
+    from .lazy_response import LazyOrder
+    from .lifecycle import OrderManager
+    from .registry import Symbol, CountrySymbol, OperatorSymbol, ProductSymbol, HostingProductSymbol, get_symbols, refresh_registry
+    from .cache import ResponseCache
+    from .disk_cache import DiskCache
+    from .metrics import MetricsCollector
+    from .rate_limit import FileRateLimiter, RateLimiter, RateLimiterStats
+    from .retry import RetryPolicy
+    from .routing import CheapestNumberRouter, RoutingAttempt, RoutingResult
+    from .sync import HistorySync, SyncCheckpoint
+    from .waiter import SmsWaiter
+
+
+def __getattr__(name: str):
+    module = _ATTRIBUTES.get(name)
+    if module is None:
+        if not name.startswith("__"):
+            # A submodule, like fivesim.errors, which was an attribute once the package was imported
+            try:
+                return importlib.import_module("." + name, __name__)
+            except ModuleNotFoundError as e:
+                if e.name != __name__ + "." + name:
+                    raise
+        raise AttributeError("module " + repr(__name__) + " has no attribute " + repr(name))
+    value = getattr(importlib.import_module("." + module, __name__), name)
+    # Cached in the module, the next accesses don't call __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_ATTRIBUTES) | set(_MODULES))
+
 
 __all__ = [
     "FiveSim",
+    "AsyncFiveSim",
     "OrderAction",
     "Status",
     "Language",
+    "TimestampFormat",
     "Category",
     "VendorPaymentMethod",
     "VendorPaymentSystem",
@@ -19,9 +112,41 @@ __all__ = [
     "UserAPI",
     "GuestAPI",
     "VendorAPI",
+    "AsyncUserAPI",
+    "AsyncGuestAPI",
+    "AsyncVendorAPI",
     "ErrorType",
     "FiveSimError",
+    "RateLimiter",
+    "FileRateLimiter",
+    "RateLimiterStats",
+    "RetryPolicy",
+    "Symbol",
+    "CountrySymbol",
+    "OperatorSymbol",
+    "ProductSymbol",
+    "HostingProductSymbol",
+    "get_symbols",
+    "refresh_registry",
+    "ResponseCache",
+    "DiskCache",
+    "RequestHooks",
+    "RequestInfo",
+    "MetricsCollector",
+    "JSONBackend",
+    "OrjsonBackend",
+    "UjsonBackend",
+    "get_json_backend",
+    "CheapestNumberRouter",
+    "RoutingAttempt",
+    "RoutingResult",
+    "SmsWaiter",
+    "OrderManager",
+    "HistorySync",
+    "SyncCheckpoint",
     "ProductInformation",
+    "PriceEntry",
+    "BulkPurchaseResult",
     "CountryInformation",
     "VendorWallet",
     "ProfileInformation",
@@ -29,5 +154,6 @@ __all__ = [
     "PaymentsHistory",
     "SMS",
     "Order",
+    "LazyOrder",
     "OrdersHistory"
 ]
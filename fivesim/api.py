@@ -6,13 +6,18 @@ from fivesim.enums import(
     Language,
     Operator,
     OrderAction,
+    TimestampFormat,
     VendorPaymentMethod,
     VendorPaymentSystem
 )
+from fivesim.batch import _apply_many, _buy_many
+from fivesim.cache import ResponseCache
+from fivesim.disk_cache import DiskCache
 from fivesim.errors import ErrorType, FiveSimError
 from fivesim.json_response import(
     _parse_guest_countries,
     _parse_guest_prices,
+    _parse_guest_prices_information,
     _parse_guest_products,
     _parse_order,
     _parse_orders_history,
@@ -20,22 +25,86 @@ from fivesim.json_response import(
     _parse_profile_data,
     _parse_sms_inbox
 )
-from fivesim.request import _APIRequest
+from fivesim.lazy_response import _parse_orders_history_lazy
+from fivesim.pagination import _HistoryPagination
+from fivesim.registry import HostingProductSymbol, ProductSymbol
+from fivesim.request import _APIRequest, _HTTPTransport
 from fivesim.response import(
+    BulkPurchaseResult,
     CountryInformation,
     Order,
     OrdersHistory,
     PaymentsHistory,
+    PriceEntry,
     ProductInformation,
     ProfileInformation,
     VendorWallet,
     SMS
 )
-
-
-class UserAPI(_APIRequest):
-    def __init__(self, api_key: str):
-        super().__init__(endpoint="https://5sim.net/v1/user/", auth_token=api_key)
+from fivesim.single_flight import _SingleFlight
+from typing import TYPE_CHECKING, Any, Callable
+
+if TYPE_CHECKING:
+    from fivesim.price_matrix import PriceMatrix
+
+
+# Page size sent when a page is requested without results_per_page, so that the page number maps to a known offset
+_DEFAULT_RESULTS_PER_PAGE = 15
+
+
+def _history_parameters(category: Category = None, results_per_page: int = None, page_number: int = None, order_by_field: str = None, reverse_order: bool = None) -> dict[str, str]:
+    """
+    Build the query parameters of an orders or payments history request.
+    The offset of the API counts rows, so the page number is multiplied by the page size.
+    """
+    params: dict[str, str] = dict()
+    if category is not None:
+        params["category"] = category.value
+    if page_number is not None and results_per_page is None:
+        results_per_page = _DEFAULT_RESULTS_PER_PAGE
+    if results_per_page is not None:
+        params["limit"] = str(results_per_page)
+    if page_number is not None:
+        params["offset"] = str(page_number * results_per_page)
+    if order_by_field is not None:
+        params["order"] = order_by_field
+    if reverse_order is not None:
+        params["reverse"] = "true" if reverse_order else "false"
+    return params
+
+
+def _buy_parameters(product: ActivationProduct | HostingProduct, forwarding_number: str = None, reuse: bool = False, voice: bool = False) -> tuple[Category, dict[str, str]]:
+    """
+    Validate the options of a purchase and build its query parameters.
+
+    :return: Category of the product and query parameters
+    :raises ValueError: if the input parameters are invalid
+    """
+    params: dict[str, str] = dict()
+    # The products received from the API that aren't in the enums keep their category in the symbol type
+    if isinstance(product, (ActivationProduct, ProductSymbol)):
+        type = Category.ACTIVATION
+        if forwarding_number is not None:
+            if len(forwarding_number) != 11:
+                raise ValueError("Invalid forwarding number")
+            params["forwarding"] = "true"
+            params["number"] = forwarding_number
+        if reuse:
+            params["reuse"] = "1"
+        if voice:
+            params["voice"] = "1"
+    elif isinstance(product, (HostingProduct, HostingProductSymbol)):
+        type = Category.HOSTING
+        if forwarding_number is not None or reuse or voice:
+            raise ValueError("Parameters not supported with hosting")
+    else:
+        raise ValueError("Invalid product")
+    return type, params
+
+
+class UserAPI(_APIRequest, _HistoryPagination):
+    def __init__(self, api_key: str, transport: _HTTPTransport = None, timestamp_format: TimestampFormat = TimestampFormat.DATETIME):
+        super().__init__(endpoint="user/", auth_token=api_key, transport=transport, timestamp_format=timestamp_format)
 
     def get_profile_data(self, vendor: bool = False) -> ProfileInformation:
         """
@@ -47,42 +116,43 @@ class UserAPI(_APIRequest):
         """
         api_result = super()._GET(
             use_token=True,
-            path=["vendor"] if vendor else ["profile"]
+            path=["vendor"] if vendor else ["profile"],
+            idempotent=True
         )
         return super()._parse_json(
             input=api_result,
             into_object=_parse_profile_data
         )
 
-    def get_orders_history(self, category: Category, results_per_page: int = None, page_number: int = None, order_by_field: str = None, reverse_order: bool = None) -> OrdersHistory:
+    def get_orders_history(self, category: Category, results_per_page: int = None, page_number: int = None, order_by_field: str = None, reverse_order: bool = None, lazy: bool = False) -> OrdersHistory:
         """
         Get the user orders history.
 
         :param category: Category of the orders requested
         :param results_per_page: Number of results to show on every page
-        :param page_number: Number of the page to get, starting from 0 (first)
+        :param page_number: Number of the page to get, starting from 0 (first), of results_per_page rows or 15 when it isn't set
         :param order_by_field: Order the results by a specific field, default is "id"
         :param reverse_order: Show the results in reverse order (has to do with the previous one)
+        :param lazy: Return LazyOrder objects, which decode their fields on first access
         :return: OrdersHistory object
         :raises FiveSimError: if the response is invalid
         """
-        params: dict[str, str] = {"category": category.value}
-        if results_per_page is not None:
-            params["limit"] = str(results_per_page)
-        if page_number is not None:
-            params["offset"] = str(page_number)
-        if order_by_field is not None:
-            params["order"] = order_by_field
-        if reverse_order is not None:
-            params["reverse"] = "true" if reverse_order else "false"
+        params = _history_parameters(
+            category=category,
+            results_per_page=results_per_page,
+            page_number=page_number,
+            order_by_field=order_by_field,
+            reverse_order=reverse_order
+        )
         api_result = super()._GET(
             use_token=True,
             path=["orders"],
-            parameters=params
+            parameters=params,
+            idempotent=True
         )
         return super()._parse_json(
             input=api_result,
-            into_object=_parse_orders_history
+            into_object=self._timestamp_hook(_parse_orders_history_lazy if lazy else _parse_orders_history)
         )
 
     def get_payments_history(self, results_per_page: int = None, page_number: int = None, order_by_field: str = None, reverse_order: bool = None) -> PaymentsHistory:
@@ -90,29 +160,27 @@ class UserAPI(_APIRequest):
         Get the user payments history.
 
         :param results_per_page: Number of results to show on every page
-        :param page_number: Number of the page to get, starting from 0 (first)
+        :param page_number: Number of the page to get, starting from 0 (first), of results_per_page rows or 15 when it isn't set
         :param order_by_field: Order the results by a specific field, default is "id"
         :param reverse_order: Show the results in reverse order (has to do with the previous one)
         :return: PaymentsHistory object
         :raises FiveSimError: if the response is invalid
         """
-        params: dict[str, str] = dict()
-        if results_per_page is not None:
-            params["limit"] = str(results_per_page)
-        if page_number is not None:
-            params["offset"] = str(page_number)
-        if order_by_field is not None:
-            params["order"] = order_by_field
-        if reverse_order is not None:
-            params["reverse"] = "true" if reverse_order else "false"
+        params = _history_parameters(
+            results_per_page=results_per_page,
+            page_number=page_number,
+            order_by_field=order_by_field,
+            reverse_order=reverse_order
+        )
         api_result = super()._GET(
             use_token=True,
             path=["payments"],
-            parameters=params
+            parameters=params,
+            idempotent=True
         )
         return super()._parse_json(
             input=api_result,
-            into_object=_parse_payments_history
+            into_object=self._timestamp_hook(_parse_payments_history)
         )
 
     def buy_number(self, country: Country, operator: Operator, product: ActivationProduct | HostingProduct, forwarding_number: str = None, reuse: bool = False, voice: bool = False) -> Order:
@@ -129,24 +197,12 @@ class UserAPI(_APIRequest):
         :raises FiveSimError: if the response is invalid
         :raises ValueError: if the input parameters are invalid
         """
-        params: dict[str, str] = dict()
-        if isinstance(product, ActivationProduct):
-            type = Category.ACTIVATION
-            if forwarding_number is not None:
-                if len(forwarding_number) != 11:
-                    raise ValueError("Invalid forwarding number")
-                params["forwarding"] = "true"
-                params["number"] = forwarding_number
-            if reuse:
-                params["reuse"] = "1"
-            if voice:
-                params["voice"] = "1"
-        elif isinstance(product, HostingProduct):
-            type = Category.HOSTING
-            if forwarding_number is not None or reuse or voice:
-                raise ValueError("Parameters not supported with hosting")
-        else:
-            raise ValueError("Invalid product")
+        type, params = _buy_parameters(
+            product=product,
+            forwarding_number=forwarding_number,
+            reuse=reuse,
+            voice=voice
+        )
         api_result = super()._GET(
             use_token=True,
             path=[
@@ -160,7 +216,7 @@ class UserAPI(_APIRequest):
         )
         return super()._parse_json(
             input=api_result,
-            into_object=_parse_order
+            into_object=self._timestamp_hook(_parse_order)
         )
 
     def reuse_number(self, product: ActivationProduct | HostingProduct, number: str) -> None:
@@ -186,11 +242,59 @@ class UserAPI(_APIRequest):
         """
         api_result = super()._GET(
             use_token=True,
-            path=[action.value, str(order.id)]
+            path=[action.value, str(order.id)],
+            idempotent=action == OrderAction.CHECK
         )
         return super()._parse_json(
             input=api_result,
-            into_object=_parse_order
+            into_object=self._timestamp_hook(_parse_order)
+        )
+
+    def buy_many(self, product: ActivationProduct | HostingProduct, count: int, candidates: list[PriceEntry | tuple[Country, Operator]] = None, max_spend: float = None, max_workers: int = 4, max_failures: int = 10) -> BulkPurchaseResult:
+        """
+        Buy many numbers of the same product concurrently.
+        The candidates are used in order, the next one is selected when a candidate has no free phones,
+        and the purchases stop at the first error that doesn't depend on the candidate (like a low balance).
+
+        :param product: Product to buy
+        :param count: Number of orders to buy
+        :param candidates: Countries and operators in order of preference, as PriceEntry or (Country, Operator).
+                           With a PriceEntry the price is reserved in the spend limit before the purchase.
+                           None to buy from any country and operator
+        :param max_spend: Maximum total price of the orders, None for no limit
+        :param max_workers: Maximum number of purchases in progress at the same time
+        :param max_failures: Number of network and server errors after which the purchases stop
+        :return: The orders bought, the total price, the purchases tried and the number of failures for every ErrorType
+        """
+        return _buy_many(
+            buy=lambda country, operator: self.buy_number(country=country, operator=operator, product=product),
+            count=count,
+            candidates=candidates if candidates is not None else [(Country.ANY_COUNTRY, Operator.ANY_OPERATOR)],
+            max_spend=max_spend,
+            max_workers=max_workers,
+            max_failures=max_failures
+        )
+
+    def order_many(self, action: OrderAction, orders: list[Order], max_workers: int = 8, reschedule_interval: float = 10.0, reschedule_timeout: float = 300.0) -> list[Order | Exception]:
+        """
+        Apply an action to many orders concurrently, for example to cancel all the orders still open.
+        An error doesn't stop the batch, it's returned in place of the order.
+        The orders that can't be cancelled yet (CANCEL_NEEDS_TIME) are repeated later instead of failing.
+
+        :param action: Action applied to every order
+        :param orders: Order objects with a valid ID
+        :param max_workers: Maximum number of requests sent at the same time
+        :param reschedule_interval: Seconds between the attempts of an order that can't be cancelled yet
+        :param reschedule_timeout: Seconds after which an order that can't be cancelled yet is returned as error
+        :return: The updated Order or the exception of every input order, in the same position:
+                 a FiveSimError, or another exception raised by the request like the ones of the RequestHooks
+        """
+        return _apply_many(
+            apply=lambda order: self.order(action, order),
+            orders=orders,
+            max_workers=max_workers,
+            reschedule_interval=reschedule_interval,
+            reschedule_timeout=reschedule_timeout
         )
 
     def get_sms_inbox_list(self, order: Order) -> list[SMS]:
@@ -203,31 +307,56 @@ class UserAPI(_APIRequest):
         """
         api_result = super()._GET(
             use_token=True,
-            path=["sms", "inbox", str(order.id)]
+            path=["sms", "inbox", str(order.id)],
+            idempotent=True
         )
         return super()._parse_json(
             input=api_result,
-            into_object=_parse_sms_inbox
+            into_object=self._timestamp_hook(_parse_sms_inbox)
         )
 
 
 class GuestAPI(_APIRequest):
-    def __init__(self, api_key: str):
-        super().__init__(endpoint="https://5sim.net/v1/guest/", auth_token=api_key)
+    def __init__(self, api_key: str, transport: _HTTPTransport = None, cache: ResponseCache = None, disk_cache: DiskCache = None):
+        super().__init__(endpoint="guest/", auth_token=api_key, transport=transport)
+        self.__cache = cache
+        self.__disk_cache = disk_cache
+        self.__in_flight = _SingleFlight()
+
+    def __cached(self, key: tuple, loader: Callable[..., Any], *args: Any) -> Any:
+        # The identical calls in progress at the same time share one request and one parsed result
+        load = lambda: self.__in_flight.do(key, lambda: loader(*args))
+        if self.__cache is None:
+            return load()
+        return self.__cache.get_or_load(key, load)
+
+    def __get_catalogue(self, path: list[str]) -> bytes:
+        if self.__disk_cache is None:
+            return super()._GET(
+                use_token=False,
+                path=path,
+                idempotent=True
+            )
+        return self.__disk_cache.get_or_load(
+            "/".join(path),
+            lambda etag, last_modified: super(GuestAPI, self)._GET_if_modified(path, etag, last_modified)
+        )
 
     def get_products(self, country: Country, operator: Operator) -> dict[ActivationProduct | HostingProduct, ProductInformation]:
         """
         Get available products by country.
+        Identical calls running at the same time share one request and receive the same dictionary:
+        don't modify it, copy it first. With a cache, the calls served by it share it too.
 
         :param country: Country selection, ANY_COUNTRY is possible
         :param operator: Operator selection, ANY_OPERATOR is possible
         :return: Dict with the association between a Product and its information
         :raises FiveSimError: if the response is invalid
         """
-        api_result = super()._GET(
-            use_token=False,
-            path=["products", country.value, operator.value]
-        )
+        return self.__cached(("products", country, operator, None), self.__load_products, country, operator)
+
+    def __load_products(self, country: Country, operator: Operator) -> dict[ActivationProduct | HostingProduct, ProductInformation]:
+        api_result = self.__get_catalogue(["products", country.value, operator.value])
         return super()._parse_json(
             input=api_result,
             into_object=_parse_guest_products
@@ -240,29 +369,71 @@ class GuestAPI(_APIRequest):
         If country is provided, only the prices of the products for this country will be returned.
         If product is provided, there is a filter on the product.
         If country and product are provided, a specific filter will be used.
+        Identical calls running at the same time share one request and receive the same dictionary:
+        don't modify it, copy it first. With a cache, the calls served by it share it too.
 
         :param country: Country selection
         :param product: Product selection
         :return: A dictionary that you can iterate over in a cycle or get a specific ProductInformation using [Country][Product][Operator]
         :raises FiveSimError: if the response is invalid
         """
+        if country == Country.ANY_COUNTRY:
+            country = None
+        return self.__cached(("prices", country, None, product), self.__load_prices, country, product)
+
+    def __load_prices(self, country: Country | None, product: ActivationProduct | None) -> dict[Country, dict[ActivationProduct, dict[Operator, ProductInformation]]]:
+        api_result = self.__get_prices_json(country, product)
+        parsed = super()._parse_json(
+            input=api_result,
+            into_object=_parse_guest_prices_information
+        )
+        try:
+            return _parse_guest_prices(
+                input=parsed,
+                by_product=product is not None and country is None
+            )
+        except (AttributeError, KeyError, TypeError):
+            raise FiveSimError(ErrorType.INVALID_RESULT, api_result.decode(errors="replace"))
+
+    def get_price_matrix(self, country: Country = None, product: ActivationProduct = None) -> "PriceMatrix":
+        """
+        Get prices as a PriceMatrix, which requires the optional numpy dependency.
+        The filters are the same of get_prices.
+        Identical calls running at the same time share the download, but every call gets its own PriceMatrix.
+
+        :param country: Country selection
+        :param product: Product selection
+        :return: PriceMatrix with a row for every country, product and operator
+        :raises FiveSimError: if the response is invalid
+        """
+        from fivesim.price_matrix import PriceMatrix
+        if country == Country.ANY_COUNTRY:
+            country = None
+        api_result = self.__get_prices_json(country, product)
+        try:
+            return PriceMatrix._from_json(
+                input=super()._parse_json(input=api_result),
+                by_product=product is not None and country is None
+            )
+        except (AttributeError, KeyError, TypeError):
+            raise FiveSimError(ErrorType.INVALID_RESULT, api_result.decode(errors="replace"))
+
+    def __get_prices_json(self, country: Country | None, product: ActivationProduct | None) -> bytes:
         params: dict[str, str] = dict()
-        if country != Country.ANY_COUNTRY and country is not None:
+        if country is not None:
             params["country"] = country.value
         if product is not None:
             params["product"] = product.value
         api_result = super()._GET(
             use_token=False,
             path=["prices"],
-            parameters=params
+            parameters=params,
+            idempotent=True
         )
-        if api_result == "null":
+        if api_result == b"null":
             raise FiveSimError(ErrorType.INCORRECT_PRODUCT,
                                "Product isn't available for the country")
-        return super()._parse_json(
-            input=api_result,
-            into_object=_parse_guest_prices
-        )
+        return api_result
 
     def get_notification(self, lang: Language) -> str:
         """
@@ -276,7 +447,8 @@ class GuestAPI(_APIRequest):
         try:
             api_result = super()._GET(
                 use_token=True,
-                path=["flash", lang.value]
+                path=["flash", lang.value],
+                idempotent=True
             )
             return super()._parse_json(input=api_result, need_keys=["text"])["text"]
         except:
@@ -285,23 +457,25 @@ class GuestAPI(_APIRequest):
     def get_countries(self) -> dict[Country, CountryInformation]:
         """
         Get a list of all countries and their information.
+        Identical calls running at the same time share one request and receive the same dictionary:
+        don't modify it, copy it first. With a cache, the calls served by it share it too.
 
         :return: Dict of countries associated with their prefix and other data
         :raises FiveSimError: if the response is invalid
         """
-        api_result = super()._GET(
-            use_token=False,
-            path=["countries"]
-        )
+        return self.__cached(("countries", None, None, None), self.__load_countries)
+
+    def __load_countries(self) -> dict[Country, CountryInformation]:
+        api_result = self.__get_catalogue(["countries"])
         return super()._parse_json(
             input=api_result,
             into_object=_parse_guest_countries
         )
 
 
-class VendorAPI(_APIRequest):
-    def __init__(self, api_key: str):
-        super().__init__(endpoint="https://5sim.net/v1/vendor/", auth_token=api_key)
+class VendorAPI(_APIRequest, _HistoryPagination):
+    def __init__(self, api_key: str, transport: _HTTPTransport = None, timestamp_format: TimestampFormat = TimestampFormat.DATETIME):
+        super().__init__(endpoint="vendor/", auth_token=api_key, transport=transport, timestamp_format=timestamp_format)
 
     def get_wallets_reserve(self) -> VendorWallet:
         """
@@ -312,7 +486,8 @@ class VendorAPI(_APIRequest):
         """
         api_result = super()._GET(
             use_token=True,
-            path=["wallets"]
+            path=["wallets"],
+            idempotent=True
         )
         parsed = super()._parse_json(
             input=api_result,
@@ -320,41 +495,39 @@ class VendorAPI(_APIRequest):
                 payment_system.value for payment_system in VendorPaymentSystem
             ]
         )
-        result = VendorWallet()
-        for payment_system in VendorPaymentSystem:
-            payment_name = payment_system.value
-            setattr(result, payment_name, parsed[payment_name])
-        return result
+        return VendorWallet(**{
+            payment_system.value: parsed[payment_system.value] for payment_system in VendorPaymentSystem
+        })
 
-    def get_orders_history(self, category: Category, results_per_page: int = None, page_number: int = None, order_by_field: str = None, reverse_order: bool = None) -> OrdersHistory:
+    def get_orders_history(self, category: Category, results_per_page: int = None, page_number: int = None, order_by_field: str = None, reverse_order: bool = None, lazy: bool = False) -> OrdersHistory:
         """
         Get the vendor orders history.
 
         :param category: Category of the orders requested
         :param results_per_page: Number of results to show on every page
-        :param page_number: Number of the page to get, starting from 0 (first)
+        :param page_number: Number of the page to get, starting from 0 (first), of results_per_page rows or 15 when it isn't set
         :param order_by_field: Order the results by a specific field, default is "id"
         :param reverse_order: Show the results in reverse order (has to do with the previous one)
+        :param lazy: Return LazyOrder objects, which decode their fields on first access
         :return: OrdersHistory object
         :raises FiveSimError: if the response is invalid
         """
-        params: dict[str, str] = {"category": category.value}
-        if results_per_page is not None:
-            params["limit"] = str(results_per_page)
-        if page_number is not None:
-            params["offset"] = str(page_number)
-        if order_by_field is not None:
-            params["order"] = order_by_field
-        if reverse_order is not None:
-            params["reverse"] = "true" if reverse_order else "false"
+        params = _history_parameters(
+            category=category,
+            results_per_page=results_per_page,
+            page_number=page_number,
+            order_by_field=order_by_field,
+            reverse_order=reverse_order
+        )
         api_result = super()._GET(
             use_token=True,
             path=["orders"],
-            parameters=params
+            parameters=params,
+            idempotent=True
         )
         return super()._parse_json(
             input=api_result,
-            into_object=_parse_orders_history
+            into_object=self._timestamp_hook(_parse_orders_history_lazy if lazy else _parse_orders_history)
         )
 
     def get_payments_history(self, results_per_page: int = None, page_number: int = None, order_by_field: str = None, reverse_order: bool = None) -> PaymentsHistory:
@@ -362,29 +535,27 @@ class VendorAPI(_APIRequest):
         Get the vendor payments history.
 
         :param results_per_page: Number of results to show on every page
-        :param page_number: Number of the page to get, starting from 0 (first)
+        :param page_number: Number of the page to get, starting from 0 (first), of results_per_page rows or 15 when it isn't set
         :param order_by_field: Order the results by a specific field, default is "id"
         :param reverse_order: Show the results in reverse order (has to do with the previous one)
         :return: PaymentsHistory object
         :raises FiveSimError: if the response is invalid
         """
-        params: dict[str, str] = dict()
-        if results_per_page is not None:
-            params["limit"] = str(results_per_page)
-        if page_number is not None:
-            params["offset"] = str(page_number)
-        if order_by_field is not None:
-            params["order"] = order_by_field
-        if reverse_order is not None:
-            params["reverse"] = "true" if reverse_order else "false"
+        params = _history_parameters(
+            results_per_page=results_per_page,
+            page_number=page_number,
+            order_by_field=order_by_field,
+            reverse_order=reverse_order
+        )
         api_result = super()._GET(
             use_token=True,
             path=["payments"],
-            parameters=params
+            parameters=params,
+            idempotent=True
         )
         return super()._parse_json(
             input=api_result,
-            into_object=_parse_payments_history
+            into_object=self._timestamp_hook(_parse_payments_history)
         )
 
     def create_payout(self, receiver: str, method: VendorPaymentMethod, amount: int, fee: VendorPaymentSystem) -> None:
@@ -401,9 +572,9 @@ class VendorAPI(_APIRequest):
             use_token=True,
             path="withdraw",
             data={
-                receiver: receiver,
-                method: method.value,
-                amount: str(amount),
-                fee: fee.value
+                "receiver": receiver,
+                "method": method.value,
+                "amount": str(amount),
+                "fee": fee.value
             }
         )
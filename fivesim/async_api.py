@@ -0,0 +1,514 @@
+from fivesim.api import _buy_parameters, _history_parameters
+from fivesim.async_request import _AsyncAPIRequest, _AsyncHTTPTransport
+from fivesim.batch import _apply_many_async, _buy_many_async
+from fivesim.enums import(
+    ActivationProduct,
+    Category,
+    Country,
+    HostingProduct,
+    Language,
+    Operator,
+    OrderAction,
+    TimestampFormat,
+    VendorPaymentMethod,
+    VendorPaymentSystem
+)
+from fivesim.errors import ErrorType, FiveSimError
+from fivesim.json_response import(
+    _parse_guest_countries,
+    _parse_guest_prices,
+    _parse_guest_prices_information,
+    _parse_guest_products,
+    _parse_order,
+    _parse_orders_history,
+    _parse_payments_history,
+    _parse_profile_data,
+    _parse_sms_inbox
+)
+from fivesim.lazy_response import _parse_orders_history_lazy
+from fivesim.response import(
+    BulkPurchaseResult,
+    CountryInformation,
+    Order,
+    OrdersHistory,
+    PaymentsHistory,
+    PriceEntry,
+    ProductInformation,
+    ProfileInformation,
+    VendorWallet,
+    SMS
+)
+from fivesim.single_flight import _AsyncSingleFlight
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+
+if TYPE_CHECKING:
+    from fivesim.price_matrix import PriceMatrix
+
+
+class AsyncUserAPI(_AsyncAPIRequest):
+    def __init__(self, api_key: str, transport: _AsyncHTTPTransport = None, timestamp_format: TimestampFormat = TimestampFormat.DATETIME):
+        super().__init__(endpoint="user/", auth_token=api_key, transport=transport, timestamp_format=timestamp_format)
+
+    async def get_profile_data(self, vendor: bool = False) -> ProfileInformation:
+        """
+        Get data about the user account.
+
+        :params vendor: if true, get the vendor profile data, don't touch if you are a normal user
+        :return: Profile object with the data
+        :raises FiveSimError: if the response is invalid
+        """
+        api_result = await super()._GET(
+            use_token=True,
+            path=["vendor"] if vendor else ["profile"],
+            idempotent=True
+        )
+        return super()._parse_json(
+            input=api_result,
+            into_object=_parse_profile_data
+        )
+
+    async def get_orders_history(self, category: Category, results_per_page: int = None, page_number: int = None, order_by_field: str = None, reverse_order: bool = None, lazy: bool = False) -> OrdersHistory:
+        """
+        Get the user orders history.
+
+        :param category: Category of the orders requested
+        :param results_per_page: Number of results to show on every page
+        :param page_number: Number of the page to get, starting from 0 (first), of results_per_page rows or 15 when it isn't set
+        :param order_by_field: Order the results by a specific field, default is "id"
+        :param reverse_order: Show the results in reverse order (has to do with the previous one)
+        :param lazy: Return LazyOrder objects, which decode their fields on first access
+        :return: OrdersHistory object
+        :raises FiveSimError: if the response is invalid
+        """
+        params = _history_parameters(
+            category=category,
+            results_per_page=results_per_page,
+            page_number=page_number,
+            order_by_field=order_by_field,
+            reverse_order=reverse_order
+        )
+        api_result = await super()._GET(
+            use_token=True,
+            path=["orders"],
+            parameters=params,
+            idempotent=True
+        )
+        return super()._parse_json(
+            input=api_result,
+            into_object=self._timestamp_hook(_parse_orders_history_lazy if lazy else _parse_orders_history)
+        )
+
+    async def get_payments_history(self, results_per_page: int = None, page_number: int = None, order_by_field: str = None, reverse_order: bool = None) -> PaymentsHistory:
+        """
+        Get the user payments history.
+
+        :param results_per_page: Number of results to show on every page
+        :param page_number: Number of the page to get, starting from 0 (first), of results_per_page rows or 15 when it isn't set
+        :param order_by_field: Order the results by a specific field, default is "id"
+        :param reverse_order: Show the results in reverse order (has to do with the previous one)
+        :return: PaymentsHistory object
+        :raises FiveSimError: if the response is invalid
+        """
+        params = _history_parameters(
+            results_per_page=results_per_page,
+            page_number=page_number,
+            order_by_field=order_by_field,
+            reverse_order=reverse_order
+        )
+        api_result = await super()._GET(
+            use_token=True,
+            path=["payments"],
+            parameters=params,
+            idempotent=True
+        )
+        return super()._parse_json(
+            input=api_result,
+            into_object=self._timestamp_hook(_parse_payments_history)
+        )
+
+    async def buy_number(self, country: Country, operator: Operator, product: ActivationProduct | HostingProduct, forwarding_number: str = None, reuse: bool = False, voice: bool = False) -> Order:
+        """
+        Buy a 5SIM number, activation or hosting.
+
+        :param country: Target country, or ANY_COUNTRY
+        :param operator: Target operator, or ANY_OPERATOR
+        :param product: Product to buy
+        :param forwarding_number: Only with Activation, forward the call to a russian number (11 digits, without +)
+        :param reuse: Only with Activation, buy a reusable number in the future
+        :param voice: Only with Activation, receive a call from a robot in the requested number
+        :return: Order object
+        :raises FiveSimError: if the response is invalid
+        :raises ValueError: if the input parameters are invalid
+        """
+        type, params = _buy_parameters(
+            product=product,
+            forwarding_number=forwarding_number,
+            reuse=reuse,
+            voice=voice
+        )
+        api_result = await super()._GET(
+            use_token=True,
+            path=[
+                "buy",
+                type.value,
+                country.value,
+                operator.value,
+                product.value
+            ],
+            parameters=params
+        )
+        return super()._parse_json(
+            input=api_result,
+            into_object=self._timestamp_hook(_parse_order)
+        )
+
+    async def reuse_number(self, product: ActivationProduct | HostingProduct, number: str) -> None:
+        """
+        Rebuy a 5SIM number, activation or hosting.
+
+        :param product: Product to rebuy
+        :param number: Telephone number to rebuy (with prefix, without + sign)
+        :raises FiveSimError: if the response is invalid
+        """
+        await super()._GET(
+            use_token=True,
+            path=["reuse", product.value, number]
+        )
+
+    async def order(self, action: OrderAction, order: Order) -> Order:
+        """
+        Apply an action to the input order.
+
+        :param order: Order object with a valid ID, from buy_number or using from_order_id method
+        :return: Parsed Order object
+        :raises FiveSimError: if the response is invalid
+        """
+        api_result = await super()._GET(
+            use_token=True,
+            path=[action.value, str(order.id)],
+            idempotent=action == OrderAction.CHECK
+        )
+        return super()._parse_json(
+            input=api_result,
+            into_object=self._timestamp_hook(_parse_order)
+        )
+
+    async def buy_many(self, product: ActivationProduct | HostingProduct, count: int, candidates: list[PriceEntry | tuple[Country, Operator]] = None, max_spend: float = None, max_workers: int = 4, max_failures: int = 10) -> BulkPurchaseResult:
+        """
+        Buy many numbers of the same product concurrently.
+        The candidates are used in order, the next one is selected when a candidate has no free phones,
+        and the purchases stop at the first error that doesn't depend on the candidate (like a low balance).
+
+        :param product: Product to buy
+        :param count: Number of orders to buy
+        :param candidates: Countries and operators in order of preference, as PriceEntry or (Country, Operator).
+                           With a PriceEntry the price is reserved in the spend limit before the purchase.
+                           None to buy from any country and operator
+        :param max_spend: Maximum total price of the orders, None for no limit
+        :param max_workers: Maximum number of purchases in progress at the same time
+        :param max_failures: Number of network and server errors after which the purchases stop
+        :return: The orders bought, the total price, the purchases tried and the number of failures for every ErrorType
+        """
+        return await _buy_many_async(
+            buy=lambda country, operator: self.buy_number(country=country, operator=operator, product=product),
+            count=count,
+            candidates=candidates if candidates is not None else [(Country.ANY_COUNTRY, Operator.ANY_OPERATOR)],
+            max_spend=max_spend,
+            max_workers=max_workers,
+            max_failures=max_failures
+        )
+
+    async def order_many(self, action: OrderAction, orders: list[Order], max_workers: int = 8, reschedule_interval: float = 10.0, reschedule_timeout: float = 300.0) -> list[Order | Exception]:
+        """
+        Apply an action to many orders concurrently, for example to cancel all the orders still open.
+        An error doesn't stop the batch, it's returned in place of the order.
+        The orders that can't be cancelled yet (CANCEL_NEEDS_TIME) are repeated later instead of failing.
+
+        :param action: Action applied to every order
+        :param orders: Order objects with a valid ID
+        :param max_workers: Maximum number of requests sent at the same time
+        :param reschedule_interval: Seconds between the attempts of an order that can't be cancelled yet
+        :param reschedule_timeout: Seconds after which an order that can't be cancelled yet is returned as error
+        :return: The updated Order or the exception of every input order, in the same position:
+                 a FiveSimError, or another exception raised by the request like the ones of the RequestHooks
+        """
+        return await _apply_many_async(
+            apply=lambda order: self.order(action, order),
+            orders=orders,
+            max_workers=max_workers,
+            reschedule_interval=reschedule_interval,
+            reschedule_timeout=reschedule_timeout
+        )
+
+    async def get_sms_inbox_list(self, order: Order) -> list[SMS]:
+        """
+        Get the list of SMS for an order ID.
+
+        :param order: Order object with a valid ID, from buy_number or using from_order_id method
+        :return: List of SMS
+        :raises FiveSimError: if the response is invalid
+        """
+        api_result = await super()._GET(
+            use_token=True,
+            path=["sms", "inbox", str(order.id)],
+            idempotent=True
+        )
+        return super()._parse_json(
+            input=api_result,
+            into_object=self._timestamp_hook(_parse_sms_inbox)
+        )
+
+
+class AsyncGuestAPI(_AsyncAPIRequest):
+    def __init__(self, api_key: str, transport: _AsyncHTTPTransport = None):
+        super().__init__(endpoint="guest/", auth_token=api_key, transport=transport)
+        self.__in_flight = _AsyncSingleFlight()
+
+    async def __coalesced(self, key: tuple, loader: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        # The identical calls in progress at the same time share one request and one parsed result
+        return await self.__in_flight.do(key, lambda: loader(*args))
+
+    async def get_products(self, country: Country, operator: Operator) -> dict[ActivationProduct | HostingProduct, ProductInformation]:
+        """
+        Get available products by country.
+        Identical calls running at the same time share one request and receive the same dictionary:
+        don't modify it, copy it first.
+
+        :param country: Country selection, ANY_COUNTRY is possible
+        :param operator: Operator selection, ANY_OPERATOR is possible
+        :return: Dict with the association between a Product and its information
+        :raises FiveSimError: if the response is invalid
+        """
+        return await self.__coalesced(("products", country, operator, None), self.__load_products, country, operator)
+
+    async def __load_products(self, country: Country, operator: Operator) -> dict[ActivationProduct | HostingProduct, ProductInformation]:
+        api_result = await super()._GET(
+            use_token=False,
+            path=["products", country.value, operator.value],
+            idempotent=True
+        )
+        return super()._parse_json(
+            input=api_result,
+            into_object=_parse_guest_products
+        )
+
+    async def get_prices(self, country: Country = None, product: ActivationProduct = None) -> dict[Country, dict[ActivationProduct, dict[Operator, ProductInformation]]]:
+        """
+        Get prices.
+        If country and product aren't provided, all the options will be returned.
+        If country is provided, only the prices of the products for this country will be returned.
+        If product is provided, there is a filter on the product.
+        If country and product are provided, a specific filter will be used.
+        Identical calls running at the same time share one request and receive the same dictionary:
+        don't modify it, copy it first.
+
+        :param country: Country selection
+        :param product: Product selection
+        :return: A dictionary that you can iterate over in a cycle or get a specific ProductInformation using [Country][Product][Operator]
+        :raises FiveSimError: if the response is invalid
+        """
+        if country == Country.ANY_COUNTRY:
+            country = None
+        return await self.__coalesced(("prices", country, None, product), self.__load_prices, country, product)
+
+    async def __load_prices(self, country: Country | None, product: ActivationProduct | None) -> dict[Country, dict[ActivationProduct, dict[Operator, ProductInformation]]]:
+        api_result = await self.__get_prices_json(country, product)
+        parsed = super()._parse_json(
+            input=api_result,
+            into_object=_parse_guest_prices_information
+        )
+        try:
+            return _parse_guest_prices(
+                input=parsed,
+                by_product=product is not None and country is None
+            )
+        except (AttributeError, KeyError, TypeError):
+            raise FiveSimError(ErrorType.INVALID_RESULT, api_result.decode(errors="replace"))
+
+    async def get_price_matrix(self, country: Country = None, product: ActivationProduct = None) -> "PriceMatrix":
+        """
+        Get prices as a PriceMatrix, which requires the optional numpy dependency.
+        The filters are the same of get_prices.
+        Identical calls running at the same time share the download, but every call gets its own PriceMatrix.
+
+        :param country: Country selection
+        :param product: Product selection
+        :return: PriceMatrix with a row for every country, product and operator
+        :raises FiveSimError: if the response is invalid
+        """
+        from fivesim.price_matrix import PriceMatrix
+        if country == Country.ANY_COUNTRY:
+            country = None
+        api_result = await self.__get_prices_json(country, product)
+        try:
+            return PriceMatrix._from_json(
+                input=super()._parse_json(input=api_result),
+                by_product=product is not None and country is None
+            )
+        except (AttributeError, KeyError, TypeError):
+            raise FiveSimError(ErrorType.INVALID_RESULT, api_result.decode(errors="replace"))
+
+    async def __get_prices_json(self, country: Country | None, product: ActivationProduct | None) -> bytes:
+        params: dict[str, str] = dict()
+        if country is not None:
+            params["country"] = country.value
+        if product is not None:
+            params["product"] = product.value
+        api_result = await super()._GET(
+            use_token=False,
+            path=["prices"],
+            parameters=params,
+            idempotent=True
+        )
+        if api_result == b"null":
+            raise FiveSimError(ErrorType.INCORRECT_PRODUCT,
+                               "Product isn't available for the country")
+        return api_result
+
+    async def get_notification(self, lang: Language) -> str:
+        """
+        Get 5SIM notification.
+
+        :param lang: Language of notification, Russian or English
+        :return: Notification text
+        """
+        if lang != lang.ENGLISH and lang != lang.RUSSIAN:
+            raise ValueError("Language must be english or russian")
+        try:
+            api_result = await super()._GET(
+                use_token=True,
+                path=["flash", lang.value],
+                idempotent=True
+            )
+            return super()._parse_json(input=api_result, need_keys=["text"])["text"]
+        except FiveSimError:
+            return ""
+
+    async def get_countries(self) -> dict[Country, CountryInformation]:
+        """
+        Get a list of all countries and their information.
+        Identical calls running at the same time share one request and receive the same dictionary:
+        don't modify it, copy it first.
+
+        :return: Dict of countries associated with their prefix and other data
+        :raises FiveSimError: if the response is invalid
+        """
+        return await self.__coalesced(("countries", None, None, None), self.__load_countries)
+
+    async def __load_countries(self) -> dict[Country, CountryInformation]:
+        api_result = await super()._GET(
+            use_token=False,
+            path=["countries"],
+            idempotent=True
+        )
+        return super()._parse_json(
+            input=api_result,
+            into_object=_parse_guest_countries
+        )
+
+
+class AsyncVendorAPI(_AsyncAPIRequest):
+    def __init__(self, api_key: str, transport: _AsyncHTTPTransport = None, timestamp_format: TimestampFormat = TimestampFormat.DATETIME):
+        super().__init__(endpoint="vendor/", auth_token=api_key, transport=transport, timestamp_format=timestamp_format)
+
+    async def get_wallets_reserve(self) -> VendorWallet:
+        """
+        Get the wallet balance for the vendor.
+
+        :return: List of balances (VendorWallet)
+        :raises FiveSimError: if the response is invalid
+        """
+        api_result = await super()._GET(
+            use_token=True,
+            path=["wallets"],
+            idempotent=True
+        )
+        parsed = super()._parse_json(
+            input=api_result,
+            need_keys=[
+                payment_system.value for payment_system in VendorPaymentSystem
+            ]
+        )
+        return VendorWallet(**{
+            payment_system.value: parsed[payment_system.value] for payment_system in VendorPaymentSystem
+        })
+
+    async def get_orders_history(self, category: Category, results_per_page: int = None, page_number: int = None, order_by_field: str = None, reverse_order: bool = None, lazy: bool = False) -> OrdersHistory:
+        """
+        Get the vendor orders history.
+
+        :param category: Category of the orders requested
+        :param results_per_page: Number of results to show on every page
+        :param page_number: Number of the page to get, starting from 0 (first), of results_per_page rows or 15 when it isn't set
+        :param order_by_field: Order the results by a specific field, default is "id"
+        :param reverse_order: Show the results in reverse order (has to do with the previous one)
+        :param lazy: Return LazyOrder objects, which decode their fields on first access
+        :return: OrdersHistory object
+        :raises FiveSimError: if the response is invalid
+        """
+        params = _history_parameters(
+            category=category,
+            results_per_page=results_per_page,
+            page_number=page_number,
+            order_by_field=order_by_field,
+            reverse_order=reverse_order
+        )
+        api_result = await super()._GET(
+            use_token=True,
+            path=["orders"],
+            parameters=params,
+            idempotent=True
+        )
+        return super()._parse_json(
+            input=api_result,
+            into_object=self._timestamp_hook(_parse_orders_history_lazy if lazy else _parse_orders_history)
+        )
+
+    async def get_payments_history(self, results_per_page: int = None, page_number: int = None, order_by_field: str = None, reverse_order: bool = None) -> PaymentsHistory:
+        """
+        Get the vendor payments history.
+
+        :param results_per_page: Number of results to show on every page
+        :param page_number: Number of the page to get, starting from 0 (first), of results_per_page rows or 15 when it isn't set
+        :param order_by_field: Order the results by a specific field, default is "id"
+        :param reverse_order: Show the results in reverse order (has to do with the previous one)
+        :return: PaymentsHistory object
+        :raises FiveSimError: if the response is invalid
+        """
+        params = _history_parameters(
+            results_per_page=results_per_page,
+            page_number=page_number,
+            order_by_field=order_by_field,
+            reverse_order=reverse_order
+        )
+        api_result = await super()._GET(
+            use_token=True,
+            path=["payments"],
+            parameters=params,
+            idempotent=True
+        )
+        return super()._parse_json(
+            input=api_result,
+            into_object=self._timestamp_hook(_parse_payments_history)
+        )
+
+    async def create_payout(self, receiver: str, method: VendorPaymentMethod, amount: int, fee: VendorPaymentSystem) -> None:
+        """
+        Withdraw money from the 5SIM vendor account.
+
+        :param receiver: Payout receiver number
+        :param method: Payment output method
+        :param amount: Amount of the opyment
+        :param fee: Payment executor
+        :raises FiveSimError: if the response is invalid
+        """
+        await super()._POST(
+            use_token=True,
+            path="withdraw",
+            data={
+                "receiver": receiver,
+                "method": method.value,
+                "amount": str(amount),
+                "fee": fee.value
+            }
+        )
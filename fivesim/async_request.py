@@ -0,0 +1,233 @@
+import asyncio
+import time
+from fivesim.enums import TimestampFormat
+from fivesim.errors import ErrorType, FiveSimError
+from fivesim.hooks import RequestHooks, RequestInfo, _endpoint_name, _last_request
+from fivesim.json_backend import JSONBackend, get_json_backend
+from fivesim.rate_limit import RateLimiter
+from fivesim.retry import RetryPolicy
+from fivesim.single_flight import _AsyncSingleFlight
+from fivesim.request import DEFAULT_BASE_URL, _APIRequest, _check_response
+from typing import Dict
+
+
+class _AsyncHTTPTransport:
+    """
+    Connection-pooled asyncio HTTP transport, shared by all the API classes of an async client.
+    It requires the optional aiohttp dependency (pip install fivesim[async]).
+    """
+
+    def __init__(self, pool_size: int = 10, keep_alive: bool = True, connect_timeout: float | None = None, read_timeout: float | None = None, rate_limiter: RateLimiter = None, retry_policy: RetryPolicy = None, json_backend: JSONBackend = None, hooks: list[RequestHooks] = None, base_url: str = DEFAULT_BASE_URL) -> None:
+        """
+        :param pool_size: Maximum number of connections kept open to the API host
+        :param keep_alive: Reuse the connections between requests
+        :param connect_timeout: Seconds to wait for the connection to be established, None to wait forever
+        :param read_timeout: Seconds to wait for the server response, None to wait forever
+        :param rate_limiter: Limiter that paces the requests, None to send them immediately
+        :param retry_policy: Policy used to repeat the idempotent requests that failed, None to never repeat them
+        :param json_backend: Backend used to encode and decode the JSON bodies, None to select the fastest one installed
+        :param hooks: Hooks called around every request, in order
+        :param base_url: URL of the API version, the user, guest and vendor endpoints are relative to it
+        """
+        if pool_size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.__pool_size = pool_size
+        self.__keep_alive = keep_alive
+        self.__connect_timeout = connect_timeout
+        self.__read_timeout = read_timeout
+        self.__rate_limiter = rate_limiter
+        self.__retry_policy = retry_policy
+        self.__json_backend = json_backend if json_backend is not None else get_json_backend()
+        self.__hooks = tuple(hooks) if hooks is not None else ()
+        self.__base_url = base_url if base_url.endswith("/") else base_url + "/"
+        self.__session = None
+
+    def __get_session(self):
+        # The session is bound to the running event loop, so it's created on first use
+        if self.__session is None or self.__session.closed:
+            import aiohttp
+            self.__session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=self.__pool_size,
+                    force_close=not self.__keep_alive
+                ),
+                timeout=aiohttp.ClientTimeout(
+                    total=None,
+                    connect=self.__connect_timeout,
+                    sock_read=self.__read_timeout
+                )
+            )
+        return self.__session
+
+    async def request(self, method: str, url: str, headers: Dict[str, str], params: dict, data: bytes | None) -> tuple[int, str, bytes, str | None]:
+        """
+        Send an HTTP request using a pooled connection.
+
+        :param method: HTTP method, GET or POST
+        :param url: Complete URL of the resource
+        :return: Status code, reason phrase, raw body and Retry-After header of the response
+        :raises aiohttp.ClientError: if the request can't be completed
+        """
+        async with self.__get_session().request(method=method, url=url, headers=headers, params=params, data=data) as response:
+            return response.status, response.reason or "", await response.read(), response.headers.get("Retry-After")
+
+    async def acquire(self) -> None:
+        """
+        Wait until the rate limiter allows a new request.
+        """
+        if self.__rate_limiter is not None:
+            await self.__rate_limiter.acquire_async()
+
+    def get_retry_policy(self) -> RetryPolicy | None:
+        """
+        Get the policy used to repeat the idempotent requests.
+        """
+        return self.__retry_policy
+
+    def get_json_backend(self) -> JSONBackend:
+        """
+        Get the backend used to encode and decode the JSON bodies.
+        """
+        return self.__json_backend
+
+    def get_hooks(self) -> tuple[RequestHooks, ...]:
+        """
+        Get the hooks called around every request.
+        """
+        return self.__hooks
+
+    def get_base_url(self) -> str:
+        """
+        Get the URL of the API version, ending with a slash.
+        """
+        return self.__base_url
+
+    async def close(self) -> None:
+        """
+        Close all the pooled connections.
+        """
+        if self.__session is not None:
+            await self.__session.close()
+            self.__session = None
+
+
+class _AsyncAPIRequest:
+    def __init__(self, endpoint: str, auth_token: str, transport: _AsyncHTTPTransport = None, timestamp_format: TimestampFormat = TimestampFormat.DATETIME) -> None:
+        self.__authentication_token = auth_token
+        self.__transport = transport if transport is not None else _AsyncHTTPTransport()
+        self.__endpoint = self.__transport.get_base_url() + endpoint
+        self._timestamp_format = timestamp_format
+        self._json_backend = self.__transport.get_json_backend()
+        self._hooks = self.__transport.get_hooks()
+        self.__in_flight = _AsyncSingleFlight()
+
+    async def __request(self, method: str, name: str, use_token: bool, params: dict, json_data: bytes | None, idempotent: bool) -> bytes:
+        retry_policy = self.__transport.get_retry_policy() if idempotent else None
+        if retry_policy is None:
+            return await self.__send(method, name, use_token, params, json_data, 1)
+        retry_policy.record_request()
+        attempt = 1
+        while True:
+            try:
+                return await self.__send(method, name, use_token, params, json_data, attempt)
+            except FiveSimError as e:
+                delay = retry_policy.get_retry_delay(e, attempt)
+                if delay is None:
+                    raise
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def __send(self, method: str, name: str, use_token: bool, params: dict, json_data: bytes | None, attempt: int) -> bytes:
+        headers = {"Accept": "application/json"}
+        if use_token:
+            headers["Authorization"] = "Bearer " + self.__authentication_token
+        url = self.__endpoint + name
+        request = RequestInfo(method=method, endpoint=_endpoint_name(self.__endpoint, name), url=url, attempt=attempt)
+        await self.__transport.acquire()
+        for hook in self._hooks:
+            hook.before_request(request)
+        start = time.perf_counter()
+        try:
+            try:
+                status_code, reason, body, retry_after = await self.__transport.request(
+                    method=method,
+                    url=url,
+                    headers=headers,
+                    params=params,
+                    data=json_data
+                )
+            except Exception as e:
+                raise FiveSimError(ErrorType.REQUEST_ERROR) from e
+            for hook in self._hooks:
+                hook.after_response(request, status_code, len(body), time.perf_counter() - start)
+            _check_response(
+                status_code=status_code,
+                reason=reason,
+                body=body,
+                retry_after=retry_after
+            )
+        except FiveSimError as e:
+            for hook in self._hooks:
+                hook.on_error(request, e, time.perf_counter() - start)
+            raise
+        _last_request.set(request)
+        return body
+
+    async def _GET(self, use_token: bool, path: list[str], parameters: Dict[str, str] = {}, idempotent: bool = False) -> bytes:
+        """
+        Make a GET request to the API.
+
+        :param use_token: Specify wheter to include the authentication token in the request
+        :param path: Specify the part after the domain to invoke in the API
+        :param idempotent: The request can be repeated safely when it fails.
+                           The idempotent requests without the token share the response with the identical ones in progress
+        :return: The raw body of the response
+        :raises FiveSimError: if there is an error with the request
+        """
+        async def send() -> bytes:
+            return await self.__request(
+                method="GET",
+                name="/".join(path),
+                use_token=use_token,
+                params=parameters,
+                json_data=None,
+                idempotent=idempotent
+            )
+
+        if not idempotent or use_token:
+            return await send()
+
+        async def send_shared() -> tuple[bytes, RequestInfo | None]:
+            # The request runs in its own task, its context isn't the one of the callers
+            return await send(), _last_request.get()
+
+        body, request = await self.__in_flight.do(
+            ("/".join(path), tuple(sorted(parameters.items()))),
+            send_shared
+        )
+        # The parse time of a shared response is attributed to the request that received it
+        _last_request.set(request)
+        return body
+
+    async def _POST(self, use_token: bool, path: str, data: Dict[str, str]) -> bytes:
+        """
+        Make a POST request to the API.
+
+        :param use_token: Specify wheter to include the authentication token in the request
+        :param path: Specify the part after the domain to invoke in the API
+        :return: The raw body of the response
+        :raises FiveSimError: if there is an error with the request
+        """
+        return await self.__request(
+            method="POST",
+            name=path,
+            use_token=use_token,
+            params={},
+            json_data=self._json_backend.dumps(data),
+            idempotent=False
+        )
+
+    # Parsing is CPU bound, the same implementation of the blocking client is used
+    _parse_json = _APIRequest._parse_json
+    _report_parse = _APIRequest._report_parse
+    _timestamp_hook = _APIRequest._timestamp_hook
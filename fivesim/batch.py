@@ -0,0 +1,286 @@
+import heapq
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from fivesim.enums import Country, Operator
+from fivesim.errors import ErrorType, FiveSimError
+from fivesim.response import BulkPurchaseResult, Order, PriceEntry
+from typing import Awaitable, Callable
+
+# Errors caused by the selected country or operator, another candidate can still succeed
+_CANDIDATE_ERRORS = frozenset({
+    ErrorType.NO_FREE_PHONES,
+    ErrorType.BAD_COUNTRY,
+    ErrorType.BAD_OPERATOR,
+    ErrorType.INCORRECT_COUNTRY,
+    ErrorType.INCORRECT_PRODUCT,
+    ErrorType.MISSING_PRODUCT
+})
+
+# Errors that don't depend on the purchase, the same candidate can be tried again
+_TRANSIENT_ERRORS = frozenset({
+    ErrorType.REQUEST_ERROR,
+    ErrorType.SERVER_ERROR,
+    ErrorType.SERVER_OFFLINE,
+    ErrorType.API_KEY_LIMIT,
+    ErrorType.LIMIT_ERROR
+})
+
+
+def _is_reschedulable(error: FiveSimError, retry_at: float, deadline: float) -> bool:
+    return error.get_error() == ErrorType.CANCEL_NEEDS_TIME and retry_at <= deadline
+
+
+def _check_batch_arguments(max_workers: int, reschedule_interval: float, reschedule_timeout: float) -> None:
+    if max_workers < 1:
+        raise ValueError("At least one worker is required")
+    if reschedule_interval <= 0 or reschedule_timeout < 0:
+        raise ValueError("Reschedule interval must be positive and timeout not negative")
+
+
+def _apply_many(apply: Callable[[Order], Order], orders: list[Order], max_workers: int, reschedule_interval: float, reschedule_timeout: float) -> list[Order | Exception]:
+    """
+    Apply an action to many orders concurrently.
+    The orders that can't be cancelled yet are repeated every reschedule_interval seconds,
+    without holding a worker while they wait.
+
+    :param apply: Function that applies the action to an order
+    :param orders: Orders to update
+    :param max_workers: Maximum number of requests sent at the same time
+    :param reschedule_interval: Seconds between the attempts of an order that can't be cancelled yet
+    :param reschedule_timeout: Seconds after which an order that can't be cancelled yet fails
+    :return: The updated order or the exception of every input order, in the same position
+    """
+    _check_batch_arguments(max_workers, reschedule_interval, reschedule_timeout)
+    results: list[Order | Exception | None] = [None] * len(orders)
+    deadline = time.monotonic() + reschedule_timeout
+    # Min-heap of (time of the next attempt, position of the order)
+    delayed: list[tuple[float, int]] = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending: dict[Future, int] = {executor.submit(apply, order): index for index, order in enumerate(orders)}
+        while pending or delayed:
+            timeout = max(delayed[0][0] - time.monotonic(), 0) if delayed else None
+            if pending:
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            else:
+                time.sleep(timeout)
+                done = ()
+            for future in done:
+                index = pending.pop(future)
+                try:
+                    results[index] = future.result()
+                except FiveSimError as e:
+                    retry_at = time.monotonic() + reschedule_interval
+                    if _is_reschedulable(e, retry_at, deadline):
+                        heapq.heappush(delayed, (retry_at, index))
+                    else:
+                        results[index] = e
+                except Exception as e:
+                    # Like the exceptions of the RequestHooks, returned in place of the order without aborting the batch
+                    results[index] = e
+            now = time.monotonic()
+            while delayed and delayed[0][0] <= now:
+                _, index = heapq.heappop(delayed)
+                pending[executor.submit(apply, orders[index])] = index
+    return results
+
+
+async def _apply_many_async(apply: Callable[[Order], Awaitable[Order]], orders: list[Order], max_workers: int, reschedule_interval: float, reschedule_timeout: float) -> list[Order | Exception]:
+    """
+    asyncio version of _apply_many, max_workers limits the requests running at the same time.
+    """
+    import asyncio
+    _check_batch_arguments(max_workers, reschedule_interval, reschedule_timeout)
+    deadline = time.monotonic() + reschedule_timeout
+    semaphore = asyncio.Semaphore(max_workers)
+
+    async def apply_one(order: Order) -> Order | Exception:
+        while True:
+            try:
+                async with semaphore:
+                    return await apply(order)
+            except FiveSimError as e:
+                if not _is_reschedulable(e, time.monotonic() + reschedule_interval, deadline):
+                    return e
+            except Exception as e:
+                return e
+            await asyncio.sleep(reschedule_interval)
+
+    return list(await asyncio.gather(*(apply_one(order) for order in orders)))
+
+
+class _PurchasePlan:
+    """
+    State shared by the workers of buy_many, it selects the candidate of every purchase
+    and decides when to stop. The price of a purchase in progress is reserved in the budget:
+    the price of a PriceEntry is known in advance, otherwise it's learned from the first order,
+    and until then only one purchase of that candidate is in progress.
+    """
+    # Returned by next when no purchase can start until one in progress ends
+    WAIT = object()
+
+    def __init__(self, count: int, candidates: list[PriceEntry | tuple[Country, Operator]], max_spend: float | None, max_failures: int) -> None:
+        if count < 0 or max_failures < 0:
+            raise ValueError("Count and failures can't be negative")
+        if len(candidates) == 0:
+            raise ValueError("At least one candidate is required")
+        self.count = count
+        self.candidates: list[tuple[Country, Operator]] = []
+        self.prices: dict[tuple[Country, Operator], float] = dict()
+        for candidate in candidates:
+            if isinstance(candidate, PriceEntry):
+                self.prices[(candidate.country, candidate.operator)] = candidate.price
+                candidate = (candidate.country, candidate.operator)
+            self.candidates.append(tuple(candidate))
+        self.max_spend = max_spend
+        self.max_failures = max_failures
+        self.orders: list[Order] = []
+        self.spent = 0.0
+        self.reserved = 0.0
+        self.in_progress = 0
+        self.probing: set[tuple[Country, Operator]] = set()
+        self.attempts = 0
+        self.failures: dict[ErrorType, int] = dict()
+        self.transient_failures = 0
+        self.stopped = False
+
+    def next(self) -> tuple[tuple[Country, Operator], float] | object | None:
+        """
+        Select the candidate of the next purchase with the price reserved for it,
+        WAIT if a purchase in progress has to end first, None when the workers have to stop.
+        """
+        if self.stopped or len(self.orders) >= self.count:
+            return None
+        if len(self.orders) + self.in_progress < self.count:
+            for candidate in self.candidates:
+                price = self.prices.get(candidate)
+                if self.max_spend is not None:
+                    if price is None and candidate in self.probing:
+                        continue
+                    if self.spent + self.reserved + (price or 0) > self.max_spend:
+                        continue
+                if price is None:
+                    self.probing.add(candidate)
+                self.in_progress += 1
+                self.attempts += 1
+                self.reserved += price or 0
+                return candidate, price or 0
+        return self.WAIT if self.in_progress > 0 else None
+
+    def record(self, candidate: tuple[Country, Operator], reserved: float, order: Order | None, error: FiveSimError | None) -> None:
+        """
+        Update the state with the result of a purchase.
+        Without order and error the purchase raised an exception that isn't a FiveSimError, which stops the workers.
+        """
+        self.in_progress -= 1
+        self.reserved -= reserved
+        self.probing.discard(candidate)
+        if order is not None:
+            self.orders.append(order)
+            self.spent += order.price
+            self.prices.setdefault(candidate, order.price)
+            if self.max_spend is not None and self.spent >= self.max_spend:
+                self.stopped = True
+            return
+        if error is None:
+            self.stopped = True
+            return
+        type = error.get_error()
+        self.failures[type] = self.failures.get(type, 0) + 1
+        if type in _CANDIDATE_ERRORS:
+            if candidate in self.candidates:
+                self.candidates.remove(candidate)
+        elif type in _TRANSIENT_ERRORS:
+            self.transient_failures += 1
+            if self.transient_failures > self.max_failures:
+                self.stopped = True
+        else:
+            self.stopped = True
+
+    def result(self) -> BulkPurchaseResult:
+        return BulkPurchaseResult(
+            orders=self.orders,
+            spent=self.spent,
+            attempts=self.attempts,
+            failures=self.failures
+        )
+
+
+def _buy_many(buy: Callable[[Country, Operator], Order], count: int, candidates: list[PriceEntry | tuple[Country, Operator]], max_spend: float | None, max_workers: int, max_failures: int) -> BulkPurchaseResult:
+    """
+    Buy many numbers concurrently, moving to the next candidate when one has no free phones.
+
+    :param buy: Function that buys a number from a country and operator
+    :param count: Number of orders to buy
+    :param candidates: Countries and operators in order of preference, with the price when known
+    :param max_spend: Maximum total price of the orders, None for no limit
+    :param max_workers: Maximum number of purchases in progress at the same time
+    :param max_failures: Number of network and server errors after which the purchases stop
+    :return: The orders bought with the statistics of the failures
+    :raises Exception: the first exception of buy that isn't a FiveSimError, after the purchases in progress end
+    """
+    if max_workers < 1:
+        raise ValueError("At least one worker is required")
+    plan = _PurchasePlan(count, candidates, max_spend, max_failures)
+    condition = threading.Condition()
+
+    def worker() -> None:
+        while True:
+            with condition:
+                selected = plan.next()
+                while selected is plan.WAIT:
+                    condition.wait()
+                    selected = plan.next()
+            if selected is None:
+                return
+            (country, operator), reserved = selected
+            order, error = None, None
+            try:
+                order = buy(country, operator)
+            except FiveSimError as e:
+                error = e
+            finally:
+                # Also for the other exceptions, raised by future.result, or the other workers wait forever
+                with condition:
+                    plan.record((country, operator), reserved, order, error)
+                    condition.notify_all()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for future in [executor.submit(worker) for _ in range(min(max_workers, count))]:
+            future.result()
+    return plan.result()
+
+
+async def _buy_many_async(buy: Callable[[Country, Operator], Awaitable[Order]], count: int, candidates: list[PriceEntry | tuple[Country, Operator]], max_spend: float | None, max_workers: int, max_failures: int) -> BulkPurchaseResult:
+    """
+    asyncio version of _buy_many, max_workers limits the purchases running at the same time.
+    """
+    import asyncio
+    if max_workers < 1:
+        raise ValueError("At least one worker is required")
+    plan = _PurchasePlan(count, candidates, max_spend, max_failures)
+    condition = asyncio.Condition()
+
+    async def worker() -> None:
+        while True:
+            async with condition:
+                selected = plan.next()
+                while selected is plan.WAIT:
+                    await condition.wait()
+                    selected = plan.next()
+            if selected is None:
+                return
+            (country, operator), reserved = selected
+            order, error = None, None
+            try:
+                order = await buy(country, operator)
+            except FiveSimError as e:
+                error = e
+            finally:
+                # Also for the other exceptions, raised by gather, or the other workers wait forever
+                async with condition:
+                    plan.record((country, operator), reserved, order, error)
+                    condition.notify_all()
+
+    await asyncio.gather(*(worker() for _ in range(min(max_workers, count))))
+    return plan.result()
@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable
+
+
+class ResponseCache:
+    """
+    In-memory LRU cache for the catalogue requests of the guest API.
+    Fresh entries are served directly, stale entries are served while a background thread refreshes them,
+    expired entries are loaded again before returning.
+    Cached results are shared between callers and must not be modified.
+    """
+    DEFAULT_TTL = {
+        "prices": 5.0,
+        "products": 5.0,
+        "countries": 3600.0
+    }
+
+    def __init__(self, ttl: dict[str, float] = None, stale_ttl: float = 30.0, max_size: int = 256) -> None:
+        """
+        :param ttl: Seconds an entry is fresh, for every endpoint (prices, products, countries)
+        :param stale_ttl: Seconds after the end of the TTL in which a stale entry is still served
+        :param max_size: Maximum number of entries, the least recently used are evicted first
+        """
+        if max_size < 1:
+            raise ValueError("Cache size must be at least 1")
+        self.__ttl = dict(self.DEFAULT_TTL)
+        if ttl is not None:
+            self.__ttl.update(ttl)
+        self.__stale_ttl = stale_ttl
+        self.__max_size = max_size
+        self.__entries: OrderedDict[Hashable, tuple[Any, float]] = OrderedDict()
+        self.__refreshing: set[Hashable] = set()
+        self.__lock = threading.Lock()
+
+    def get_or_load(self, key: tuple, loader: Callable[[], Any]) -> Any:
+        """
+        Get a value from the cache, loading it when it's missing or expired.
+
+        :param key: Key of the entry, the first element is the endpoint name
+        :param loader: Function that requests the value to the API
+        :return: The cached or loaded value
+        :raises FiveSimError: if the value had to be loaded and the request failed
+        """
+        ttl = self.__ttl.get(key[0], 0.0)
+        now = time.monotonic()
+        with self.__lock:
+            entry = self.__entries.get(key)
+            if entry is not None:
+                value, loaded_at = entry
+                age = now - loaded_at
+                if age < ttl + self.__stale_ttl:
+                    self.__entries.move_to_end(key)
+                    if age >= ttl and key not in self.__refreshing:
+                        self.__refreshing.add(key)
+                        threading.Thread(target=self.__refresh, args=(key, loader), daemon=True).start()
+                    return value
+        value = loader()
+        self.__store(key, value)
+        return value
+
+    def invalidate(self, endpoint: str = None) -> None:
+        """
+        Remove entries from the cache.
+
+        :param endpoint: Remove only the entries of this endpoint, None to remove all of them
+        """
+        with self.__lock:
+            if endpoint is None:
+                self.__entries.clear()
+            else:
+                for key in [key for key in self.__entries if key[0] == endpoint]:
+                    del self.__entries[key]
+
+    def __store(self, key: tuple, value: Any) -> None:
+        with self.__lock:
+            self.__entries[key] = (value, time.monotonic())
+            self.__entries.move_to_end(key)
+            while len(self.__entries) > self.__max_size:
+                self.__entries.popitem(last=False)
+
+    def __refresh(self, key: tuple, loader: Callable[[], Any]) -> None:
+        try:
+            self.__store(key, loader())
+        except:
+            # The stale value is served until it expires, the next request will try again
+            pass
+        finally:
+            with self.__lock:
+                self.__refreshing.discard(key)
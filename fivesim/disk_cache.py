@@ -0,0 +1,123 @@
+import sqlite3
+import threading
+import time
+from typing import Callable
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    fetched_at REAL NOT NULL
+);
+"""
+
+# Downloads a response given the validators of the stored copy, the body is None when it's not modified
+_Fetcher = Callable[[str | None, str | None], tuple[bytes | None, str | None, str | None]]
+
+
+class DiskCache:
+    """
+    Persistent SQLite cache for the catalogue of the guest API (countries and products),
+    so that a new process doesn't have to download it again.
+    The raw responses are stored with their ETag and Last-Modified headers: an entry older than
+    its max age is served immediately while a background thread revalidates it with a conditional request.
+    The file can be shared by many processes.
+    """
+    DEFAULT_MAX_AGE = {
+        "products": 300.0,
+        "countries": 86400.0
+    }
+
+    def __init__(self, path: str, max_age: dict[str, float] = None, max_stale: float = 7 * 86400.0) -> None:
+        """
+        :param path: Path of the SQLite database, created if it doesn't exist
+        :param max_age: Seconds an entry is fresh, for every endpoint (products, countries)
+        :param max_stale: Seconds after the max age in which a stale entry is still served, older entries are downloaded before returning
+        """
+        self.__max_age = dict(self.DEFAULT_MAX_AGE)
+        if max_age is not None:
+            self.__max_age.update(max_age)
+        self.__max_stale = max_stale
+        # The connection is used by the refresh threads too, the lock serializes it
+        self.__connection = sqlite3.connect(path, check_same_thread=False)
+        self.__connection.executescript(_SCHEMA)
+        self.__refreshing: set[str] = set()
+        self.__lock = threading.Lock()
+
+    def get_or_load(self, key: str, fetch: _Fetcher) -> bytes:
+        """
+        Get a response body, downloading it when it's missing or too old.
+
+        :param key: Key of the entry, the part before the first slash is the endpoint name
+        :param fetch: Function that downloads the response, given the ETag and Last-Modified of the stored copy
+        :return: The stored or downloaded body
+        :raises FiveSimError: if the body had to be downloaded and the request failed
+        """
+        max_age = self.__max_age.get(key.split("/", 1)[0], 0.0)
+        with self.__lock:
+            row = self.__connection.execute(
+                "SELECT body, etag, last_modified, fetched_at FROM responses WHERE key = ?",
+                (key,)
+            ).fetchone()
+            if row is not None:
+                body, etag, last_modified, fetched_at = row
+                age = time.time() - fetched_at
+                if age < max_age + self.__max_stale:
+                    if age >= max_age and key not in self.__refreshing:
+                        self.__refreshing.add(key)
+                        threading.Thread(target=self.__refresh, args=(key, fetch, body, etag, last_modified), daemon=True).start()
+                    return body
+        if row is None:
+            return self.__load(key, fetch, None, None, None)
+        return self.__load(key, fetch, row[0], row[1], row[2])
+
+    def invalidate(self, endpoint: str = None) -> None:
+        """
+        Remove entries from the cache.
+
+        :param endpoint: Remove only the entries of this endpoint, None to remove all of them
+        """
+        with self.__lock, self.__connection:
+            if endpoint is None:
+                self.__connection.execute("DELETE FROM responses")
+            else:
+                self.__connection.execute("DELETE FROM responses WHERE key = ? OR key LIKE ?", (endpoint, endpoint + "/%"))
+
+    def close(self) -> None:
+        """
+        Close the database.
+        """
+        with self.__lock:
+            self.__connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __load(self, key: str, fetch: _Fetcher, body: bytes | None, etag: str | None, last_modified: str | None) -> bytes:
+        new_body, new_etag, new_last_modified = fetch(etag, last_modified) if body is not None else fetch(None, None)
+        if new_body is None:
+            # Not modified, the stored copy is fresh again
+            new_body = body
+            new_etag = new_etag if new_etag is not None else etag
+            new_last_modified = new_last_modified if new_last_modified is not None else last_modified
+        with self.__lock, self.__connection:
+            self.__connection.execute(
+                "INSERT OR REPLACE INTO responses (key, body, etag, last_modified, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (key, new_body, new_etag, new_last_modified, time.time())
+            )
+        return new_body
+
+    def __refresh(self, key: str, fetch: _Fetcher, body: bytes, etag: str | None, last_modified: str | None) -> None:
+        try:
+            self.__load(key, fetch, body, etag, last_modified)
+        except:
+            # The stale copy is served until it's too old, the next request will try again
+            pass
+        finally:
+            with self.__lock:
+                self.__refreshing.discard(key)
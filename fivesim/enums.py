@@ -1,4 +1,7 @@
 from enum import Enum
+from fivesim.registry import CountrySymbol, HostingProductSymbol, OperatorSymbol, ProductSymbol, Symbol, _Registry, _register
+from types import MappingProxyType
+from typing import Mapping
 
 
 class OrderAction(str, Enum):
@@ -35,10 +38,18 @@ class Status(str, Enum):
         Create a new instance of the Status enum.
         :param status: the uppercase key
         """
-        try:
-            return cls[status]
-        except:
-            return Status.INVALID
+        return _STATUSES.get(status, Status.INVALID)
+
+
+class TimestampFormat(str, Enum):
+    """
+    DATETIME: Timezone aware datetime objects.
+    STRING: The ISO 8601 string returned by the API, without conversion.
+    EPOCH: Integer seconds since the Unix epoch.
+    """
+    DATETIME = 'datetime'
+    STRING = 'string'
+    EPOCH = 'epoch'
 
 
 class Language(str, Enum):
@@ -849,3 +860,31 @@ class ActivationProduct(str, Enum):
 
     def __str__(self) -> str:
         return self.value
+
+
+# Tables from the value used by the API to the enum member, get() returns None for the values that aren't known.
+# Countries, operators and products are registries: the parsers intern the unknown values as symbols
+# with their intern method, so that new identifiers aren't discarded
+_STATUSES: Mapping[str, Status] = MappingProxyType({member.name: member for member in Status})
+_CATEGORIES: Mapping[str, Category] = MappingProxyType({member.value: member for member in Category})
+_OPERATORS: _Registry = _register(Operator, OperatorSymbol)
+_COUNTRIES: _Registry = _register(Country, CountrySymbol)
+_HOSTING_PRODUCTS: _Registry = _register(HostingProduct, HostingProductSymbol)
+_ACTIVATION_PRODUCTS: _Registry = _register(ActivationProduct, ProductSymbol)
+
+
+def _intern_product(value: str, category: Category | None = None) -> ActivationProduct | HostingProduct | Symbol:
+    """
+    Get the member or the symbol of a product.
+
+    :param value: Product returned by the API
+    :param category: Category of the product, None when the response doesn't tell it:
+                     a value that isn't a hosting product already known is an activation product
+    """
+    if category == Category.HOSTING:
+        return _HOSTING_PRODUCTS.intern(value)
+    if category is None:
+        product = _HOSTING_PRODUCTS.find(value)
+        if product is not None:
+            return product
+    return _ACTIVATION_PRODUCTS.intern(value)
@@ -1,4 +1,6 @@
 from enum import Enum
+from types import MappingProxyType
+from typing import Mapping
 
 
 class ErrorType(str, Enum):
@@ -33,11 +35,11 @@ class ErrorType(str, Enum):
 
     @classmethod
     def contains(cls, value) -> bool:
-        try:
-            cls(value)
-        except:
-            return False
-        return True
+        return value in _ERROR_TYPES
+
+
+# Frozen table from the error text returned by the API to the enum member
+_ERROR_TYPES: Mapping[str, ErrorType] = MappingProxyType({member.value: member for member in ErrorType})
 
 
 class FiveSimError(Exception):
@@ -45,8 +47,9 @@ class FiveSimError(Exception):
     An error returned by the 5 SIM API.
     """
 
-    def __init__(self, type: ErrorType, description: str = None) -> None:
+    def __init__(self, type: ErrorType, description: str = None, retry_after: float | None = None) -> None:
         self.__type = type
+        self.__retry_after = retry_after
         super().__init__(description if description is not None else self.__type.value)
 
     def get_description(self) -> str:
@@ -54,3 +57,9 @@ class FiveSimError(Exception):
 
     def get_error(self) -> ErrorType:
         return self.__type
+
+    def get_retry_after(self) -> float | None:
+        """
+        Seconds to wait before repeating the request, when the server specified them.
+        """
+        return self.__retry_after
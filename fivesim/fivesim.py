@@ -1,12 +1,58 @@
 from fivesim.api import UserAPI, GuestAPI, VendorAPI
+from fivesim.cache import ResponseCache
+from fivesim.disk_cache import DiskCache
+from fivesim.enums import TimestampFormat
+from fivesim.hooks import RequestHooks
+from fivesim.json_backend import JSONBackend
+from fivesim.rate_limit import RateLimiter
+from fivesim.request import DEFAULT_BASE_URL, _HTTPTransport
+from fivesim.retry import RetryPolicy
 
 
 class FiveSim:
-    def __init__(self, api_key: str) -> None:
+    def __init__(self, api_key: str, pool_size: int = 10, keep_alive: bool = True, connect_timeout: float | None = None, read_timeout: float | None = None, rate_limiter: RateLimiter = None, retry_policy: RetryPolicy = None, cache: ResponseCache = None, timestamp_format: TimestampFormat = TimestampFormat.DATETIME, json_backend: JSONBackend = None, hooks: list[RequestHooks] = None, disk_cache: DiskCache = None, base_url: str = DEFAULT_BASE_URL) -> None:
+        """
+        :param api_key: 5SIM API key
+        :param pool_size: Maximum number of connections kept open to the API, shared by user, guest and vendor
+        :param keep_alive: Reuse the connections between requests
+        :param connect_timeout: Seconds to wait for the connection to be established, None to wait forever
+        :param read_timeout: Seconds to wait for the server response, None to wait forever
+        :param rate_limiter: Limiter that paces the requests of user, guest and vendor, None to disable it
+        :param retry_policy: Policy used to repeat the idempotent requests that failed, None to never repeat them
+        :param cache: Cache for the prices, products and countries of the guest API, None to disable it
+        :param timestamp_format: Representation of the timestamps in the orders, SMS and payments
+        :param json_backend: Backend used to encode and decode the JSON bodies, None to select the fastest one installed
+        :param hooks: Hooks called around every request of user, guest and vendor, like a MetricsCollector
+        :param disk_cache: Persistent cache for the products and countries of the guest API, None to disable it
+        :param base_url: URL of the API version, like the one of a local stub server for the benchmarks
+        """
         self.__api_key = api_key
-        self.user = UserAPI(api_key=self.__api_key)
-        self.guest = GuestAPI(api_key=self.__api_key)
-        self.vendor = VendorAPI(api_key=self.__api_key)
+        self.__transport = _HTTPTransport(
+            pool_size=pool_size,
+            keep_alive=keep_alive,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+            rate_limiter=rate_limiter,
+            retry_policy=retry_policy,
+            json_backend=json_backend,
+            hooks=hooks,
+            base_url=base_url
+        )
+        self.user = UserAPI(api_key=self.__api_key, transport=self.__transport, timestamp_format=timestamp_format)
+        self.guest = GuestAPI(api_key=self.__api_key, transport=self.__transport, cache=cache, disk_cache=disk_cache)
+        self.vendor = VendorAPI(api_key=self.__api_key, transport=self.__transport, timestamp_format=timestamp_format)
+
+    def close(self) -> None:
+        """
+        Close the connections opened by the client.
+        """
+        self.__transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
 
     def __str__(self) -> str:
         return self.__api_key
@@ -0,0 +1,59 @@
+from contextvars import ContextVar
+from fivesim.errors import FiveSimError
+from typing import NamedTuple
+
+
+class RequestInfo(NamedTuple):
+    method: str
+    endpoint: str
+    url: str
+    attempt: int = 1
+
+
+class RequestHooks:
+    """
+    Base class of the hooks called around every HTTP request of a client.
+    The methods do nothing by default, override the ones you need.
+    They are called in the thread or task that sends the request, so they should return quickly;
+    an exception raised by a hook is propagated to the caller of the API.
+    """
+
+    def before_request(self, request: RequestInfo) -> None:
+        """
+        Called before the request is sent, after the rate limiter.
+        """
+
+    def after_response(self, request: RequestInfo, status_code: int, size: int, elapsed: float) -> None:
+        """
+        Called when a response is received, before its status is checked.
+
+        :param status_code: HTTP status code of the response
+        :param size: Bytes received in the body
+        :param elapsed: Seconds spent waiting for the response
+        """
+
+    def on_error(self, request: RequestInfo, error: FiveSimError, elapsed: float) -> None:
+        """
+        Called when the request fails, the original exception is chained as error.__cause__.
+
+        :param elapsed: Seconds spent since the request was sent
+        """
+
+    def after_parse(self, request: RequestInfo, elapsed: float) -> None:
+        """
+        Called when the body of a successful response is parsed.
+
+        :param elapsed: Seconds spent decoding the JSON and building the response objects
+        """
+
+
+# Last request completed in the current thread or task, used to attribute the parse time to its endpoint
+_last_request: ContextVar[RequestInfo | None] = ContextVar("_last_request", default=None)
+
+
+def _endpoint_name(endpoint: str, name: str) -> str:
+    """
+    Name of the endpoint used in the metrics, like user/check: the API followed by the first part of the path,
+    so that the IDs, countries and products in the path don't create a name for every request.
+    """
+    return endpoint.rstrip("/").rsplit("/", 1)[-1] + "/" + name.split("/", 1)[0].split("?", 1)[0]
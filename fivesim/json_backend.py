@@ -0,0 +1,123 @@
+import json
+from typing import Any, Callable
+
+
+def _apply_object_hook(value: Any, hook: Callable[[dict], Any]) -> Any:
+    """
+    Apply an object hook to every object of a decoded document, from the innermost to the outermost,
+    like json.loads does when the hook is passed to the decoder.
+    """
+    value_type = type(value)
+    if value_type is dict:
+        for key, item in value.items():
+            item_type = type(item)
+            if item_type is dict or item_type is list:
+                value[key] = _apply_object_hook(item, hook)
+        return hook(value)
+    if value_type is list:
+        for index, item in enumerate(value):
+            item_type = type(item)
+            if item_type is dict or item_type is list:
+                value[index] = _apply_object_hook(item, hook)
+    return value
+
+
+class JSONBackend:
+    """
+    JSON encoder and decoder used for the API requests and responses.
+    The hooks used to build the response objects are applied after the decoding,
+    so any decoder that returns plain dictionaries and lists can be plugged in.
+    """
+    name = "json"
+
+    def loads(self, data: bytes, object_hook: Callable[[dict], Any] = None) -> Any:
+        """
+        Decode a response body.
+
+        :param data: Raw body of the response
+        :param object_hook: Function called with every decoded object, whose result replaces the object
+        :return: Decoded document
+        :raises ValueError: if the body isn't valid JSON
+        """
+        return json.loads(data, object_hook=object_hook)
+
+    def dumps(self, value: Any) -> bytes:
+        """
+        Encode a request body.
+
+        :param value: Document to encode
+        :return: Encoded body, as UTF-8
+        """
+        return json.dumps(value).encode()
+
+    def __repr__(self) -> str:
+        return "JSONBackend(" + self.name + ")"
+
+
+class OrjsonBackend(JSONBackend):
+    """
+    Backend based on orjson (pip install orjson).
+    """
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson
+        self.__orjson = orjson
+
+    def loads(self, data: bytes, object_hook: Callable[[dict], Any] = None) -> Any:
+        result = self.__orjson.loads(data)
+        return result if object_hook is None else _apply_object_hook(result, object_hook)
+
+    def dumps(self, value: Any) -> bytes:
+        return self.__orjson.dumps(value)
+
+
+class UjsonBackend(JSONBackend):
+    """
+    Backend based on ujson (pip install ujson).
+    """
+    name = "ujson"
+
+    def __init__(self) -> None:
+        import ujson
+        self.__ujson = ujson
+
+    def loads(self, data: bytes, object_hook: Callable[[dict], Any] = None) -> Any:
+        result = self.__ujson.loads(data)
+        return result if object_hook is None else _apply_object_hook(result, object_hook)
+
+    def dumps(self, value: Any) -> bytes:
+        return self.__ujson.dumps(value, ensure_ascii=False).encode()
+
+
+_BACKENDS = {
+    "orjson": OrjsonBackend,
+    "ujson": UjsonBackend,
+    "json": JSONBackend
+}
+
+_default_backend: JSONBackend | None = None
+
+
+def get_json_backend(name: str = None) -> JSONBackend:
+    """
+    Get a JSON backend.
+
+    :param name: orjson, ujson or json, None to select the fastest one installed
+    :return: The JSON backend
+    :raises ValueError: if the backend is unknown
+    :raises ImportError: if the library of the backend isn't installed
+    """
+    global _default_backend
+    if name is not None:
+        if name not in _BACKENDS:
+            raise ValueError("Unknown JSON backend " + name)
+        return _BACKENDS[name]()
+    if _default_backend is None:
+        for backend in _BACKENDS.values():
+            try:
+                _default_backend = backend()
+                break
+            except ImportError:
+                pass
+    return _default_backend
@@ -1,5 +1,9 @@
-import dateutil.parser
 from fivesim.enums import(
+    _ACTIVATION_PRODUCTS,
+    _CATEGORIES,
+    _COUNTRIES,
+    _OPERATORS,
+    _intern_product,
     ActivationProduct,
     Category,
     Country,
@@ -17,13 +21,16 @@ from fivesim.response import(
     ProfileInformation,
     SMS
 )
-from typing import Any
+from fivesim.timestamps import _parse_datetime
+from typing import Any, Callable
+
+_ACTIVATION = Category.ACTIVATION
 
 
 def _parse_guest_products(input: dict[str, dict[str, Any]]) -> Any:
     if "Category" in input:
         return ProductInformation(
-            category=Category(input["Category"]),
+            category=_CATEGORIES[input["Category"]],
             quantity=input["Qty"] if "Qty" in input else 0,
             price=input["Price"] if "Price" in input else 0
         )
@@ -31,59 +38,46 @@ def _parse_guest_products(input: dict[str, dict[str, Any]]) -> Any:
         result: dict[ActivationProduct |
                      HostingProduct, ProductInformation] = dict()
         for key, value in input.items():
-            try:
-                if value.category == Category.ACTIVATION:
-                    result[ActivationProduct(key)] = value
-                elif value.category == Category.HOSTING:
-                    result[HostingProduct(key)] = value
-            except:
-                pass
+            result[_intern_product(key, value.category)] = value
         return result
 
 
-def _parse_guest_prices(input: dict[str, dict[str, Any]]) -> Any:
-    if len(input) > 0:
-        if "count" in input:
-            return ProductInformation(
-                category=Category.ACTIVATION,
-                quantity=input["count"],
-                price=input["cost"]
-            )
+def _parse_guest_prices_information(input: dict[str, Any]) -> Any:
+    if "count" in input:
+        # Called for every cell of the catalogue, _make skips the keyword arguments handling
+        return ProductInformation._make((_ACTIVATION, input["count"], input["cost"]))
+    return input
 
-        result = dict()
-        hasProductInformation = isinstance(
-            next(iter(input.values())), ProductInformation
-        )
-        if not hasProductInformation:
-            # Get the first key of the first element, which is a dict
-            keyOfChildDictionary = next(
-                iter(next(iter(input.values())).keys())
-            )
 
-        for key, value in input.items():
-            try:
-                if hasProductInformation:
-                    result[Operator(key)] = value
-                elif isinstance(keyOfChildDictionary, Operator):
-                    try:
-                        result[Country(key)] = value
-                    except:
-                        result[ActivationProduct(key)] = value
-                elif isinstance(keyOfChildDictionary, Country):
-                    for key2, value2 in value.items():
-                        try:
-                            result[key2] = {ActivationProduct(key): value2}
-                        except:
-                            pass
-                elif isinstance(keyOfChildDictionary, ActivationProduct):
-                    result[Country(key)] = value
-                else:
-                    break
-            except:
-                pass
-        else:
-            return result
-    return input
+def _parse_guest_prices(input: dict[str, dict[str, dict[str, ProductInformation]]], by_product: bool) -> dict[Country, dict[ActivationProduct, dict[Operator, ProductInformation]]]:
+    """
+    Index the get_prices result by enum members, knowing the level of every dictionary.
+    The leaves have already been converted by _parse_guest_prices_information while decoding.
+    Every entry is removed from the decoded dictionaries as soon as it is converted, so the full catalogue
+    isn't kept twice in memory: the input is left empty.
+
+    :param input: Decoded JSON, indexed by [country][product][operator], or by [product][country][operator] when by_product is true
+    :param by_product: The response is indexed by product first, which happens when only the product filter is used
+    :return: The prices indexed by [Country][ActivationProduct][Operator]
+    """
+    result: dict[Country, dict[ActivationProduct, dict[Operator, ProductInformation]]] = dict()
+    outer_intern = _ACTIVATION_PRODUCTS.intern if by_product else _COUNTRIES.intern
+    inner_intern = _COUNTRIES.intern if by_product else _ACTIVATION_PRODUCTS.intern
+    operator_intern = _OPERATORS.intern
+    for key in list(input):
+        value = input.pop(key)
+        outer = outer_intern(key)
+        for key2 in list(value):
+            value2 = value.pop(key2)
+            inner = inner_intern(key2)
+            operators: dict[Operator, ProductInformation] = dict()
+            for key3, value3 in value2.items():
+                operators[operator_intern(key3)] = value3
+            if by_product:
+                result.setdefault(inner, dict())[outer] = operators
+            else:
+                result.setdefault(outer, dict())[inner] = operators
+    return result
 
 
 def _parse_guest_countries(input: dict[str, dict[str, Any]]) -> Any:
@@ -97,10 +91,7 @@ def _parse_guest_countries(input: dict[str, dict[str, Any]]) -> Any:
     elif len(input) > 0 and isinstance(next(iter(input.values())), CountryInformation):
         result: dict[Country, CountryInformation] = dict()
         for key, value in input.items():
-            try:
-                result[Country(key)] = value
-            except:
-                pass
+            result[_COUNTRIES.intern(key)] = value
         return result
     else:
         return input
@@ -129,7 +120,7 @@ def _parse_profile_data(input: dict[str, dict[str, Any]]) -> Any:
         )
 
 
-def _parse_payments_history(input: dict[str, dict[str, Any]]) -> Any:
+def _parse_payments_history(input: dict[str, dict[str, Any]], parse_timestamp: Callable[[str], Any] = _parse_datetime) -> Any:
     if "Name" in input:
         return input["Name"]
     elif "ID" in input:
@@ -139,7 +130,7 @@ def _parse_payments_history(input: dict[str, dict[str, Any]]) -> Any:
             provider=input["ProviderName"],
             amount=input["Amount"],
             balance=input["Balance"],
-            created_at=dateutil.parser.isoparse(input["CreatedAt"]),
+            created_at=parse_timestamp(input["CreatedAt"]),
         )
     else:
         return PaymentsHistory(
@@ -151,10 +142,10 @@ def _parse_payments_history(input: dict[str, dict[str, Any]]) -> Any:
         )
 
 
-def _parse_sms(input: dict[str, dict[str, Any]]) -> Any:
+def _parse_sms(input: dict[str, dict[str, Any]], parse_timestamp: Callable[[str], Any] = _parse_datetime) -> Any:
     return SMS(
-        created_at=dateutil.parser.isoparse(input["created_at"]),
-        received_at=dateutil.parser.isoparse(input["date"]),
+        created_at=parse_timestamp(input["created_at"]),
+        received_at=parse_timestamp(input["date"]),
         sender=input["sender"],
         text=input["text"],
         activation_code=input["code"],
@@ -163,25 +154,19 @@ def _parse_sms(input: dict[str, dict[str, Any]]) -> Any:
     )
 
 
-def _parse_order(input: dict[str, dict[str, Any]]) -> Any:
+def _parse_order(input: dict[str, dict[str, Any]], parse_timestamp: Callable[[str], Any] = _parse_datetime) -> Any:
     if "code" in input:
-        return _parse_sms(input)
-
-    try:
-        product = ActivationProduct(input["product"])
-    except:
-        try:
-            product = HostingProduct(input["product"])
-        except:
-            product = None
+        return _parse_sms(input, parse_timestamp)
+
+    product = _intern_product(input["product"])
     return Order(
         id=input["id"],
         phone=input["phone"],
-        created_at=dateutil.parser.isoparse(input["created_at"]),
-        expires_at=dateutil.parser.isoparse(input["expires"]),
+        created_at=parse_timestamp(input["created_at"]),
+        expires_at=parse_timestamp(input["expires"]),
         operator=input["operator"] if "operator" in input else None,
         product=product,
-        country=Country(input["country"]) if "country" in input else None,
+        country=_COUNTRIES.intern(input["country"]) if "country" in input else None,
         price=input["price"],
         status=Status.from_status_string(input["status"]),
         sms=input["sms"],
@@ -190,11 +175,11 @@ def _parse_order(input: dict[str, dict[str, Any]]) -> Any:
     )
 
 
-def _parse_orders_history(input: dict[str, dict[str, Any]]) -> Any:
+def _parse_orders_history(input: dict[str, dict[str, Any]], parse_timestamp: Callable[[str], Any] = _parse_datetime) -> Any:
     if "name" in input or "Name" in input:
         return input["Name"] if "Name" in input else input["name"]
     elif "phone" in input or "code" in input:
-        return _parse_order(input)
+        return _parse_order(input, parse_timestamp)
     else:
         return OrdersHistory(
             data=input["Data"],
@@ -204,8 +189,8 @@ def _parse_orders_history(input: dict[str, dict[str, Any]]) -> Any:
         )
 
 
-def _parse_sms_inbox(input: dict[str, dict[str, Any]]) -> Any:
+def _parse_sms_inbox(input: dict[str, dict[str, Any]], parse_timestamp: Callable[[str], Any] = _parse_datetime) -> Any:
     if "code" in input:
-        return _parse_sms(input)
+        return _parse_sms(input, parse_timestamp)
     else:
         return input["Data"]
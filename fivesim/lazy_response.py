@@ -0,0 +1,124 @@
+from fivesim.enums import _COUNTRIES, _intern_product, Status
+from fivesim.json_response import _parse_sms
+from fivesim.response import Order, OrdersHistory
+from fivesim.timestamps import _parse_datetime
+from typing import Any, Callable
+
+
+class _LazyField:
+    """
+    Attribute decoded from the raw JSON object on first access, then stored in a slot.
+    """
+
+    def __init__(self, decode: Callable[["LazyOrder"], Any]) -> None:
+        self.__decode = decode
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.__slot = "_" + name
+
+    def __get__(self, instance: "LazyOrder", owner: type) -> Any:
+        if instance is None:
+            return self
+        try:
+            return getattr(instance, self.__slot)
+        except AttributeError:
+            value = self.__decode(instance)
+            setattr(instance, self.__slot, value)
+            return value
+
+
+def _decode_product(order: "LazyOrder") -> Any:
+    return _intern_product(order._raw["product"])
+
+
+def _decode_sms(order: "LazyOrder") -> Any:
+    messages = order._raw["sms"]
+    if messages is None:
+        return None
+    return [_parse_sms(sms, order._parse_timestamp) for sms in messages]
+
+
+class LazyOrder:
+    """
+    Order that keeps the raw JSON object and decodes each field on first access.
+    It has the same attributes of Order, use to_order to get a real Order.
+    """
+    __slots__ = ("_raw", "_parse_timestamp", "_created_at", "_expires_at", "_status", "_product", "_country", "_sms")
+
+    def __init__(self, raw: dict[str, Any], parse_timestamp: Callable[[str], Any] = _parse_datetime) -> None:
+        """
+        :param raw: Order object decoded from the JSON, with the SMS still as dictionaries
+        :param parse_timestamp: Function that converts the timestamps
+        """
+        self._raw = raw
+        self._parse_timestamp = parse_timestamp
+
+    created_at = _LazyField(lambda order: order._parse_timestamp(order._raw["created_at"]))
+    expires_at = _LazyField(lambda order: order._parse_timestamp(order._raw["expires"]))
+    status = _LazyField(lambda order: Status.from_status_string(order._raw["status"]))
+    product = _LazyField(_decode_product)
+    country = _LazyField(lambda order: _COUNTRIES.intern(order._raw["country"]) if "country" in order._raw else None)
+    sms = _LazyField(_decode_sms)
+
+    @property
+    def id(self) -> int:
+        return self._raw["id"]
+
+    @property
+    def phone(self) -> str:
+        return self._raw["phone"]
+
+    @property
+    def price(self) -> float:
+        return self._raw["price"]
+
+    @property
+    def operator(self) -> str | None:
+        return self._raw.get("operator")
+
+    @property
+    def forwarding(self) -> bool | None:
+        return self._raw.get("forwarding")
+
+    @property
+    def forwarding_number(self) -> str | None:
+        return self._raw.get("forwarding_number")
+
+    def to_order(self) -> Order:
+        """
+        Decode all the fields into an Order.
+        """
+        return Order(
+            id=self.id,
+            phone=self.phone,
+            created_at=self.created_at,
+            expires_at=self.expires_at,
+            operator=self.operator,
+            product=self.product,
+            country=self.country,
+            price=self.price,
+            status=self.status,
+            sms=self.sms,
+            forwarding=self.forwarding,
+            forwarding_number=self.forwarding_number
+        )
+
+    def __repr__(self) -> str:
+        return "LazyOrder(id=" + repr(self.id) + ", phone=" + repr(self.phone) + ")"
+
+
+def _parse_orders_history_lazy(input: dict[str, dict[str, Any]], parse_timestamp: Callable[[str], Any] = _parse_datetime) -> Any:
+    if "name" in input or "Name" in input:
+        return input["Name"] if "Name" in input else input["name"]
+    elif "phone" in input:
+        return LazyOrder(input, parse_timestamp)
+    elif "code" in input:
+        # SMS are decoded by LazyOrder when its sms attribute is accessed
+        return input
+    else:
+        return OrdersHistory(
+            data=input["Data"],
+            order_product_names=input["ProductNames"],
+            order_statuses_names=input["Statuses"],
+            total=input["Total"]
+        )
@@ -0,0 +1,215 @@
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from fivesim.api import UserAPI
+from fivesim.enums import OrderAction
+from fivesim.errors import ErrorType, FiveSimError
+from fivesim.response import Order, SMS
+from fivesim.timestamps import _to_datetime
+from fivesim.waiter import SmsWaiter
+from typing import Callable
+
+
+def _seconds_to_expiry(order: Order) -> float | None:
+    """
+    Seconds left before the order expires, None if the expiration isn't known.
+    """
+    if order.expires_at is None or order.expires_at == datetime.min:
+        return None
+    expires_at = _to_datetime(order.expires_at)
+    now = datetime.now(timezone.utc) if expires_at.tzinfo is not None else datetime.now()
+    return (expires_at - now).total_seconds()
+
+
+class _ManagedOrder:
+    __slots__ = ("order", "future", "closing", "callbacks")
+
+    def __init__(self, order: Order) -> None:
+        self.order = order
+        self.future: Future = Future()
+        self.callbacks: list[Callable[[Order, SMS], None]] = []
+        # Set when the order is being finished or canceled, so that only one of the two happens
+        self.closing = False
+
+
+class OrderManager:
+    """
+    Manage the active orders until they end, to avoid the rating penalty of the timeouts.
+    The SMS are waited with a SmsWaiter, an order is finished as soon as it receives an SMS
+    and canceled shortly before it expires if it didn't receive any.
+    The orders are kept in a min-heap by expiration, so the requests only depend on the active orders.
+    """
+
+    def __init__(self, user: UserAPI, cancel_margin: float = 30.0, auto_finish: bool = True, waiter: SmsWaiter = None, max_workers: int = 4) -> None:
+        """
+        :param user: API used to check, finish and cancel the orders
+        :param cancel_margin: Seconds before the expiration in which an order without SMS is canceled
+        :param auto_finish: Finish the order when the first SMS is received
+        :param waiter: Waiter used for the SMS, None to create one with the default intervals
+        :param max_workers: Maximum number of finish and cancel requests in progress at the same time
+        """
+        if cancel_margin < 0:
+            raise ValueError("Cancel margin can't be negative")
+        self.__user = user
+        self.__cancel_margin = cancel_margin
+        self.__auto_finish = auto_finish
+        self.__owns_waiter = waiter is None
+        self.__waiter = waiter if waiter is not None else SmsWaiter(user)
+        self.__orders: dict[int, _ManagedOrder] = dict()
+        self.__expirations: list[tuple[float, int, int]] = []
+        self.__sequence = itertools.count()
+        self.__condition = threading.Condition()
+        self.__closed = False
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def add(self, order: Order, callback: Callable[[Order, SMS], None] = None) -> Future:
+        """
+        Start managing an order.
+        An order that is already managed isn't added twice: the callback is added to the ones of the order,
+        it's called for the SMS received from now on, and the Future of the first call is returned.
+
+        :param order: Order to manage, from buy_number or using from_order_id method
+        :param callback: Function called in a worker thread for every new SMS
+        :return: Future resolved with the last state of the order after it's finished or canceled,
+                 or with the FiveSimError that prevented it
+        """
+        with self.__condition:
+            if self.__closed:
+                raise RuntimeError("The manager is closed")
+            managed = self.__orders.get(order.id)
+            if managed is not None:
+                if callback is not None:
+                    managed.callbacks.append(callback)
+                return managed.future
+            managed = _ManagedOrder(order)
+            if callback is not None:
+                managed.callbacks.append(callback)
+            self.__orders[order.id] = managed
+            remaining = _seconds_to_expiry(order)
+            if remaining is not None:
+                cancel_at = time.monotonic() + remaining - self.__cancel_margin
+                heapq.heappush(self.__expirations, (cancel_at, next(self.__sequence), order.id))
+                self.__condition.notify()
+
+        def on_sms(order: Order, sms: SMS) -> None:
+            managed.order = order
+            with self.__condition:
+                callbacks = list(managed.callbacks)
+            for function in callbacks:
+                try:
+                    function(order, sms)
+                except:
+                    pass
+            self.__on_sms(managed)
+
+        self.__waiter.add(order, on_sms).add_done_callback(
+            lambda sms_future: self.__on_waiter_error(managed, sms_future)
+        )
+        return managed.future
+
+    def pending(self) -> int:
+        """
+        Number of orders that are still active.
+        """
+        with self.__condition:
+            return len(self.__orders)
+
+    def close(self) -> None:
+        """
+        Stop managing the orders, the futures of the orders still active are canceled.
+        The orders are left as they are on 5SIM.
+        """
+        with self.__condition:
+            if self.__closed:
+                return
+            self.__closed = True
+            orders = list(self.__orders.values())
+            self.__orders.clear()
+            self.__condition.notify_all()
+        self.__thread.join()
+        for managed in orders:
+            self.__waiter.remove(managed.order)
+            managed.future.cancel()
+        if self.__owns_waiter:
+            self.__waiter.close()
+        self.__executor.shutdown(wait=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __claim(self, managed: _ManagedOrder) -> bool:
+        # Only the first between the SMS and the expiration can close the order
+        with self.__condition:
+            if managed.closing or self.__orders.get(managed.order.id) is not managed:
+                return False
+            managed.closing = True
+            return True
+
+    def __release(self, managed: _ManagedOrder, order: Order | None, error: FiveSimError | None) -> None:
+        with self.__condition:
+            if self.__orders.get(managed.order.id) is managed:
+                del self.__orders[managed.order.id]
+        if managed.future.done():
+            return
+        if error is not None:
+            managed.future.set_exception(error)
+        else:
+            managed.future.set_result(order)
+
+    def __on_sms(self, managed: _ManagedOrder) -> None:
+        if not self.__claim(managed):
+            return
+        if self.__auto_finish:
+            self.__executor.submit(self.__apply, managed, OrderAction.FINISH)
+        else:
+            self.__release(managed, managed.order, None)
+
+    def __on_waiter_error(self, managed: _ManagedOrder, sms_future: Future) -> None:
+        # The order ended without SMS on 5SIM, there is nothing left to do
+        if sms_future.cancelled() or sms_future.exception() is None:
+            return
+        if self.__claim(managed):
+            self.__release(managed, None, sms_future.exception())
+
+    def __run(self) -> None:
+        with self.__condition:
+            while not self.__closed:
+                if len(self.__expirations) == 0:
+                    self.__condition.wait()
+                    continue
+                delay = self.__expirations[0][0] - time.monotonic()
+                if delay > 0:
+                    self.__condition.wait(delay)
+                    continue
+                _, _, order_id = heapq.heappop(self.__expirations)
+                managed = self.__orders.get(order_id)
+                if managed is not None and not managed.closing:
+                    managed.closing = True
+                    self.__executor.submit(self.__cancel, managed)
+
+    def __cancel(self, managed: _ManagedOrder) -> None:
+        self.__waiter.remove(managed.order)
+        self.__apply(managed, OrderAction.CANCEL)
+
+    def __apply(self, managed: _ManagedOrder, action: OrderAction) -> None:
+        try:
+            order = self.__user.order(action, managed.order)
+        except FiveSimError as e:
+            if action == OrderAction.CANCEL and e.get_error() == ErrorType.ORDER_HAS_SMS:
+                # The SMS arrived after the last check, the order can be finished instead
+                if self.__auto_finish:
+                    self.__apply(managed, OrderAction.FINISH)
+                else:
+                    self.__release(managed, managed.order, None)
+                return
+            self.__release(managed, None, e)
+            return
+        self.__release(managed, order, None)
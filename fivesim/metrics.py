@@ -0,0 +1,152 @@
+import bisect
+import threading
+from fivesim.errors import FiveSimError
+from fivesim.hooks import RequestHooks, RequestInfo
+
+# Upper bounds in seconds of the histogram buckets, the last bucket (+Inf) is implicit
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self, size: int) -> None:
+        # Not cumulative, the last element counts the values above every bound
+        self.counts = [0] * (size + 1)
+        self.sum = 0.0
+        self.count = 0
+
+
+class _EndpointMetrics:
+    __slots__ = ("latency", "parse", "status_codes", "bytes", "errors")
+
+    def __init__(self, size: int) -> None:
+        self.latency = _Histogram(size)
+        self.parse = _Histogram(size)
+        self.status_codes: dict[int, int] = dict()
+        self.bytes = 0
+        self.errors: dict[str, int] = dict()
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+class MetricsCollector(RequestHooks):
+    """
+    Hooks that record the metrics of the requests for every endpoint: network latency and parse time histograms,
+    HTTP status codes, bytes received and ErrorType of the failures.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        """
+        :param buckets: Upper bounds in seconds of the histogram buckets, in increasing order
+        """
+        if list(buckets) != sorted(buckets) or len(buckets) == 0:
+            raise ValueError("Buckets must be a non empty increasing sequence")
+        self.__buckets = tuple(buckets)
+        self.__endpoints: dict[str, _EndpointMetrics] = dict()
+        self.__lock = threading.Lock()
+
+    def __get(self, endpoint: str) -> _EndpointMetrics:
+        metrics = self.__endpoints.get(endpoint)
+        if metrics is None:
+            metrics = self.__endpoints[endpoint] = _EndpointMetrics(len(self.__buckets))
+        return metrics
+
+    def __observe(self, histogram: _Histogram, value: float) -> None:
+        histogram.counts[bisect.bisect_left(self.__buckets, value)] += 1
+        histogram.sum += value
+        histogram.count += 1
+
+    def after_response(self, request: RequestInfo, status_code: int, size: int, elapsed: float) -> None:
+        with self.__lock:
+            metrics = self.__get(request.endpoint)
+            self.__observe(metrics.latency, elapsed)
+            metrics.status_codes[status_code] = metrics.status_codes.get(status_code, 0) + 1
+            metrics.bytes += size
+
+    def on_error(self, request: RequestInfo, error: FiveSimError, elapsed: float) -> None:
+        name = error.get_error().name
+        with self.__lock:
+            metrics = self.__get(request.endpoint)
+            metrics.errors[name] = metrics.errors.get(name, 0) + 1
+
+    def after_parse(self, request: RequestInfo, elapsed: float) -> None:
+        with self.__lock:
+            self.__observe(self.__get(request.endpoint).parse, elapsed)
+
+    def reset(self) -> None:
+        """
+        Delete all the recorded metrics.
+        """
+        with self.__lock:
+            self.__endpoints.clear()
+
+    def to_dict(self) -> dict[str, dict]:
+        """
+        Get the metrics as a dictionary by endpoint.
+        The histograms contain the cumulative count of every bucket, by upper bound, with their sum and count.
+
+        :return: Dictionary like {"user/check": {"latency": {...}, "parse": {...}, "status_codes": {200: 3}, "bytes": 512, "errors": {}}}
+        """
+        with self.__lock:
+            return {
+                endpoint: {
+                    "latency": self.__histogram_dict(metrics.latency),
+                    "parse": self.__histogram_dict(metrics.parse),
+                    "status_codes": dict(metrics.status_codes),
+                    "bytes": metrics.bytes,
+                    "errors": dict(metrics.errors)
+                }
+                for endpoint, metrics in self.__endpoints.items()
+            }
+
+    def __histogram_dict(self, histogram: _Histogram) -> dict:
+        buckets: dict[float, int] = dict()
+        total = 0
+        for bound, count in zip(self.__buckets + (float("inf"),), histogram.counts):
+            total += count
+            buckets[bound] = total
+        return {"buckets": buckets, "sum": histogram.sum, "count": histogram.count}
+
+    def to_prometheus(self, prefix: str = "fivesim") -> str:
+        """
+        Get the metrics in the Prometheus text exposition format.
+
+        :param prefix: Prefix of the metric names
+        :return: Text to serve on the metrics endpoint
+        """
+        data = self.to_dict()
+        lines: list[str] = []
+        for field, name, description in (
+            ("latency", "request_duration_seconds", "Time spent waiting for the API responses"),
+            ("parse", "parse_duration_seconds", "Time spent parsing the API responses")
+        ):
+            lines.append("# HELP " + prefix + "_" + name + " " + description)
+            lines.append("# TYPE " + prefix + "_" + name + " histogram")
+            for endpoint, metrics in data.items():
+                histogram = metrics[field]
+                for bound, count in histogram["buckets"].items():
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(prefix + "_" + name + "_bucket{endpoint=\"" + _label(endpoint) + "\",le=\"" + le + "\"} " + str(count))
+                lines.append(prefix + "_" + name + "_sum{endpoint=\"" + _label(endpoint) + "\"} " + repr(histogram["sum"]))
+                lines.append(prefix + "_" + name + "_count{endpoint=\"" + _label(endpoint) + "\"} " + str(histogram["count"]))
+
+        lines.append("# HELP " + prefix + "_responses_total Responses received, by HTTP status code")
+        lines.append("# TYPE " + prefix + "_responses_total counter")
+        for endpoint, metrics in data.items():
+            for status_code, count in sorted(metrics["status_codes"].items()):
+                lines.append(prefix + "_responses_total{endpoint=\"" + _label(endpoint) + "\",code=\"" + str(status_code) + "\"} " + str(count))
+
+        lines.append("# HELP " + prefix + "_response_bytes_total Bytes received in the response bodies")
+        lines.append("# TYPE " + prefix + "_response_bytes_total counter")
+        for endpoint, metrics in data.items():
+            lines.append(prefix + "_response_bytes_total{endpoint=\"" + _label(endpoint) + "\"} " + str(metrics["bytes"]))
+
+        lines.append("# HELP " + prefix + "_errors_total Failed requests, by error type")
+        lines.append("# TYPE " + prefix + "_errors_total counter")
+        for endpoint, metrics in data.items():
+            for error, count in sorted(metrics["errors"].items()):
+                lines.append(prefix + "_errors_total{endpoint=\"" + _label(endpoint) + "\",error=\"" + error + "\"} " + str(count))
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,190 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from fivesim.enums import Category
+from fivesim.response import Order, OrdersHistory, Payment, PaymentsHistory
+from fivesim.timestamps import _as_utc, _to_datetime
+from typing import Any, Callable, Iterator
+
+
+def _iter_history(fetch_page: Callable[[int], OrdersHistory | PaymentsHistory], results_per_page: int, prefetch: bool, until_id: Any = None, until_date: datetime = None) -> Iterator[Any]:
+    """
+    Iterate over the rows of a paginated history, keeping at most two pages in memory.
+
+    :param fetch_page: Function that downloads a page, given its number
+    :param results_per_page: Number of rows requested for every page
+    :param prefetch: Download the next page in background while the current one is consumed
+    :param until_id: Stop before the row with this ID
+    :param until_date: Stop before the first row created before this date, a naive datetime is in UTC
+    """
+    if results_per_page < 1:
+        raise ValueError("At least one result per page is required")
+    if until_date is not None:
+        until_date = _as_utc(until_date)
+    executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+    try:
+        page_number = 0
+        next_page = executor.submit(fetch_page, page_number) if executor is not None else None
+        while True:
+            page = next_page.result() if next_page is not None else fetch_page(page_number)
+            last_page = len(page.data) < results_per_page or (page_number + 1) * results_per_page >= page.total
+            page_number += 1
+            next_page = executor.submit(fetch_page, page_number) if executor is not None and not last_page else None
+            for row in page.data:
+                if until_id is not None and row.id == until_id:
+                    return
+                if until_date is not None and _as_utc(_to_datetime(row.created_at)) < until_date:
+                    return
+                yield row
+            if last_page:
+                return
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _export_history(fetch_page: Callable[[int], OrdersHistory | PaymentsHistory], results_per_page: int, max_workers: int) -> list[Any]:
+    """
+    Download all the pages of a history concurrently, using the total of the first page.
+    The rows are returned in page order, without the duplicates caused by rows shifting between pages.
+
+    :param fetch_page: Function that downloads a page, given its number
+    :param results_per_page: Number of rows requested for every page
+    :param max_workers: Maximum number of pages downloaded at the same time
+    """
+    if results_per_page < 1 or max_workers < 1:
+        raise ValueError("Results per page and workers must be at least 1")
+    first_page = fetch_page(0)
+    pages = [first_page]
+    page_count = -(-first_page.total // results_per_page)
+    if page_count > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pages.extend(executor.map(fetch_page, range(1, page_count)))
+    # Rows added during the export can create new pages at the end
+    page_number = len(pages)
+    while len(pages[-1].data) == results_per_page:
+        pages.append(fetch_page(page_number))
+        page_number += 1
+
+    seen: set[Any] = set()
+    result: list[Any] = []
+    for page in pages:
+        for row in page.data:
+            if row.id not in seen:
+                seen.add(row.id)
+                result.append(row)
+    return result
+
+
+class _HistoryPagination:
+    """
+    Streaming iteration and bulk export of the orders and payments history,
+    for the API classes that implement get_orders_history and get_payments_history.
+    """
+
+    def iter_orders(self, category: Category, results_per_page: int = 100, order_by_field: str = None, reverse_order: bool = None, prefetch: bool = False, until_id: int = None, until_date: datetime = None, lazy: bool = False) -> Iterator[Order]:
+        """
+        Iterate over the orders history page by page.
+
+        :param category: Category of the orders requested
+        :param results_per_page: Number of orders downloaded with every request
+        :param order_by_field: Order the results by a specific field, default is "id"
+        :param reverse_order: Show the results in reverse order, use it to get the newest orders first
+        :param prefetch: Download the next page in background while the current one is consumed
+        :param until_id: Stop before the order with this ID
+        :param until_date: Stop before the first order created before this date, the orders have to be sorted from the newest.
+                           A naive datetime is in UTC, like the timestamps of the API
+        :param lazy: Return LazyOrder objects, which decode their fields on first access
+        :return: Iterator of Order objects
+        :raises FiveSimError: if a response is invalid
+        """
+        return _iter_history(
+            fetch_page=lambda page_number: self.get_orders_history(
+                category=category,
+                results_per_page=results_per_page,
+                page_number=page_number,
+                order_by_field=order_by_field,
+                reverse_order=reverse_order,
+                lazy=lazy
+            ),
+            results_per_page=results_per_page,
+            prefetch=prefetch,
+            until_id=until_id,
+            until_date=until_date
+        )
+
+    def iter_payments(self, results_per_page: int = 100, order_by_field: str = None, reverse_order: bool = None, prefetch: bool = False, until_id: str = None, until_date: datetime = None) -> Iterator[Payment]:
+        """
+        Iterate over the payments history page by page.
+
+        :param results_per_page: Number of payments downloaded with every request
+        :param order_by_field: Order the results by a specific field, default is "id"
+        :param reverse_order: Show the results in reverse order, use it to get the newest payments first
+        :param prefetch: Download the next page in background while the current one is consumed
+        :param until_id: Stop before the payment with this ID
+        :param until_date: Stop before the first payment created before this date, the payments have to be sorted from the newest.
+                           A naive datetime is in UTC, like the timestamps of the API
+        :return: Iterator of Payment objects
+        :raises FiveSimError: if a response is invalid
+        """
+        return _iter_history(
+            fetch_page=lambda page_number: self.get_payments_history(
+                results_per_page=results_per_page,
+                page_number=page_number,
+                order_by_field=order_by_field,
+                reverse_order=reverse_order
+            ),
+            results_per_page=results_per_page,
+            prefetch=prefetch,
+            until_id=until_id,
+            until_date=until_date
+        )
+
+    def export_orders(self, category: Category, results_per_page: int = 100, order_by_field: str = None, reverse_order: bool = None, max_workers: int = 4, lazy: bool = False) -> list[Order]:
+        """
+        Download the complete orders history, requesting the pages concurrently.
+        Keep the default order by ID, so that new orders are added at the end and don't shift the other pages.
+
+        :param category: Category of the orders requested
+        :param results_per_page: Number of orders downloaded with every request
+        :param order_by_field: Order the results by a specific field, default is "id"
+        :param reverse_order: Show the results in reverse order (has to do with the previous one)
+        :param max_workers: Maximum number of pages downloaded at the same time
+        :param lazy: Return LazyOrder objects, which decode their fields on first access
+        :return: List of all the orders, in page order and without duplicates
+        :raises FiveSimError: if a response is invalid
+        """
+        return _export_history(
+            fetch_page=lambda page_number: self.get_orders_history(
+                category=category,
+                results_per_page=results_per_page,
+                page_number=page_number,
+                order_by_field=order_by_field,
+                reverse_order=reverse_order,
+                lazy=lazy
+            ),
+            results_per_page=results_per_page,
+            max_workers=max_workers
+        )
+
+    def export_payments(self, results_per_page: int = 100, order_by_field: str = None, reverse_order: bool = None, max_workers: int = 4) -> list[Payment]:
+        """
+        Download the complete payments history, requesting the pages concurrently.
+        Keep the default order by ID, so that new payments are added at the end and don't shift the other pages.
+
+        :param results_per_page: Number of payments downloaded with every request
+        :param order_by_field: Order the results by a specific field, default is "id"
+        :param reverse_order: Show the results in reverse order (has to do with the previous one)
+        :param max_workers: Maximum number of pages downloaded at the same time
+        :return: List of all the payments, in page order and without duplicates
+        :raises FiveSimError: if a response is invalid
+        """
+        return _export_history(
+            fetch_page=lambda page_number: self.get_payments_history(
+                results_per_page=results_per_page,
+                page_number=page_number,
+                order_by_field=order_by_field,
+                reverse_order=reverse_order
+            ),
+            results_per_page=results_per_page,
+            max_workers=max_workers
+        )
@@ -0,0 +1,214 @@
+import numpy
+from fivesim.enums import(
+    _ACTIVATION_PRODUCTS,
+    _COUNTRIES,
+    _OPERATORS,
+    ActivationProduct,
+    Category,
+    Country,
+    Operator
+)
+from fivesim.response import PriceEntry, ProductInformation
+from typing import Any
+
+
+class PriceMatrix:
+    """
+    Columnar representation of the get_prices result.
+    Every row is a (country, product, operator) cell: the members are stored as integer codes,
+    prices and quantities in contiguous NumPy arrays, so that the queries are vectorized.
+    It requires the optional numpy dependency (pip install fivesim[numpy]).
+    """
+
+    def __init__(self, countries: list[Country], products: list[ActivationProduct], operators: list[Operator], country_codes: numpy.ndarray, product_codes: numpy.ndarray, operator_codes: numpy.ndarray, prices: numpy.ndarray, quantities: numpy.ndarray) -> None:
+        """
+        :param countries: Country of every country code
+        :param products: Product of every product code
+        :param operators: Operator of every operator code
+        :param country_codes: Country code of every row
+        :param product_codes: Product code of every row
+        :param operator_codes: Operator code of every row
+        :param prices: Price of every row
+        :param quantities: Available numbers of every row
+        """
+        self.countries = countries
+        self.products = products
+        self.operators = operators
+        self.country_codes = country_codes
+        self.product_codes = product_codes
+        self.operator_codes = operator_codes
+        self.prices = prices
+        self.quantities = quantities
+        self.__country_index = {country: code for code, country in enumerate(countries)}
+        self.__product_index = {product: code for code, product in enumerate(products)}
+        self.__operator_index = {operator: code for code, operator in enumerate(operators)}
+
+    @classmethod
+    def _from_json(cls, input: dict[str, dict[str, dict[str, dict[str, Any]]]], by_product: bool):
+        """
+        Build the matrix from the decoded get_prices JSON, without creating an object for every cell.
+
+        :param input: Decoded JSON, indexed by [country][product][operator], or by [product][country][operator] when by_product is true
+        :param by_product: The response is indexed by product first
+        """
+        countries: dict[Country, int] = dict()
+        products: dict[ActivationProduct, int] = dict()
+        operators: dict[Operator, int] = dict()
+        country_codes: list[int] = []
+        product_codes: list[int] = []
+        operator_codes: list[int] = []
+        prices: list[float] = []
+        quantities: list[int] = []
+        outer_intern = _ACTIVATION_PRODUCTS.intern if by_product else _COUNTRIES.intern
+        inner_intern = _COUNTRIES.intern if by_product else _ACTIVATION_PRODUCTS.intern
+        for key, value in input.items():
+            outer = outer_intern(key)
+            for key2, value2 in value.items():
+                inner = inner_intern(key2)
+                country, product = (inner, outer) if by_product else (outer, inner)
+                country_code = countries.setdefault(country, len(countries))
+                product_code = products.setdefault(product, len(products))
+                for key3, value3 in value2.items():
+                    operator = _OPERATORS.intern(key3)
+                    country_codes.append(country_code)
+                    product_codes.append(product_code)
+                    operator_codes.append(operators.setdefault(operator, len(operators)))
+                    prices.append(value3["cost"])
+                    quantities.append(value3["count"])
+        return cls(
+            countries=list(countries),
+            products=list(products),
+            operators=list(operators),
+            country_codes=numpy.array(country_codes, dtype=numpy.int32),
+            product_codes=numpy.array(product_codes, dtype=numpy.int32),
+            operator_codes=numpy.array(operator_codes, dtype=numpy.int32),
+            prices=numpy.array(prices, dtype=numpy.float64),
+            quantities=numpy.array(quantities, dtype=numpy.int64)
+        )
+
+    @classmethod
+    def from_prices(cls, prices: dict[Country, dict[ActivationProduct, dict[Operator, ProductInformation]]]):
+        """
+        Build the matrix from the dictionary returned by GuestAPI.get_prices.
+        """
+        return cls._from_json(
+            input={
+                country.value: {
+                    product.value: {
+                        operator.value: {"cost": information.price, "count": information.quantity}
+                        for operator, information in operators.items()
+                    } for product, operators in products.items()
+                } for country, products in prices.items()
+            },
+            by_product=False
+        )
+
+    def __len__(self) -> int:
+        return len(self.prices)
+
+    def __entry(self, row: int) -> PriceEntry:
+        return PriceEntry(
+            country=self.countries[self.country_codes[row]],
+            product=self.products[self.product_codes[row]],
+            operator=self.operators[self.operator_codes[row]],
+            price=float(self.prices[row]),
+            quantity=int(self.quantities[row])
+        )
+
+    def __mask(self, country: Country = None, product: ActivationProduct = None, operator: Operator = None, min_quantity: int = 0, max_price: float = None) -> numpy.ndarray:
+        mask = self.quantities >= min_quantity
+        for value, index, codes in (
+            (country, self.__country_index, self.country_codes),
+            (product, self.__product_index, self.product_codes),
+            (operator, self.__operator_index, self.operator_codes)
+        ):
+            if value is not None:
+                if value not in index:
+                    return numpy.zeros(len(self), dtype=bool)
+                mask &= codes == index[value]
+        if max_price is not None:
+            mask &= self.prices <= max_price
+        return mask
+
+    def filter(self, country: Country = None, product: ActivationProduct = None, operator: Operator = None, min_quantity: int = 0, max_price: float = None):
+        """
+        Select the rows that match all the conditions.
+
+        :param country: Keep only this country
+        :param product: Keep only this product
+        :param operator: Keep only this operator
+        :param min_quantity: Minimum number of available numbers
+        :param max_price: Maximum price
+        :return: A new PriceMatrix, which shares the codes with this one
+        """
+        mask = self.__mask(country, product, operator, min_quantity, max_price)
+        return PriceMatrix(
+            countries=self.countries,
+            products=self.products,
+            operators=self.operators,
+            country_codes=self.country_codes[mask],
+            product_codes=self.product_codes[mask],
+            operator_codes=self.operator_codes[mask],
+            prices=self.prices[mask],
+            quantities=self.quantities[mask]
+        )
+
+    def cheapest(self, product: ActivationProduct, min_quantity: int = 1, max_price: float = None) -> PriceEntry | None:
+        """
+        Get the cheapest country and operator for a product.
+
+        :param product: Product to buy
+        :param min_quantity: Minimum number of available numbers
+        :param max_price: Maximum price
+        :return: The cheapest entry, None if there isn't one
+        """
+        rows = numpy.flatnonzero(self.__mask(product=product, min_quantity=min_quantity, max_price=max_price))
+        if len(rows) == 0:
+            return None
+        return self.__entry(rows[numpy.argmin(self.prices[rows])])
+
+    def top_k(self, product: ActivationProduct, k: int, min_quantity: int = 1, max_price: float = None) -> list[PriceEntry]:
+        """
+        Get the k cheapest countries and operators for a product.
+
+        :param product: Product to buy
+        :param k: Maximum number of entries
+        :param min_quantity: Minimum number of available numbers
+        :param max_price: Maximum price
+        :return: Entries sorted by price
+        """
+        rows = numpy.flatnonzero(self.__mask(product=product, min_quantity=min_quantity, max_price=max_price))
+        if k < len(rows):
+            rows = rows[numpy.argpartition(self.prices[rows], k)[:k]]
+        rows = rows[numpy.argsort(self.prices[rows], kind="stable")]
+        return [self.__entry(row) for row in rows]
+
+    def cheapest_by_product(self, min_quantity: int = 1, max_price: float = None) -> dict[ActivationProduct, PriceEntry]:
+        """
+        Get the cheapest country and operator of every product.
+
+        :param min_quantity: Minimum number of available numbers
+        :param max_price: Maximum price
+        :return: Dict with the cheapest entry of every product that has one
+        """
+        rows = numpy.flatnonzero(self.__mask(min_quantity=min_quantity, max_price=max_price))
+        # Sort by product and then by price, the first row of every product is the cheapest
+        rows = rows[numpy.lexsort((self.prices[rows], self.product_codes[rows]))]
+        _, first = numpy.unique(self.product_codes[rows], return_index=True)
+        return {
+            self.products[self.product_codes[row]]: self.__entry(row) for row in rows[first]
+        }
+
+    def to_dict(self) -> dict[Country, dict[ActivationProduct, dict[Operator, ProductInformation]]]:
+        """
+        Convert the matrix into the dictionary returned by GuestAPI.get_prices.
+        """
+        result: dict[Country, dict[ActivationProduct, dict[Operator, ProductInformation]]] = dict()
+        for row in range(len(self)):
+            entry = self.__entry(row)
+            result.setdefault(entry.country, dict()).setdefault(entry.product, dict())[entry.operator] = ProductInformation(
+                category=Category.ACTIVATION,
+                quantity=entry.quantity,
+                price=entry.price
+            )
+        return result
@@ -0,0 +1,146 @@
+import os
+import struct
+import threading
+import time
+from typing import NamedTuple
+
+
+class RateLimiterStats(NamedTuple):
+    requests: int
+    throttled: int
+    total_wait: float
+    max_wait: float
+
+
+class RateLimiter:
+    """
+    Token bucket that paces the requests sent to the API.
+    5SIM accepts at most 100 requests per second for every API key and IP address,
+    the default values never send more than 100 requests in any one second window.
+    """
+
+    def __init__(self, rate: float = 90, burst: int = 10) -> None:
+        """
+        :param rate: Requests per second allowed in the long run
+        :param burst: Maximum number of requests that can be sent together after an idle period
+        """
+        if rate <= 0 or burst < 1:
+            raise ValueError("Rate and burst must be positive")
+        self._rate = rate
+        self._burst = burst
+        self.__tokens = float(burst)
+        self.__updated_at = time.monotonic()
+        self.__lock = threading.Lock()
+        self.__requests = 0
+        self.__throttled = 0
+        self.__total_wait = 0.0
+        self.__max_wait = 0.0
+
+    def _take_token(self, tokens: float, updated_at: float, now: float) -> tuple[float, float]:
+        """
+        Take a token from the bucket, allowing the balance to go below zero:
+        the missing part is the time the caller has to wait.
+
+        :return: Tokens left in the bucket and seconds to wait
+        """
+        tokens = min(self._burst, tokens + (now - updated_at) * self._rate) - 1
+        return tokens, max(0.0, -tokens / self._rate)
+
+    def _reserve(self) -> float:
+        """
+        Reserve a slot for a request.
+
+        :return: Seconds to wait before sending the request
+        """
+        now = time.monotonic()
+        self.__tokens, wait = self._take_token(self.__tokens, self.__updated_at, now)
+        self.__updated_at = now
+        return wait
+
+    def reserve(self) -> float:
+        """
+        Reserve a slot for a request, without waiting.
+
+        :return: Seconds to wait before sending the request
+        """
+        with self.__lock:
+            wait = self._reserve()
+            self.__requests += 1
+            if wait > 0:
+                self.__throttled += 1
+                self.__total_wait += wait
+                self.__max_wait = max(self.__max_wait, wait)
+        return wait
+
+    def acquire(self) -> float:
+        """
+        Block until a request can be sent.
+
+        :return: Seconds waited
+        """
+        wait = self.reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        """
+        Wait, without blocking the event loop, until a request can be sent.
+
+        :return: Seconds waited
+        """
+        import asyncio
+        wait = self.reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def get_stats(self) -> RateLimiterStats:
+        """
+        Get the statistics about the requests paced by this limiter in the current process.
+        """
+        with self.__lock:
+            return RateLimiterStats(
+                requests=self.__requests,
+                throttled=self.__throttled,
+                total_wait=self.__total_wait,
+                max_wait=self.__max_wait
+            )
+
+
+class FileRateLimiter(RateLimiter):
+    """
+    Token bucket stored in a local file, to share the same limit between multiple processes
+    using the same API key or IP address. It relies on POSIX file locks.
+    """
+    __STATE = struct.Struct("dd")
+
+    def __init__(self, path: str, rate: float = 90, burst: int = 10) -> None:
+        """
+        :param path: File that holds the bucket state, created if it doesn't exist
+        :param rate: Requests per second allowed in the long run
+        :param burst: Maximum number of requests that can be sent together after an idle period
+        """
+        super().__init__(rate=rate, burst=burst)
+        self.__path = path
+
+    def _reserve(self) -> float:
+        import fcntl
+        # CLOCK_MONOTONIC is shared by all the processes of the machine
+        now = time.monotonic()
+        fd = os.open(self.__path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            state = os.pread(fd, self.__STATE.size, 0)
+            if len(state) == self.__STATE.size:
+                tokens, updated_at = self.__STATE.unpack(state)
+                # The file is older than the last boot
+                if updated_at > now:
+                    tokens, updated_at = float(self._burst), now
+            else:
+                tokens, updated_at = float(self._burst), now
+            tokens, wait = self._take_token(tokens, updated_at, now)
+            os.pwrite(fd, self.__STATE.pack(tokens, now), 0)
+        finally:
+            os.close(fd)
+        return wait
@@ -0,0 +1,138 @@
+import re
+from enum import Enum
+from typing import TYPE_CHECKING, Iterable
+
+if TYPE_CHECKING:
+    from fivesim.api import GuestAPI
+
+
+class Symbol(str):
+    """
+    Identifier returned by the API that isn't a member of the enums yet, like a new product or country.
+    It behaves like the enum members: it's equal to its value and has the value and name attributes,
+    so it can be used in the requests where an enum member is expected.
+    Every value is interned, so the symbols can be compared by identity too.
+    """
+    __slots__ = ()
+
+    @property
+    def value(self) -> str:
+        return str.__str__(self)
+
+    @property
+    def name(self) -> str:
+        # Same rules used to name the members of the enums
+        name = re.sub(r"[^0-9A-Za-z]", "_", self.value).upper()
+        return "N_" + name if name[:1].isdigit() else name
+
+    def get_name(self) -> str:
+        return self.name
+
+    def __str__(self) -> str:
+        return self.value
+
+    def __repr__(self) -> str:
+        return type(self).__name__ + "(" + str.__repr__(self) + ")"
+
+    def __reduce__(self):
+        return (_intern, (type(self), self.value))
+
+
+class CountrySymbol(Symbol):
+    __slots__ = ()
+
+
+class OperatorSymbol(Symbol):
+    __slots__ = ()
+
+
+class ProductSymbol(Symbol):
+    """
+    Activation product that isn't a member of ActivationProduct.
+    """
+    __slots__ = ()
+
+
+class HostingProductSymbol(Symbol):
+    """
+    Hosting product that isn't a member of HostingProduct.
+    """
+    __slots__ = ()
+
+
+class _Registry(dict):
+    """
+    Table from the value used by the API to the enum member.
+    Indexing it and get() see only the enum members, like a plain dictionary:
+    the parsers call intern to get a symbol for the values that aren't members,
+    and the symbols are kept apart from the members.
+    """
+
+    def __init__(self, members: Iterable[Enum], symbol_type: type[Symbol]) -> None:
+        super().__init__((member.value, member) for member in members)
+        self.symbol_type = symbol_type
+        self.__symbols: dict[str, Symbol] = dict()
+
+    def find(self, value: str) -> Enum | Symbol | None:
+        """
+        Get the member or the symbol already interned for a value, None if there isn't one.
+        """
+        member = self.get(value)
+        return member if member is not None else self.__symbols.get(value)
+
+    def intern(self, value: str) -> Enum | Symbol:
+        """
+        Get the member of a value, or its symbol, which is created the first time the value is seen.
+        """
+        member = self.get(value)
+        if member is not None:
+            return member
+        symbol = self.__symbols.get(value)
+        if symbol is None:
+            # setdefault is atomic, two threads interning the same value get the same symbol
+            symbol = self.__symbols.setdefault(value, self.symbol_type(value))
+        return symbol
+
+    def get_symbols(self) -> list[Symbol]:
+        return list(self.__symbols.values())
+
+
+_REGISTRIES: dict[type[Symbol], _Registry] = dict()
+
+
+def _register(members: Iterable[Enum], symbol_type: type[Symbol]) -> _Registry:
+    registry = _REGISTRIES[symbol_type] = _Registry(members, symbol_type)
+    return registry
+
+
+def _intern(symbol_type: type[Symbol], value: str) -> Enum | Symbol:
+    # Used to unpickle the symbols, importing the enums module creates the registries
+    import fivesim.enums  # noqa: F401
+    return _REGISTRIES[symbol_type].intern(value)
+
+
+def get_symbols() -> list[Symbol]:
+    """
+    Get the identifiers received from the API that aren't members of the enums.
+
+    :return: The symbols of the unknown countries, operators, activation and hosting products
+    """
+    return [symbol for registry in _REGISTRIES.values() for symbol in registry.get_symbols()]
+
+
+def refresh_registry(guest: "GuestAPI") -> list[Symbol]:
+    """
+    Download the countries, the prices and the products of all the categories, registering the identifiers
+    that aren't members of the enums, so that they can be used before they appear in an order.
+    The products are downloaded too since only their category tells the hosting products apart.
+
+    :param guest: Guest API used for the requests, a response served by its cache registers nothing new
+    :return: The symbols registered by this refresh
+    :raises FiveSimError: if a response is invalid
+    """
+    from fivesim.enums import Country, Operator
+    before = set(map(id, get_symbols()))
+    guest.get_countries()
+    guest.get_prices()
+    guest.get_products(Country.ANY_COUNTRY, Operator.ANY_OPERATOR)
+    return [symbol for symbol in get_symbols() if id(symbol) not in before]
@@ -1,94 +1,327 @@
-import json
-import requests
+import time
+from fivesim.enums import TimestampFormat
 from fivesim.errors import ErrorType, FiveSimError
-from typing import Any, Callable, Dict
+from fivesim.hooks import RequestHooks, RequestInfo, _endpoint_name, _last_request
+from fivesim.json_backend import JSONBackend, get_json_backend
+from fivesim.rate_limit import RateLimiter
+from fivesim.retry import RetryPolicy, _parse_retry_after
+from fivesim.single_flight import _SingleFlight
+from fivesim.timestamps import _with_timestamp_format
+from typing import TYPE_CHECKING, Any, Callable, Dict
+
+if TYPE_CHECKING:
+    import requests
+
+# URL of the API version used by the clients
+DEFAULT_BASE_URL = "https://5sim.net/v1/"
+
+
+class _HTTPTransport:
+    """
+    Connection-pooled HTTP transport, shared by all the API classes of a client
+    so that consecutive requests reuse the same keep-alive connections.
+    """
+
+    def __init__(self, pool_size: int = 10, keep_alive: bool = True, connect_timeout: float | None = None, read_timeout: float | None = None, rate_limiter: RateLimiter = None, retry_policy: RetryPolicy = None, json_backend: JSONBackend = None, hooks: list[RequestHooks] = None, base_url: str = DEFAULT_BASE_URL) -> None:
+        """
+        :param pool_size: Maximum number of connections kept open to the API host
+        :param keep_alive: Reuse the connections between requests
+        :param connect_timeout: Seconds to wait for the connection to be established, None to wait forever
+        :param read_timeout: Seconds to wait for the server response, None to wait forever
+        :param rate_limiter: Limiter that paces the requests, None to send them immediately
+        :param retry_policy: Policy used to repeat the idempotent requests that failed, None to never repeat them
+        :param json_backend: Backend used to encode and decode the JSON bodies, None to select the fastest one installed
+        :param hooks: Hooks called around every request, in order
+        :param base_url: URL of the API version, the user, guest and vendor endpoints are relative to it
+        """
+        if pool_size < 1:
+            raise ValueError("Pool size must be at least 1")
+        # requests is slow to import, it's loaded only when a client is created
+        import requests
+        from requests.adapters import HTTPAdapter
+        self.__session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.__session.mount("https://", adapter)
+        self.__session.mount("http://", adapter)
+        if not keep_alive:
+            self.__session.headers["Connection"] = "close"
+        self.__timeout = (connect_timeout, read_timeout)
+        self.__rate_limiter = rate_limiter
+        self.__retry_policy = retry_policy
+        self.__json_backend = json_backend if json_backend is not None else get_json_backend()
+        self.__hooks = tuple(hooks) if hooks is not None else ()
+        self.__base_url = base_url if base_url.endswith("/") else base_url + "/"
+
+    def request(self, method: str, url: str, headers: Dict[str, str], params: dict, data: bytes | None) -> "requests.Response":
+        """
+        Send an HTTP request using a pooled connection.
+
+        :param method: HTTP method, GET or POST
+        :param url: Complete URL of the resource
+        :return: The HTTP response
+        :raises requests.RequestException: if the request can't be completed
+        """
+        return self.__session.request(
+            method=method,
+            url=url,
+            headers=headers,
+            params=params,
+            data=data,
+            timeout=self.__timeout
+        )
+
+    def acquire(self) -> None:
+        """
+        Wait until the rate limiter allows a new request.
+        """
+        if self.__rate_limiter is not None:
+            self.__rate_limiter.acquire()
+
+    def get_retry_policy(self) -> RetryPolicy | None:
+        """
+        Get the policy used to repeat the idempotent requests.
+        """
+        return self.__retry_policy
+
+    def get_json_backend(self) -> JSONBackend:
+        """
+        Get the backend used to encode and decode the JSON bodies.
+        """
+        return self.__json_backend
+
+    def get_hooks(self) -> tuple[RequestHooks, ...]:
+        """
+        Get the hooks called around every request.
+        """
+        return self.__hooks
+
+    def get_base_url(self) -> str:
+        """
+        Get the URL of the API version, ending with a slash.
+        """
+        return self.__base_url
+
+    def close(self) -> None:
+        """
+        Close all the pooled connections.
+        """
+        self.__session.close()
+
+
+def _check_response(status_code: int, reason: str, body: bytes, retry_after: str | None = None) -> None:
+    """
+    Convert an unsuccessful API response into the matching error.
+
+    :param status_code: HTTP status code of the response
+    :param reason: HTTP reason phrase of the response
+    :param body: Raw body of the response
+    :param retry_after: Retry-After header of the response
+    :raises FiveSimError: if the response contains an error
+    """
+    if status_code >= 400:
+        if status_code == 401:
+            raise FiveSimError(ErrorType.INVALID_API_KEY)
+        if status_code == 429:
+            raise FiveSimError(ErrorType.API_KEY_LIMIT, retry_after=_parse_retry_after(retry_after))
+        if status_code == 503:
+            raise FiveSimError(ErrorType.LIMIT_ERROR, retry_after=_parse_retry_after(retry_after))
+
+        # The body is decoded only for the errors, successful responses go to the JSON decoder as bytes
+        text = body.decode(errors="replace")
+        if ErrorType.contains(text):
+            raise FiveSimError(ErrorType(text))
+        else:
+            raise FiveSimError(
+                ErrorType.OTHER,
+                str(status_code) + reason + text
+            )
+    elif body == b"no free phones":
+        raise FiveSimError(ErrorType.NO_FREE_PHONES)
 
 
 class _APIRequest:
-    def __init__(self, endpoint: str, auth_token: str) -> None:
-        self.__endpoint = endpoint
+    def __init__(self, endpoint: str, auth_token: str, transport: _HTTPTransport = None, timestamp_format: TimestampFormat = TimestampFormat.DATETIME) -> None:
         self.__authentication_token = auth_token
+        self.__transport = transport if transport is not None else _HTTPTransport()
+        self.__endpoint = self.__transport.get_base_url() + endpoint
+        self._timestamp_format = timestamp_format
+        self._json_backend = self.__transport.get_json_backend()
+        self._hooks = self.__transport.get_hooks()
+        self.__in_flight = _SingleFlight()
 
-    def __request(self, method: Callable[[Any], requests.Response], name: str, use_token: bool, params: dict, json_data: str | None) -> requests.Response:
+    def _timestamp_hook(self, hook: Callable[..., Any]) -> Callable[[dict], Any]:
+        """
+        Get a JSON object hook that converts the timestamps into the format selected for this API.
+        """
+        return _with_timestamp_format(hook, self._timestamp_format)
+
+    def __request(self, method: str, name: str, use_token: bool, params: dict, json_data: bytes | None, idempotent: bool, extra_headers: Dict[str, str] = None) -> "requests.Response":
+        retry_policy = self.__transport.get_retry_policy() if idempotent else None
+        if retry_policy is None:
+            return self.__send(method, name, use_token, params, json_data, 1, extra_headers)
+        retry_policy.record_request()
+        attempt = 1
+        while True:
+            try:
+                return self.__send(method, name, use_token, params, json_data, attempt, extra_headers)
+            except FiveSimError as e:
+                delay = retry_policy.get_retry_delay(e, attempt)
+                if delay is None:
+                    raise
+            time.sleep(delay)
+            attempt += 1
+
+    def __send(self, method: str, name: str, use_token: bool, params: dict, json_data: bytes | None, attempt: int, extra_headers: Dict[str, str] | None) -> "requests.Response":
         headers = {"Accept": "application/json"}
+        if extra_headers is not None:
+            headers.update(extra_headers)
         if use_token:
             headers["Authorization"] = "Bearer " + self.__authentication_token
+        url = self.__endpoint + name
+        request = RequestInfo(method=method, endpoint=_endpoint_name(self.__endpoint, name), url=url, attempt=attempt)
+        self.__transport.acquire()
+        for hook in self._hooks:
+            hook.before_request(request)
+        start = time.perf_counter()
         try:
-            response = method(
-                url=self.__endpoint + name,
-                headers=headers,
-                params=params,
-                data=json_data
-            )
-        except:
-            raise FiveSimError(ErrorType.REQUEST_ERROR)
-        if not response.ok:
-            if response.status_code == 401:
-                raise FiveSimError(ErrorType.INVALID_API_KEY)
-            if response.status_code == 429:
-                raise FiveSimError(ErrorType.API_KEY_LIMIT)
-            if response.status_code == 503:
-                raise FiveSimError(ErrorType.LIMIT_ERROR)
-
-            if ErrorType.contains(response.text):
-                raise FiveSimError(ErrorType(response.text))
-            else:
-                raise FiveSimError(
-                    ErrorType.OTHER,
-                    str(response.status_code) + response.reason + response.text
+            try:
+                response = self.__transport.request(
+                    method=method,
+                    url=url,
+                    headers=headers,
+                    params=params,
+                    data=json_data
                 )
-        elif response.text == "no free phones":
-            raise FiveSimError(ErrorType.NO_FREE_PHONES)
+            except Exception as e:
+                raise FiveSimError(ErrorType.REQUEST_ERROR) from e
+            for hook in self._hooks:
+                hook.after_response(request, response.status_code, len(response.content), time.perf_counter() - start)
+            _check_response(
+                status_code=response.status_code,
+                reason=response.reason,
+                body=response.content,
+                retry_after=response.headers.get("Retry-After")
+            )
+        except FiveSimError as e:
+            for hook in self._hooks:
+                hook.on_error(request, e, time.perf_counter() - start)
+            raise
+        _last_request.set(request)
         return response
 
-    def _GET(self, use_token: bool, path: list[str], parameters: Dict[str, str] = {}) -> str:
+    def _GET(self, use_token: bool, path: list[str], parameters: Dict[str, str] = {}, idempotent: bool = False) -> bytes:
         """
         Make a GET request to the API.
 
         :param use_token: Specify wheter to include the authentication token in the request
         :param path: Specify the part after the domain to invoke in the API
-        :return: The body of the response
+        :param idempotent: The request can be repeated safely when it fails.
+                           The idempotent requests without the token share the response with the identical ones in progress
+        :return: The raw body of the response
         :raises FiveSimError: if there is an error with the request
         """
-        return self.__request(
-            method=requests.get,
+        def send() -> bytes:
+            return self.__request(
+                method="GET",
+                name="/".join(path),
+                use_token=use_token,
+                params=parameters,
+                json_data=None,
+                idempotent=idempotent
+            ).content
+
+        if not idempotent or use_token:
+            return send()
+        body, request = self.__in_flight.do(
+            ("/".join(path), tuple(sorted(parameters.items()))),
+            lambda: (send(), _last_request.get())
+        )
+        # The parse time of a shared response is attributed to the request that received it
+        _last_request.set(request)
+        return body
+
+    def _GET_if_modified(self, path: list[str], etag: str | None, last_modified: str | None) -> tuple[bytes | None, str | None, str | None]:
+        """
+        Make a conditional GET request to the API, without the authentication token.
+
+        :param path: Specify the part after the domain to invoke in the API
+        :param etag: ETag of the copy already downloaded, None if unknown
+        :param last_modified: Last-Modified of the copy already downloaded, None if unknown
+        :return: The raw body, None if the copy is not modified, with the ETag and Last-Modified of the response
+        :raises FiveSimError: if there is an error with the request
+        """
+        headers: Dict[str, str] = dict()
+        if etag is not None:
+            headers["If-None-Match"] = etag
+        if last_modified is not None:
+            headers["If-Modified-Since"] = last_modified
+        response = self.__request(
+            method="GET",
             name="/".join(path),
-            use_token=use_token,
-            params=parameters,
-            json_data=None
-        ).text
+            use_token=False,
+            params={},
+            json_data=None,
+            idempotent=True,
+            extra_headers=headers
+        )
+        return (
+            None if response.status_code == 304 else response.content,
+            response.headers.get("ETag"),
+            response.headers.get("Last-Modified")
+        )
 
-    def _POST(self, use_token: bool, path: str, data: Dict[str, str]) -> str:
+    def _POST(self, use_token: bool, path: str, data: Dict[str, str]) -> bytes:
         """
         Make a POST request to the API.
 
         :param use_token: Specify wheter to include the authentication token in the request
         :param path: Specify the part after the domain to invoke in the API
-        :return: The body of the response
+        :return: The raw body of the response
         :raises FiveSimError: if there is an error with the request
         """
         return self.__request(
-            method=requests.post,
+            method="POST",
             name=path,
             use_token=use_token,
             params={},
-            json_data=json.dumps(data)
-        ).text
+            json_data=self._json_backend.dumps(data),
+            idempotent=False
+        ).content
+
+    def _report_parse(self, start: float, error: FiveSimError | None) -> None:
+        if not self._hooks:
+            return
+        request = _last_request.get()
+        if request is None:
+            return
+        elapsed = time.perf_counter() - start
+        for hook in self._hooks:
+            if error is None:
+                hook.after_parse(request, elapsed)
+            else:
+                hook.on_error(request, error, elapsed)
 
-    @classmethod
-    def _parse_json(cls, input: str, need_keys: list[str] = [], into_object: Callable[[dict], Any] = None) -> Dict:
+    def _parse_json(self, input: bytes, need_keys: list[str] = [], into_object: Callable[[dict], Any] = None) -> Dict:
         """
         Parse JSON into a generic dictionary.
 
         :param input: JSON data
+        :param into_object: Hook applied to every decoded object
         :return: Parsed dictionary
         :raises FiveSimError: when the requested keys aren't in the output
         """
+        start = time.perf_counter() if self._hooks else 0
         try:
-            result = json.loads(input, object_hook=into_object)
-        except Exception as e:
-            raise FiveSimError(ErrorType.INVALID_RESULT, e.message if hasattr(e, "message") else "")
+            try:
+                result = self._json_backend.loads(input, object_hook=into_object)
+            except Exception as e:
+                raise FiveSimError(ErrorType.INVALID_RESULT, e.message if hasattr(e, "message") else "") from e
+        except FiveSimError as error:
+            # Reported once raised, so the hooks see the original exception as its __cause__
+            self._report_parse(start, error)
+            raise
+        self._report_parse(start, None)
         for key in need_keys:
             if not key in result:
-                raise FiveSimError(ErrorType.INVALID_RESULT, input)
+                raise FiveSimError(ErrorType.INVALID_RESULT, input.decode(errors="replace"))
         return result
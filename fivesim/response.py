@@ -7,6 +7,7 @@ from fivesim.enums import(
     Operator,
     Status
 )
+from fivesim.errors import ErrorType
 from typing import NamedTuple
 
 
@@ -16,6 +17,14 @@ class ProductInformation(NamedTuple):
     price: float
 
 
+class PriceEntry(NamedTuple):
+    country: Country
+    product: ActivationProduct
+    operator: Operator
+    price: float
+    quantity: int
+
+
 class CountryInformation(NamedTuple):
     iso: str
     prefix: str
@@ -100,3 +109,10 @@ class OrdersHistory(NamedTuple):
     order_product_names: list[str]
     order_statuses_names: list[str]
     total: int
+
+
+class BulkPurchaseResult(NamedTuple):
+    orders: list[Order]
+    spent: float
+    attempts: int
+    failures: dict[ErrorType, int]
@@ -0,0 +1,87 @@
+import random
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from fivesim.errors import ErrorType, FiveSimError
+
+
+class RetryPolicy:
+    """
+    Retry policy with exponential backoff and full jitter for the idempotent requests.
+    A retry budget limits the retries to a fraction of the requests,
+    so that the client doesn't amplify the load during an outage.
+    """
+    DEFAULT_RETRY_ON = frozenset({
+        ErrorType.REQUEST_ERROR,
+        ErrorType.API_KEY_LIMIT,
+        ErrorType.LIMIT_ERROR,
+        ErrorType.SERVER_ERROR,
+        ErrorType.SERVER_OFFLINE
+    })
+
+    def __init__(self, max_attempts: int = 4, base_delay: float = 0.1, max_delay: float = 10.0, retry_on: frozenset[ErrorType] = DEFAULT_RETRY_ON, budget_ratio: float = 0.2, budget_reserve: int = 10) -> None:
+        """
+        :param max_attempts: Maximum number of attempts of a request, including the first one
+        :param base_delay: Seconds to wait before the first retry, doubled at every attempt
+        :param max_delay: Maximum seconds to wait before a retry, a longer Retry-After stops the retries
+        :param retry_on: Errors that are considered transient
+        :param budget_ratio: Retries allowed for every request once the reserve is spent
+        :param budget_reserve: Retries that can be done in a burst
+        """
+        if max_attempts < 1:
+            raise ValueError("At least one attempt is required")
+        self.__max_attempts = max_attempts
+        self.__base_delay = base_delay
+        self.__max_delay = max_delay
+        self.__retry_on = retry_on
+        self.__budget_ratio = budget_ratio
+        self.__budget_reserve = float(budget_reserve)
+        self.__budget = float(budget_reserve)
+        self.__lock = threading.Lock()
+
+    def record_request(self) -> None:
+        """
+        Notify a new request, which refills the retry budget.
+        """
+        with self.__lock:
+            self.__budget = min(self.__budget_reserve, self.__budget + self.__budget_ratio)
+
+    def get_retry_delay(self, error: FiveSimError, attempt: int) -> float | None:
+        """
+        Decide whether a failed request has to be repeated.
+
+        :param error: Error of the last attempt
+        :param attempt: Number of attempts already done
+        :return: Seconds to wait before the next attempt, or None to give up
+        """
+        if attempt >= self.__max_attempts or error.get_error() not in self.__retry_on:
+            return None
+        delay = random.uniform(0, min(self.__max_delay, self.__base_delay * 2 ** (attempt - 1)))
+        retry_after = error.get_retry_after()
+        if retry_after is not None:
+            if retry_after > self.__max_delay:
+                return None
+            delay = max(delay, retry_after)
+        with self.__lock:
+            if self.__budget < 1:
+                return None
+            self.__budget -= 1
+        return delay
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    """
+    Parse the value of a Retry-After header, in seconds or as an HTTP date.
+
+    :return: Seconds to wait, None if the header is missing or invalid
+    """
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except:
+        return None
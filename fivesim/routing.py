@@ -0,0 +1,177 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fivesim.batch import _CANDIDATE_ERRORS
+from fivesim.enums import ActivationProduct, Country, Operator, OrderAction
+from fivesim.errors import ErrorType, FiveSimError
+from fivesim.fivesim import FiveSim
+from fivesim.response import Order, PriceEntry
+from typing import NamedTuple
+
+
+class RoutingAttempt(NamedTuple):
+    country: Country
+    operator: Operator
+    price: float
+    latency: float
+    error: FiveSimError | None = None
+
+
+class RoutingResult(NamedTuple):
+    order: Order | None
+    attempts: list[RoutingAttempt]
+    extra_orders: tuple[Order, ...] = ()
+
+
+class CheapestNumberRouter:
+    """
+    Buy a product from the cheapest country and operator that still has numbers.
+    Prices are kept in an index refreshed periodically, and the pairs that have
+    just run out of numbers are skipped for a cooldown period.
+
+    Buying more candidates in parallel is opt-in and has a cost: all the orders bought in a step
+    except the cheapest one are canceled, every cancellation lowers the rating of the account,
+    and the API accepts it only some time after the purchase (CANCEL_NEEDS_TIME),
+    so a step with more than one order returns only after those cancellations.
+    """
+    # Errors caused by the selected country or operator, the next candidate can still succeed
+    CANDIDATE_ERRORS = _CANDIDATE_ERRORS
+
+    def __init__(self, client: FiveSim, refresh_interval: float = 5.0, cooldown: float = 60.0, parallel: int = 1, max_attempts: int = 10, reschedule_interval: float = 10.0, reschedule_timeout: float = 300.0) -> None:
+        """
+        :param client: Client used to get the prices and buy the numbers
+        :param refresh_interval: Seconds after which the prices of a product are downloaded again
+        :param cooldown: Seconds in which a country and operator without numbers is skipped
+        :param parallel: Candidates bought concurrently at every step, the most expensive successful orders are canceled.
+                         The default 1 never buys an order that is canceled
+        :param max_attempts: Maximum number of purchases tried for every call
+        :param reschedule_interval: Seconds between the cancellations of an extra order that can't be canceled yet
+        :param reschedule_timeout: Seconds after which an extra order that can't be canceled yet is returned in extra_orders
+        """
+        if parallel < 1 or max_attempts < 1:
+            raise ValueError("Parallel purchases and attempts must be at least 1")
+        if reschedule_interval <= 0 or reschedule_timeout < 0:
+            raise ValueError("Reschedule interval must be positive and timeout not negative")
+        self.__client = client
+        self.__refresh_interval = refresh_interval
+        self.__cooldown = cooldown
+        self.__parallel = parallel
+        self.__max_attempts = max_attempts
+        self.__reschedule_interval = reschedule_interval
+        self.__reschedule_timeout = reschedule_timeout
+        self.__prices: dict[ActivationProduct, tuple[float, list[PriceEntry]]] = dict()
+        self.__empty_until: dict[tuple[Country, Operator], float] = dict()
+        self.__lock = threading.Lock()
+
+    def get_candidates(self, product: ActivationProduct, max_price: float = None, countries: list[Country] = None) -> list[PriceEntry]:
+        """
+        Get the countries and operators that can be tried, sorted by price.
+
+        :param product: Product to buy
+        :param max_price: Maximum price of the number
+        :param countries: Buy only from these countries, None to use all of them
+        :return: Candidates with available numbers, not in cooldown
+        :raises FiveSimError: if the prices can't be downloaded
+        """
+        now = time.monotonic()
+        with self.__lock:
+            cached = self.__prices.get(product)
+        if cached is None or now - cached[0] >= self.__refresh_interval:
+            entries = [
+                PriceEntry(
+                    country=country,
+                    product=product,
+                    operator=operator,
+                    price=information.price,
+                    quantity=information.quantity
+                )
+                for country, products in self.__client.guest.get_prices(product=product).items()
+                for operator, information in products.get(product, dict()).items()
+            ]
+            entries.sort(key=lambda entry: entry.price)
+            cached = (now, entries)
+            with self.__lock:
+                self.__prices[product] = cached
+        with self.__lock:
+            empty_until = dict(self.__empty_until)
+        return [
+            entry for entry in cached[1]
+            if entry.quantity > 0
+            and (max_price is None or entry.price <= max_price)
+            and (countries is None or entry.country in countries)
+            and empty_until.get((entry.country, entry.operator), 0) <= now
+        ]
+
+    def mark_empty(self, country: Country, operator: Operator) -> None:
+        """
+        Skip a country and operator for the cooldown period.
+        """
+        with self.__lock:
+            self.__empty_until[(country, operator)] = time.monotonic() + self.__cooldown
+
+    def buy_cheapest(self, product: ActivationProduct, max_price: float = None, countries: list[Country] = None) -> RoutingResult:
+        """
+        Buy a product from the cheapest country and operator with available numbers.
+        The candidates are tried in price order until one succeeds, the walk stops
+        at the first error that doesn't depend on the candidate (like a low balance).
+
+        :param product: Product to buy
+        :param max_price: Maximum price of the number
+        :param countries: Buy only from these countries, None to use all of them
+        :return: The order, None if no candidate succeeded, with the list of attempts.
+                 Concurrent orders that couldn't be canceled within reschedule_timeout are in extra_orders.
+        :raises FiveSimError: if the prices can't be downloaded
+        """
+        candidates = self.get_candidates(product, max_price, countries)[:self.__max_attempts]
+        attempts: list[RoutingAttempt] = []
+        with ThreadPoolExecutor(max_workers=self.__parallel) as executor:
+            for start in range(0, len(candidates), self.__parallel):
+                step = candidates[start:start + self.__parallel]
+                results = list(executor.map(lambda entry: self.__try(entry, product), step))
+                orders = [order for order, _ in results if order is not None]
+                attempts.extend(attempt for _, attempt in results)
+                if len(orders) > 0:
+                    orders.sort(key=lambda order: order.price)
+                    return RoutingResult(
+                        order=orders[0],
+                        attempts=attempts,
+                        extra_orders=self.__cancel(orders[1:])
+                    )
+                if any(attempt.error.get_error() not in self.CANDIDATE_ERRORS for _, attempt in results):
+                    break
+        return RoutingResult(order=None, attempts=attempts)
+
+    def __try(self, entry: PriceEntry, product: ActivationProduct) -> tuple[Order | None, RoutingAttempt]:
+        start = time.perf_counter()
+        try:
+            order = self.__client.user.buy_number(
+                country=entry.country,
+                operator=entry.operator,
+                product=product
+            )
+            error = None
+        except FiveSimError as e:
+            order = None
+            error = e
+            if e.get_error() == ErrorType.NO_FREE_PHONES:
+                self.mark_empty(entry.country, entry.operator)
+        return order, RoutingAttempt(
+            country=entry.country,
+            operator=entry.operator,
+            price=entry.price,
+            latency=time.perf_counter() - start,
+            error=error
+        )
+
+    def __cancel(self, orders: list[Order]) -> tuple[Order, ...]:
+        if len(orders) == 0:
+            return ()
+        # The orders that can't be canceled yet are retried until reschedule_timeout
+        results = self.__client.user.order_many(
+            OrderAction.CANCEL,
+            orders,
+            max_workers=len(orders),
+            reschedule_interval=self.__reschedule_interval,
+            reschedule_timeout=self.__reschedule_timeout
+        )
+        return tuple(order for order, result in zip(orders, results) if isinstance(result, Exception))
@@ -0,0 +1,81 @@
+import threading
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Awaitable, Callable, Hashable, TypeVar
+
+if TYPE_CHECKING:
+    import asyncio
+
+T = TypeVar("T")
+
+
+class _SingleFlight:
+    """
+    Coalesces identical concurrent calls: while the call of a key is in progress, the other callers
+    of the same key wait for it and receive its result or its error instead of repeating it.
+    The result is shared between the callers, so it must not be modified.
+    """
+
+    def __init__(self) -> None:
+        self.__calls: dict[Hashable, Future] = dict()
+        self.__lock = threading.Lock()
+
+    def do(self, key: Hashable, function: Callable[[], T]) -> T:
+        """
+        Call the function, or wait for the call of the same key already in progress.
+
+        :param key: Key of the call, calls with equal keys must return the same result
+        :param function: Function called by the first caller
+        :return: The result of the function
+        """
+        with self.__lock:
+            future = self.__calls.get(key)
+            if future is None:
+                future = self.__calls[key] = Future()
+                leader = True
+            else:
+                leader = False
+        if not leader:
+            return future.result()
+        try:
+            result = function()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            # A call that starts from now on sends a new request
+            with self.__lock:
+                del self.__calls[key]
+        future.set_result(result)
+        return result
+
+
+class _AsyncSingleFlight:
+    """
+    asyncio version of _SingleFlight. The call runs in its own task,
+    so a caller that is cancelled doesn't cancel it for the others.
+    """
+
+    def __init__(self) -> None:
+        self.__calls: dict[Hashable, "asyncio.Task"] = dict()
+
+    async def do(self, key: Hashable, function: Callable[[], Awaitable[T]]) -> T:
+        """
+        Await the function, or the call of the same key already in progress.
+
+        :param key: Key of the call, calls with equal keys must return the same result
+        :param function: Function called by the first caller
+        :return: The result of the function
+        """
+        import asyncio
+        task = self.__calls.get(key)
+        if task is None:
+            task = self.__calls[key] = asyncio.ensure_future(function())
+            task.add_done_callback(lambda done: self.__done(key, done))
+        return await asyncio.shield(task)
+
+    def __done(self, key: Hashable, task: "asyncio.Task") -> None:
+        if self.__calls.get(key) is task:
+            del self.__calls[key]
+        if not task.cancelled():
+            # Retrieved here too, in case every caller has been cancelled
+            task.exception()
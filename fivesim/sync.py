@@ -0,0 +1,227 @@
+import sqlite3
+from datetime import datetime, timezone
+from fivesim.api import UserAPI, VendorAPI
+from fivesim.enums import _CATEGORIES, _COUNTRIES, _intern_product, Category, Status
+from fivesim.response import Order, Payment
+from fivesim.timestamps import _as_utc, _to_datetime
+from typing import NamedTuple
+
+# Orders in these states can still change, they are downloaded again at the next sync
+_OPEN_STATUSES = (Status.PENDING.name, Status.RECEIVED.name)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    id INTEGER PRIMARY KEY,
+    category TEXT NOT NULL,
+    phone TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    expires_at TEXT NOT NULL,
+    price REAL NOT NULL,
+    status TEXT NOT NULL,
+    product TEXT,
+    operator TEXT,
+    country TEXT
+);
+CREATE INDEX IF NOT EXISTS orders_created_at ON orders (created_at);
+CREATE TABLE IF NOT EXISTS payments (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    provider TEXT NOT NULL,
+    amount REAL NOT NULL,
+    balance REAL NOT NULL,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS payments_created_at ON payments (created_at);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    name TEXT PRIMARY KEY,
+    last_id TEXT NOT NULL,
+    last_created_at TEXT NOT NULL
+);
+"""
+
+
+class SyncCheckpoint(NamedTuple):
+    last_id: str
+    last_created_at: datetime
+
+
+class HistorySync:
+    """
+    Incremental copy of the orders and payments history in a local SQLite database.
+    Every sync downloads the history from the newest row and stops at the checkpoint
+    saved by the previous one, so its cost depends on the new rows only.
+    """
+
+    def __init__(self, api: UserAPI | VendorAPI, path: str, results_per_page: int = 100) -> None:
+        """
+        :param api: User or vendor API used to download the history
+        :param path: Path of the SQLite database, created if it doesn't exist
+        :param results_per_page: Number of rows downloaded with every request
+        """
+        self.__api = api
+        self.__results_per_page = results_per_page
+        self.__connection = sqlite3.connect(path)
+        self.__connection.executescript(_SCHEMA)
+
+    def sync_orders(self, category: Category) -> int:
+        """
+        Download the orders created or still open since the last sync.
+
+        :param category: Category of the orders
+        :return: Number of orders inserted or updated
+        :raises FiveSimError: if a response is invalid
+        """
+        checkpoint = self.get_checkpoint("orders:" + category.value)
+        stop_id = int(checkpoint.last_id) if checkpoint is not None else None
+        rows = []
+        for order in self.__api.iter_orders(
+            category=category,
+            results_per_page=self.__results_per_page,
+            order_by_field="id",
+            reverse_order=True
+        ):
+            if stop_id is not None and order.id < stop_id:
+                break
+            rows.append((
+                order.id,
+                category.value,
+                order.phone,
+                _to_datetime(order.created_at).isoformat(),
+                _to_datetime(order.expires_at).isoformat(),
+                order.price,
+                order.status.name,
+                order.product.value if order.product is not None else None,
+                order.operator,
+                order.country.value if order.country is not None else None
+            ))
+        with self.__connection:
+            self.__connection.executemany("INSERT OR REPLACE INTO orders VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            # The next sync restarts from the oldest open order, or from the newest order if all are closed
+            checkpoint_row = self.__connection.execute(
+                "SELECT id, created_at FROM orders WHERE category = ? AND status IN (?, ?) ORDER BY id LIMIT 1",
+                (category.value, *_OPEN_STATUSES)
+            ).fetchone()
+            if checkpoint_row is None:
+                checkpoint_row = self.__connection.execute(
+                    "SELECT id, created_at FROM orders WHERE category = ? ORDER BY id DESC LIMIT 1",
+                    (category.value,)
+                ).fetchone()
+            if checkpoint_row is not None:
+                self.__save_checkpoint("orders:" + category.value, str(checkpoint_row[0]), checkpoint_row[1])
+        return len(rows)
+
+    def sync_payments(self) -> int:
+        """
+        Download the payments created since the last sync.
+
+        :return: Number of payments inserted
+        :raises FiveSimError: if a response is invalid
+        """
+        checkpoint = self.get_checkpoint("payments")
+        rows = []
+        for payment in self.__api.iter_payments(
+            results_per_page=self.__results_per_page,
+            order_by_field="id",
+            reverse_order=True
+        ):
+            if checkpoint is not None and str(payment.id) == checkpoint.last_id:
+                break
+            rows.append((
+                str(payment.id),
+                payment.type,
+                payment.provider,
+                payment.amount,
+                payment.balance,
+                _to_datetime(payment.created_at).isoformat()
+            ))
+        with self.__connection:
+            self.__connection.executemany("INSERT OR REPLACE INTO payments VALUES (?, ?, ?, ?, ?, ?)", rows)
+            if len(rows) > 0:
+                self.__save_checkpoint("payments", rows[0][0], rows[0][5])
+        return len(rows)
+
+    def get_checkpoint(self, name: str) -> SyncCheckpoint | None:
+        """
+        Get the position where the next sync stops.
+
+        :param name: "payments", or "orders:" followed by the category
+        :return: The checkpoint, None if the history has never been synchronized
+        """
+        row = self.__connection.execute("SELECT last_id, last_created_at FROM checkpoints WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return None
+        return SyncCheckpoint(last_id=row[0], last_created_at=datetime.fromisoformat(row[1]))
+
+    def get_orders(self, category: Category = None, status: Status = None, since: datetime = None) -> list[Order]:
+        """
+        Query the local copy of the orders, from the newest.
+
+        :param category: Get only the orders of this category
+        :param status: Get only the orders with this status
+        :param since: Get only the orders created from this date, UTC if it's naive
+        :return: List of orders, without the SMS
+        """
+        query = "SELECT id, phone, created_at, expires_at, price, status, product, operator, country, category FROM orders WHERE 1 = 1"
+        params: list = []
+        if category is not None:
+            query += " AND category = ?"
+            params.append(category.value)
+        if status is not None:
+            query += " AND status = ?"
+            params.append(status.name)
+        if since is not None:
+            query += " AND created_at >= ?"
+            params.append(_as_utc(since).astimezone(timezone.utc).isoformat())
+        return [
+            Order(
+                id=row[0],
+                phone=row[1],
+                created_at=datetime.fromisoformat(row[2]),
+                expires_at=datetime.fromisoformat(row[3]),
+                price=row[4],
+                status=Status.from_status_string(row[5]),
+                product=_intern_product(row[6], _CATEGORIES.get(row[9])) if row[6] is not None else None,
+                operator=row[7],
+                country=_COUNTRIES.intern(row[8]) if row[8] is not None else None
+            )
+            for row in self.__connection.execute(query + " ORDER BY id DESC", params)
+        ]
+
+    def get_payments(self, since: datetime = None) -> list[Payment]:
+        """
+        Query the local copy of the payments, from the newest.
+
+        :param since: Get only the payments created from this date, UTC if it's naive
+        :return: List of payments
+        """
+        query = "SELECT id, type, provider, amount, balance, created_at FROM payments"
+        params: list = []
+        if since is not None:
+            query += " WHERE created_at >= ?"
+            params.append(_as_utc(since).astimezone(timezone.utc).isoformat())
+        return [
+            Payment(
+                id=row[0],
+                type=row[1],
+                provider=row[2],
+                amount=row[3],
+                balance=row[4],
+                created_at=datetime.fromisoformat(row[5])
+            )
+            for row in self.__connection.execute(query + " ORDER BY created_at DESC", params)
+        ]
+
+    def close(self) -> None:
+        """
+        Close the database.
+        """
+        self.__connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __save_checkpoint(self, name: str, last_id: str, last_created_at: str) -> None:
+        self.__connection.execute("INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?)", (name, last_id, last_created_at))
@@ -0,0 +1,4 @@
+# Support for the tests and the benchmarks, not part of the client API
+from fivesim.testing.stub_server import StubServer, record_fixtures
+
+__all__ = ["StubServer", "record_fixtures"]
@@ -0,0 +1,553 @@
+import hashlib
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from fivesim.enums import ActivationProduct, Country, HostingProduct, Operator
+from fivesim.errors import ErrorType
+from fivesim.request import DEFAULT_BASE_URL
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+from urllib.parse import parse_qsl, urlsplit
+
+# Endpoints downloaded by record_fixtures, with the API path and the authentication
+_RECORDED = (
+    ("guest/countries", "guest/countries", {}, False),
+    ("guest/prices", "guest/prices", {}, False),
+    ("guest/products", "guest/products/any/any", {}, False),
+    ("guest/flash", "guest/flash/en", {}, True),
+    ("user/profile", "user/profile", {}, True),
+    ("user/vendor", "user/vendor", {}, True),
+    ("user/orders", "user/orders", {"category": "activation"}, True),
+    ("user/payments", "user/payments", {}, True),
+    ("vendor/wallets", "vendor/wallets", {}, True),
+    ("vendor/orders", "vendor/orders", {"category": "activation"}, True),
+    ("vendor/payments", "vendor/payments", {}, True)
+)
+
+# Actions of the orders and the status they set
+_ACTIONS = {
+    "finish": "FINISHED",
+    "cancel": "CANCELED",
+    "ban": "BANNED"
+}
+
+
+def _timestamp(seconds: float) -> str:
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+def _default_fixtures() -> dict[str, Any]:
+    """
+    Built-in responses, with the format of the 5SIM API and a size close to the real one.
+    The values are generated from the enums with a fixed seed, so that every run sends the same bodies.
+    """
+    generator = random.Random(5)
+    now = _timestamp(time.time())
+    countries = [country for country in Country if country != Country.ANY_COUNTRY]
+    operators = [operator for operator in Operator if operator != Operator.ANY_OPERATOR]
+    # The most requested products, followed by the first ones of the enum
+    popular = [ActivationProduct(value) for value in ("telegram", "whatsapp", "google", "facebook", "instagram", "twitter")]
+    products = popular + [product for product in ActivationProduct if product not in popular][:34]
+
+    order = {
+        "id": 1,
+        "phone": "+447000000001",
+        "operator": "virtual21",
+        "product": "telegram",
+        "price": 12.5,
+        "status": "FINISHED",
+        "expires": now,
+        "sms": None,
+        "created_at": now,
+        "forwarding": False,
+        "forwarding_number": "",
+        "country": "england"
+    }
+    # One row every hour, sorted by ID like the default order of the API
+    start = time.time() - 21 * 3600
+    history_orders = [
+        dict(order, id=index, phone="+44700000" + str(1000 + index), created_at=_timestamp(start + index * 3600))
+        for index in range(1, 21)
+    ]
+    payments = [{
+        "ID": index,
+        "TypeName": "charge",
+        "ProviderName": "admin",
+        "Amount": 100,
+        "Balance": 100 * index,
+        "CreatedAt": _timestamp(start + index * 3600)
+    } for index in range(1, 21)]
+    profile = {
+        "id": 1,
+        "email": "stub@example.com",
+        "vendor": "stub",
+        "default_forwarding_number": "",
+        "balance": 100000,
+        "rating": 96,
+        "default_country": {"name": "england", "iso": "gb", "prefix": "+44"},
+        "default_operator": {"name": "any"},
+        "frozen_balance": 0
+    }
+    orders_history = {
+        "Data": history_orders,
+        "ProductNames": [{"ID": 1, "Name": "telegram"}],
+        "Statuses": [{"ID": 1, "Name": "FINISHED"}],
+        "Total": len(history_orders)
+    }
+    payments_history = {
+        "Data": payments,
+        "PaymentTypes": [{"ID": 1, "Name": "charge"}],
+        "PaymentProviders": [{"ID": 1, "Name": "admin"}],
+        "PaymentStatuses": [{"ID": 1, "Name": "complete"}],
+        "Total": len(payments)
+    }
+    products_information = {
+        product.value: {"Category": "activation", "Qty": generator.randint(0, 5000), "Price": generator.randint(1, 100)}
+        for product in products
+    }
+    products_information.update({
+        product.value: {"Category": "hosting", "Qty": generator.randint(0, 50), "Price": generator.randint(100, 5000)}
+        for product in HostingProduct
+    })
+    return {
+        "guest/countries": {
+            country.value: {
+                "iso": {country.value[:2]: 1},
+                "prefix": {"+" + str(index + 1): 1},
+                "text_en": country.value.capitalize(),
+                "text_ru": country.value.capitalize(),
+                "virtual21": {"activation": 1}
+            }
+            for index, country in enumerate(countries)
+        },
+        "guest/prices": {
+            country.value: {
+                product.value: {
+                    operator.value: {
+                        "cost": round(generator.uniform(1, 100), 2),
+                        "count": generator.randint(0, 5000),
+                        "rate": round(generator.uniform(0, 100), 2)
+                    }
+                    for operator in generator.sample(operators, 3)
+                }
+                for product in products
+            }
+            for country in countries
+        },
+        "guest/products": products_information,
+        "guest/flash": {"text": "Stub server notification"},
+        "user/profile": profile,
+        "user/vendor": profile,
+        "user/orders": orders_history,
+        "user/payments": payments_history,
+        "user/order": order,
+        "user/sms": {
+            "created_at": now,
+            "date": now,
+            "sender": "Stub",
+            "text": "Your code is 12345",
+            "code": "12345"
+        },
+        "vendor/wallets": {"fkwallet": 1500.5, "payeer": 20.0, "unitpay": 0},
+        "vendor/orders": orders_history,
+        "vendor/payments": payments_history
+    }
+
+
+def _load_fixtures(directory: str) -> dict[str, Any]:
+    """
+    Read the fixtures saved in a directory, like the ones of record_fixtures: the file of user/profile is user/profile.json.
+    """
+    fixtures: dict[str, Any] = dict()
+    for api in ("guest", "user", "vendor"):
+        folder = os.path.join(directory, api)
+        if not os.path.isdir(folder):
+            continue
+        for file_name in os.listdir(folder):
+            if file_name.endswith(".json"):
+                with open(os.path.join(folder, file_name), "rb") as file:
+                    fixtures[api + "/" + file_name[:-5]] = json.loads(file.read())
+    return fixtures
+
+
+def record_fixtures(directory: str, api_key: str, base_url: str = DEFAULT_BASE_URL) -> list[str]:
+    """
+    Download the responses of the endpoints that don't buy anything and save them as fixtures of the StubServer.
+    The endpoints that fail, like the vendor ones for an account that isn't a vendor, are skipped.
+
+    :param directory: Directory where the fixtures are saved, like directory/guest/prices.json
+    :param api_key: 5SIM API key
+    :param base_url: URL of the API version
+    :return: Names of the fixtures saved, like guest/prices
+    """
+    from fivesim.request import _HTTPTransport
+    transport = _HTTPTransport(base_url=base_url)
+    recorded: list[str] = []
+    try:
+        for name, path, params, use_token in _RECORDED:
+            headers = {"Accept": "application/json"}
+            if use_token:
+                headers["Authorization"] = "Bearer " + api_key
+            try:
+                response = transport.request("GET", transport.get_base_url() + path, headers, params, None)
+            except Exception:
+                continue
+            if response.status_code != 200 or response.content in (b"", b"null"):
+                continue
+            os.makedirs(os.path.join(directory, name.split("/")[0]), exist_ok=True)
+            with open(os.path.join(directory, name + ".json"), "wb") as file:
+                file.write(response.content)
+            recorded.append(name)
+    finally:
+        transport.close()
+    return recorded
+
+
+class _Handler(BaseHTTPRequestHandler):
+    # Keep-alive connections, like the real API
+    protocol_version = "HTTP/1.1"
+    # The headers and the body are written separately, with Nagle every response would wait for the delayed ACK
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        self.server.stub._handle(self, None)
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        self.server.stub._handle(self, self.rfile.read(length))
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class StubServer:
+    """
+    Local HTTP stand-in for the user, guest and vendor endpoints of the 5SIM API,
+    to benchmark and load test a client without paying for the requests:
+    pass get_base_url() as base_url of FiveSim or AsyncFiveSim.
+    The responses come from the built-in fixtures or from the ones saved by record_fixtures,
+    the orders bought are kept in memory so that they can be checked, finished, cancelled and banned.
+    Every response can be delayed and replaced by an error with the configured probability.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, latency: float = 0.0, jitter: float = 0.0, errors: dict[ErrorType, float] = None, retry_after: float = 1.0, fixtures: str = None, api_key: str = None, seed: int = None) -> None:
+        """
+        :param host: Address the server listens on
+        :param port: Port the server listens on, 0 to select a free one
+        :param latency: Seconds every response is delayed
+        :param jitter: Maximum random seconds added to the latency
+        :param errors: Probability of every error for each request, like {ErrorType.API_KEY_LIMIT: 0.01}.
+                       API_KEY_LIMIT is sent as 429, LIMIT_ERROR as 503, SERVER_ERROR as 500,
+                       NO_FREE_PHONES only to the purchases, the others as 400
+        :param retry_after: Seconds of the Retry-After header of the 429 and 503 responses
+        :param fixtures: Directory with the fixtures that replace the built-in ones, None to use only the built-in ones
+        :param api_key: The only API key accepted, None to accept any key
+        :param seed: Seed of the random latency and errors, None for a different sequence every run
+        """
+        if latency < 0 or jitter < 0:
+            raise ValueError("Latency and jitter can't be negative")
+        self.__latency = latency
+        self.__jitter = jitter
+        self.__errors = list((errors or dict()).items())
+        if sum(probability for _, probability in self.__errors) > 1:
+            raise ValueError("The sum of the error probabilities can't be greater than 1")
+        self.__retry_after = retry_after
+        self.__fixtures = _default_fixtures()
+        if fixtures is not None:
+            self.__fixtures.update(_load_fixtures(fixtures))
+        self.__api_key = api_key
+        self.__random = random.Random(seed)
+        self.__lock = threading.Lock()
+        self.__orders: dict[int, dict[str, Any]] = dict()
+        self.__order_ids = itertools.count(1000000)
+        self.__requests: dict[str, int] = dict()
+        # Errors forced on the next requests, before the random ones
+        self.__forced: list[ErrorType] = []
+        # Rendered bodies of the guest responses, which don't change, with their ETag
+        self.__rendered: dict[str, tuple[bytes, str]] = dict()
+        self.__server = ThreadingHTTPServer((host, port), _Handler)
+        self.__server.daemon_threads = True
+        self.__server.stub = self
+        self.__thread: threading.Thread | None = None
+
+    def get_base_url(self) -> str:
+        """
+        Get the URL to use as base_url of the clients.
+        """
+        host, port = self.__server.server_address[:2]
+        return "http://" + host + ":" + str(port) + "/v1/"
+
+    def fail_next(self, error: ErrorType, count: int = 1) -> None:
+        """
+        Answer the next requests with an error, whatever the configured probabilities.
+
+        :param error: Error sent, with the same status code used for the random errors
+        :param count: Number of requests that fail
+        """
+        with self.__lock:
+            self.__forced.extend([error] * count)
+
+    def get_request_count(self) -> dict[str, int]:
+        """
+        Get the number of requests received for every endpoint, like {"user/buy": 10}.
+        """
+        with self.__lock:
+            return dict(self.__requests)
+
+    def start(self) -> "StubServer":
+        """
+        Serve the requests in a background thread.
+
+        :return: This server
+        """
+        if self.__thread is None:
+            self.__thread = threading.Thread(target=self.__server.serve_forever, daemon=True)
+            self.__thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        """
+        Serve the requests in the current thread, until close is called.
+        """
+        self.__server.serve_forever()
+
+    def close(self) -> None:
+        """
+        Stop the server and close its socket.
+        """
+        if self.__thread is not None:
+            self.__server.shutdown()
+            self.__thread.join()
+            self.__thread = None
+        self.__server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def _handle(self, handler: BaseHTTPRequestHandler, body: bytes | None) -> None:
+        url = urlsplit(handler.path)
+        parts = url.path.strip("/").split("/")
+        if len(parts) < 3 or parts[0] != "v1":
+            self.__send(handler, 404, b"page not found")
+            return
+        api, name, arguments = parts[1], parts[2], parts[3:]
+        with self.__lock:
+            self.__requests[api + "/" + name] = self.__requests.get(api + "/" + name, 0) + 1
+            draw = self.__random.random()
+            forced = self.__forced.pop(0) if self.__forced else None
+            delay = self.__latency + (self.__random.uniform(0, self.__jitter) if self.__jitter > 0 else 0)
+        if delay > 0:
+            time.sleep(delay)
+
+        if api != "guest" and not self.__authorized(handler.headers.get("Authorization")):
+            self.__send(handler, 401, b"")
+            return
+        error = forced if forced is not None else self.__select_error(draw, name == "buy")
+        if error == ErrorType.API_KEY_LIMIT or error == ErrorType.LIMIT_ERROR:
+            self.__send(handler, 429 if error == ErrorType.API_KEY_LIMIT else 503, error.value.encode(), {"Retry-After": str(self.__retry_after)})
+            return
+        if error == ErrorType.NO_FREE_PHONES:
+            # The API returns it with a successful status
+            self.__send(handler, 200, error.value.encode())
+            return
+        if error is not None:
+            self.__send(handler, 500 if error == ErrorType.SERVER_ERROR else 400, error.value.encode())
+            return
+
+        if api == "guest":
+            key = url.path + "?" + url.query
+            rendered = self.__rendered.get(key)
+            if rendered is None:
+                status, content = self.__guest(name, arguments, dict(parse_qsl(url.query)))
+                if status != 200:
+                    self.__send(handler, status, content)
+                    return
+                rendered = self.__rendered[key] = (content, "\"" + hashlib.sha1(content).hexdigest()[:20] + "\"")
+            content, etag = rendered
+            if handler.headers.get("If-None-Match") == etag:
+                self.__send(handler, 304, b"", {"ETag": etag})
+            else:
+                self.__send(handler, 200, content, {"ETag": etag})
+            return
+        query = dict(parse_qsl(url.query))
+        status, content = self.__user(name, arguments, query) if api == "user" else self.__vendor(name, query, body)
+        self.__send(handler, status, content)
+
+    def __authorized(self, header: str | None) -> bool:
+        if header is None or not header.startswith("Bearer ") or len(header) == 7:
+            return False
+        return self.__api_key is None or header[7:] == self.__api_key
+
+    def __select_error(self, draw: float, purchase: bool) -> ErrorType | None:
+        for error, probability in self.__errors:
+            if draw < probability:
+                return error if error != ErrorType.NO_FREE_PHONES or purchase else None
+            draw -= probability
+        return None
+
+    def __send(self, handler: BaseHTTPRequestHandler, status: int, content: bytes, headers: dict[str, str] = None) -> None:
+        handler.send_response(status)
+        handler.send_header("Content-Type", "application/json" if content[:1] in (b"{", b"[") else "text/plain")
+        handler.send_header("Content-Length", str(len(content)))
+        for key, value in (headers or dict()).items():
+            handler.send_header(key, value)
+        handler.end_headers()
+        handler.wfile.write(content)
+
+    def __json(self, value: Any) -> tuple[int, bytes]:
+        return 200, json.dumps(value, separators=(",", ":")).encode()
+
+    def __guest(self, name: str, arguments: list[str], query: dict[str, str]) -> tuple[int, bytes]:
+        if name == "countries":
+            return self.__json(self.__fixtures["guest/countries"])
+        if name == "products" and len(arguments) == 2:
+            return self.__json(self.__fixtures["guest/products"])
+        if name == "flash" and len(arguments) == 1:
+            return self.__json(self.__fixtures["guest/flash"])
+        if name == "prices":
+            return self.__json(self.__filter_prices(query.get("country"), query.get("product")))
+        return 404, b"page not found"
+
+    def __filter_prices(self, country: str | None, product: str | None) -> dict | None:
+        prices: dict[str, dict] = self.__fixtures["guest/prices"]
+        if country is not None:
+            if country not in prices or (product is not None and product not in prices[country]):
+                return None
+            if product is None:
+                return {country: prices[country]}
+            return {country: {product: prices[country][product]}}
+        if product is not None:
+            # Only the product filter, the API indexes the result by product first
+            by_country = {key: value[product] for key, value in prices.items() if product in value}
+            return {product: by_country} if len(by_country) > 0 else None
+        return prices
+
+    def __history(self, name: str, query: dict[str, str]) -> tuple[int, bytes]:
+        history = self.__fixtures[name]
+        rows = history["Data"]
+        if query.get("reverse") == "true":
+            rows = rows[::-1]
+        # Like the API, offset is the number of rows skipped
+        start = int(query.get("offset", "0"))
+        rows = rows[start:start + int(query["limit"])] if "limit" in query else rows[start:]
+        return self.__json(dict(history, Data=rows))
+
+    def __user(self, name: str, arguments: list[str], query: dict[str, str]) -> tuple[int, bytes]:
+        if name in ("orders", "payments"):
+            return self.__history("user/" + name, query)
+        if name in ("profile", "vendor"):
+            return self.__json(self.__fixtures["user/" + name])
+        if name == "buy" and len(arguments) == 4:
+            return self.__json(self.__new_order(arguments[1], arguments[2], arguments[3], None))
+        if name == "reuse" and len(arguments) == 2:
+            return self.__json(self.__new_order(None, None, arguments[0], arguments[1]))
+        if name == "sms" and len(arguments) == 2 and arguments[0] == "inbox":
+            order = self.__get_order(arguments[1])
+            if order is None:
+                return 400, ErrorType.ORDER_NOT_FOUND.value.encode()
+            sms = order["sms"] or []
+            return self.__json({"Data": sms, "Total": len(sms)})
+        if name == "check" or name in _ACTIONS:
+            with self.__lock:
+                order = self.__get_order(arguments[0]) if len(arguments) == 1 else None
+                if order is None:
+                    return 400, ErrorType.ORDER_NOT_FOUND.value.encode()
+                if name == "check":
+                    if order["status"] == "PENDING":
+                        # The SMS arrives at the first check
+                        order["status"] = "RECEIVED"
+                        order["sms"] = [dict(self.__fixtures["user/sms"], created_at=_timestamp(time.time()))]
+                elif name == "cancel" and order["sms"]:
+                    return 400, ErrorType.ORDER_HAS_SMS.value.encode()
+                else:
+                    order["status"] = _ACTIONS[name]
+                return self.__json(order)
+        return 404, b"page not found"
+
+    def __vendor(self, name: str, query: dict[str, str], body: bytes | None) -> tuple[int, bytes]:
+        if name in ("orders", "payments"):
+            return self.__history("vendor/" + name, query)
+        if name == "wallets":
+            return self.__json(self.__fixtures["vendor/wallets"])
+        if name == "withdraw" and body is not None:
+            try:
+                json.loads(body)
+            except ValueError:
+                return 400, b"bad request"
+            return self.__json({"status": "ok"})
+        return 404, b"page not found"
+
+    def __get_order(self, id: str) -> dict[str, Any] | None:
+        return self.__orders.get(int(id)) if id.isdigit() else None
+
+    def __new_order(self, country: str | None, operator: str | None, product: str, phone: str | None) -> dict[str, Any]:
+        template = self.__fixtures["user/order"]
+        now = time.time()
+        with self.__lock:
+            id = next(self.__order_ids)
+            order = dict(
+                template,
+                id=id,
+                phone=phone if phone is not None else "+4470" + str(id),
+                operator=operator if operator not in (None, "any") else template["operator"],
+                product=product,
+                status="PENDING",
+                sms=None,
+                created_at=_timestamp(now),
+                expires=_timestamp(now + 900),
+                country=country if country not in (None, "any") else template["country"]
+            )
+            self.__orders[id] = order
+        return order
+
+
+def main() -> None:
+    import argparse
+    parser = argparse.ArgumentParser(description="Local stand-in for the 5SIM API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds every response is delayed")
+    parser.add_argument("--jitter", type=float, default=0.0, help="maximum random seconds added to the latency")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="probability of a 429 response for the API key limit (API_KEY_LIMIT)")
+    parser.add_argument("--ip-limit", type=float, default=0.0, help="probability of a 503 response for the IP address limit (LIMIT_ERROR)")
+    parser.add_argument("--server-error", type=float, default=0.0, help="probability of a 500 internal error response (SERVER_ERROR)")
+    parser.add_argument("--no-free-phones", type=float, default=0.0, help="probability of no free phones for a purchase")
+    parser.add_argument("--fixtures", help="directory with the recorded fixtures")
+    parser.add_argument("--record", metavar="DIRECTORY", help="record the fixtures from the real API, the key is read from FIVESIM_API_KEY")
+    args = parser.parse_args()
+
+    if args.record is not None:
+        for name in record_fixtures(args.record, os.environ["FIVESIM_API_KEY"]):
+            print("Recorded " + name)
+        return
+    server = StubServer(
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        errors={
+            ErrorType.API_KEY_LIMIT: args.rate_limit,
+            ErrorType.LIMIT_ERROR: args.ip_limit,
+            ErrorType.SERVER_ERROR: args.server_error,
+            ErrorType.NO_FREE_PHONES: args.no_free_phones
+        },
+        fixtures=args.fixtures
+    )
+    print("Serving the 5SIM stub on " + server.get_base_url())
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+if __name__ == "__main__":
+    main()
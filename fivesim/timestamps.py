@@ -0,0 +1,72 @@
+from datetime import datetime, timezone
+from fivesim.enums import TimestampFormat
+from functools import lru_cache, partial
+from typing import Any, Callable
+
+
+@lru_cache(maxsize=4096)
+def _parse_datetime(value: str) -> datetime:
+    """
+    Parse the ISO 8601 timestamps returned by the API, like 2022-06-01T12:30:45.123456789Z.
+    The fixed format is handled by datetime.fromisoformat, anything else by dateutil.
+    Results are memoized, since the same timestamp is often repeated in a response.
+    """
+    text = value
+    if text.endswith("Z"):
+        text = text[:-1] + "+00:00"
+    dot = text.find(".", 19)
+    if dot != -1:
+        end = dot + 1
+        while end < len(text) and text[end].isdigit():
+            end += 1
+        # fromisoformat accepts microseconds only, the API can return up to nanoseconds
+        if end - dot != 7:
+            text = text[:dot + 1] + (text[dot + 1:end] + "000000")[:6] + text[end:]
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        import dateutil.parser
+        return dateutil.parser.isoparse(value)
+
+
+@lru_cache(maxsize=4096)
+def _parse_epoch(value: str) -> int:
+    return int(_parse_datetime(value).timestamp())
+
+
+def _keep_string(value: str) -> str:
+    return value
+
+
+_TIMESTAMP_PARSERS: dict[TimestampFormat, Callable[[str], Any]] = {
+    TimestampFormat.DATETIME: _parse_datetime,
+    TimestampFormat.STRING: _keep_string,
+    TimestampFormat.EPOCH: _parse_epoch
+}
+
+
+def _to_datetime(value: datetime | str | int) -> datetime:
+    """
+    Convert a timestamp in any TimestampFormat into a datetime.
+    """
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str):
+        return _parse_datetime(value)
+    return datetime.fromtimestamp(value, timezone.utc)
+
+
+def _as_utc(value: datetime) -> datetime:
+    """
+    Treat a naive datetime as UTC, so it can be compared with the timestamps of the API.
+    """
+    return value.replace(tzinfo=timezone.utc) if value.tzinfo is None else value
+
+
+def _with_timestamp_format(hook: Callable[..., Any], timestamp_format: TimestampFormat) -> Callable[[dict], Any]:
+    """
+    Bind the parser of the requested timestamp format to a JSON object hook.
+    """
+    if timestamp_format == TimestampFormat.DATETIME:
+        return hook
+    return partial(hook, parse_timestamp=_TIMESTAMP_PARSERS[timestamp_format])
@@ -0,0 +1,242 @@
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from fivesim.api import UserAPI
+from fivesim.enums import OrderAction, Status
+from fivesim.errors import ErrorType, FiveSimError
+from fivesim.response import Order, SMS
+from fivesim.timestamps import _to_datetime
+from typing import AsyncIterator, Callable
+
+# The order can't receive other SMS in these states
+_FINAL_STATUSES = frozenset({
+    Status.CANCELED,
+    Status.TIMEOUT,
+    Status.FINISHED,
+    Status.BANNED
+})
+
+
+def _is_expired(order: Order) -> bool:
+    if order.expires_at == datetime.min:
+        return False
+    expires_at = _to_datetime(order.expires_at)
+    now = datetime.now(timezone.utc) if expires_at.tzinfo is not None else datetime.now()
+    return now >= expires_at
+
+
+class _WaitedOrder:
+    __slots__ = ("order", "callbacks", "future", "added_at", "received", "errors")
+
+    def __init__(self, order: Order) -> None:
+        self.order = order
+        self.callbacks: list[Callable[[Order, SMS], None]] = []
+        self.future: Future = Future()
+        self.added_at = time.monotonic()
+        self.received = 0
+        # Consecutive checks that failed
+        self.errors = 0
+
+
+class SmsWaiter:
+    """
+    Wait for the SMS of many orders using a single scheduler.
+    Every order is checked often right after the purchase and less often later,
+    until it receives an SMS, reaches a final status or expires.
+    An order whose checks keep failing stops being waited after max_errors consecutive errors.
+    The requests go through the client of the UserAPI, so its rate limiter applies.
+    """
+
+    def __init__(self, user: UserAPI, fast_interval: float = 2.0, slow_interval: float = 10.0, fast_period: float = 60.0, keep_polling: bool = False, max_workers: int = 4, max_errors: int = 10) -> None:
+        """
+        :param user: API used to check the orders
+        :param fast_interval: Seconds between two checks during the fast period
+        :param slow_interval: Seconds between two checks after the fast period
+        :param fast_period: Seconds after the order is added in which fast_interval is used
+        :param keep_polling: Continue to check an order after the first SMS, until it expires
+        :param max_workers: Maximum number of checks in progress at the same time
+        :param max_errors: Consecutive failed checks after which the future of an order is resolved with the last error
+        """
+        if max_errors < 1:
+            raise ValueError("At least one error must be allowed")
+        self.__user = user
+        self.__fast_interval = fast_interval
+        self.__slow_interval = slow_interval
+        self.__fast_period = fast_period
+        self.__keep_polling = keep_polling
+        self.__max_errors = max_errors
+        self.__orders: dict[int, _WaitedOrder] = dict()
+        self.__schedule: list[tuple[float, int, int]] = []
+        self.__sequence = itertools.count()
+        self.__streams: list[tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = []
+        self.__condition = threading.Condition()
+        self.__closed = False
+        self.__executor = ThreadPoolExecutor(max_workers=max_workers)
+        self.__thread = threading.Thread(target=self.__run, daemon=True)
+        self.__thread.start()
+
+    def add(self, order: Order, callback: Callable[[Order, SMS], None] = None) -> Future:
+        """
+        Start waiting for the SMS of an order.
+        An order that is already waited isn't checked twice: the callback is added to the ones of the order,
+        it's called for the SMS received from now on, and the Future of the first call is returned.
+
+        :param order: Order to check, from buy_number or using from_order_id method
+        :param callback: Function called in a worker thread for every new SMS
+        :return: Future resolved with the first SMS, or with FiveSimError(ORDER_NO_SMS) if the order ends without one
+        """
+        with self.__condition:
+            if self.__closed:
+                raise RuntimeError("The waiter is closed")
+            waited = self.__orders.get(order.id)
+            if waited is not None:
+                if callback is not None:
+                    waited.callbacks.append(callback)
+                return waited.future
+            waited = _WaitedOrder(order)
+            if callback is not None:
+                waited.callbacks.append(callback)
+            self.__orders[order.id] = waited
+            self.__push(waited, self.__fast_interval)
+        return waited.future
+
+    def remove(self, order: Order) -> None:
+        """
+        Stop waiting for the SMS of an order, its future is canceled.
+        """
+        with self.__condition:
+            waited = self.__orders.pop(order.id, None)
+        if waited is not None:
+            waited.future.cancel()
+
+    def pending(self) -> int:
+        """
+        Number of orders that are still waited.
+        """
+        with self.__condition:
+            return len(self.__orders)
+
+    async def stream(self) -> AsyncIterator[tuple[Order, SMS]]:
+        """
+        Iterate asynchronously over the new SMS of all the orders, until the waiter is closed.
+
+        :return: Async iterator of (order, SMS) pairs
+        """
+        stream = (asyncio.get_running_loop(), asyncio.Queue())
+        with self.__condition:
+            if self.__closed:
+                return
+            self.__streams.append(stream)
+        try:
+            while True:
+                item = await stream[1].get()
+                if item is None:
+                    return
+                yield item
+        finally:
+            with self.__condition:
+                if stream in self.__streams:
+                    self.__streams.remove(stream)
+
+    def close(self) -> None:
+        """
+        Stop the scheduler, the futures of the orders still waited are canceled.
+        """
+        with self.__condition:
+            if self.__closed:
+                return
+            self.__closed = True
+            orders = list(self.__orders.values())
+            self.__orders.clear()
+            streams = list(self.__streams)
+            self.__condition.notify_all()
+        self.__thread.join()
+        self.__executor.shutdown(wait=True)
+        for waited in orders:
+            waited.future.cancel()
+        for loop, queue in streams:
+            loop.call_soon_threadsafe(queue.put_nowait, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def __push(self, waited: _WaitedOrder, delay: float) -> None:
+        heapq.heappush(self.__schedule, (time.monotonic() + delay, next(self.__sequence), waited.order.id))
+        self.__condition.notify()
+
+    def __run(self) -> None:
+        with self.__condition:
+            while not self.__closed:
+                if len(self.__schedule) == 0:
+                    self.__condition.wait()
+                    continue
+                delay = self.__schedule[0][0] - time.monotonic()
+                if delay > 0:
+                    self.__condition.wait(delay)
+                    continue
+                _, _, order_id = heapq.heappop(self.__schedule)
+                waited = self.__orders.get(order_id)
+                if waited is not None:
+                    self.__executor.submit(self.__poll, waited)
+
+    def __poll(self, waited: _WaitedOrder) -> None:
+        try:
+            order = self.__user.order(OrderAction.CHECK, waited.order)
+        except FiveSimError as e:
+            waited.errors += 1
+            if e.get_error() in (ErrorType.ORDER_NOT_FOUND, ErrorType.ORDER_EXPIRED) or waited.errors >= self.__max_errors:
+                self.__finish(waited, e)
+            elif _is_expired(waited.order):
+                self.__finish(waited, None if waited.received > 0 else FiveSimError(ErrorType.ORDER_NO_SMS, "Order expired"))
+            else:
+                self.__reschedule(waited)
+            return
+        waited.order = order
+        waited.errors = 0
+        messages = order.sms if order.sms is not None else []
+        for sms in messages[waited.received:]:
+            self.__deliver(waited, sms)
+        waited.received = max(waited.received, len(messages))
+
+        if waited.received > 0 and not self.__keep_polling:
+            self.__finish(waited, None)
+        elif order.status in _FINAL_STATUSES:
+            self.__finish(waited, None if waited.received > 0 else FiveSimError(ErrorType.ORDER_NO_SMS, "Order " + order.status.get_description()))
+        elif _is_expired(order):
+            self.__finish(waited, None if waited.received > 0 else FiveSimError(ErrorType.ORDER_NO_SMS, "Order expired"))
+        else:
+            self.__reschedule(waited)
+
+    def __reschedule(self, waited: _WaitedOrder) -> None:
+        elapsed = time.monotonic() - waited.added_at
+        with self.__condition:
+            if self.__orders.get(waited.order.id) is waited:
+                self.__push(waited, self.__fast_interval if elapsed < self.__fast_period else self.__slow_interval)
+
+    def __finish(self, waited: _WaitedOrder, error: FiveSimError | None) -> None:
+        with self.__condition:
+            if self.__orders.get(waited.order.id) is waited:
+                del self.__orders[waited.order.id]
+        if error is not None and not waited.future.done():
+            waited.future.set_exception(error)
+
+    def __deliver(self, waited: _WaitedOrder, sms: SMS) -> None:
+        if not waited.future.done():
+            waited.future.set_result(sms)
+        with self.__condition:
+            callbacks = list(waited.callbacks)
+            streams = list(self.__streams)
+        for callback in callbacks:
+            try:
+                callback(waited.order, sms)
+            except:
+                pass
+        for loop, queue in streams:
+            loop.call_soon_threadsafe(queue.put_nowait, (waited.order, sms))
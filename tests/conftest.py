@@ -0,0 +1,15 @@
+import pytest
+from fivesim import FiveSim
+from fivesim.testing import StubServer
+
+
+@pytest.fixture
+def stub():
+    with StubServer(seed=0) as server:
+        yield server
+
+
+@pytest.fixture
+def client(stub):
+    with FiveSim("stub", base_url=stub.get_base_url()) as client:
+        yield client
@@ -0,0 +1,113 @@
+import asyncio
+import pytest
+import time
+from concurrent.futures import ThreadPoolExecutor
+from fivesim import ActivationProduct, AsyncFiveSim, Country, ErrorType, FiveSimError, Operator, OrderAction, PriceEntry, Status
+
+_ENGLAND = PriceEntry(country=Country.ENGLAND, product=ActivationProduct.TELEGRAM, operator=Operator.ANY_OPERATOR, price=12.5, quantity=100)
+
+
+def test_buy_many_reserves_the_known_prices(client, stub):
+    result = client.user.buy_many(ActivationProduct.TELEGRAM, 10, candidates=[_ENGLAND], max_spend=40, max_workers=4)
+    assert len(result.orders) == 3
+    assert result.spent == 37.5
+    assert stub.get_request_count()["user/buy"] == 3
+
+
+def test_buy_many_stops_after_max_failures(client, stub):
+    stub.fail_next(ErrorType.SERVER_ERROR, 10)
+    result = client.user.buy_many(ActivationProduct.TELEGRAM, 5, max_workers=1, max_failures=2)
+    assert result.orders == []
+    assert result.attempts == 3
+    assert result.failures == {ErrorType.SERVER_ERROR: 3}
+
+
+def test_buy_many_moves_to_the_next_candidate(client, stub):
+    stub.fail_next(ErrorType.NO_FREE_PHONES)
+    result = client.user.buy_many(ActivationProduct.TELEGRAM, 2, candidates=[(Country.USA, Operator.ANY_OPERATOR), _ENGLAND], max_workers=1)
+    assert [order.country for order in result.orders] == [Country.ENGLAND, Country.ENGLAND]
+    assert result.failures == {ErrorType.NO_FREE_PHONES: 1}
+
+
+def test_buy_many_raises_other_exceptions_without_hanging(client, monkeypatch):
+    buy_number = client.user.buy_number
+    calls = []
+
+    def fail_first(*args, **kwargs):
+        calls.append(args)
+        if len(calls) == 1:
+            raise KeyError("hook")
+        return buy_number(*args, **kwargs)
+
+    monkeypatch.setattr(client.user, "buy_number", fail_first)
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(client.user.buy_many, ActivationProduct.TELEGRAM, 3, max_workers=2)
+        with pytest.raises(KeyError):
+            future.result(timeout=10)
+
+
+def test_async_buy_many_raises_other_exceptions_without_hanging(stub):
+    async def main():
+        async with AsyncFiveSim("stub", base_url=stub.get_base_url()) as client:
+            async def fail(*args, **kwargs):
+                raise KeyError("hook")
+
+            client.user.buy_number = fail
+            await asyncio.wait_for(client.user.buy_many(ActivationProduct.TELEGRAM, 3, max_workers=2), timeout=10)
+
+    with pytest.raises(KeyError):
+        asyncio.run(main())
+
+
+def test_order_many_reschedules_cancel_that_needs_time(client, stub):
+    orders = client.user.buy_many(ActivationProduct.TELEGRAM, 3).orders
+    stub.fail_next(ErrorType.CANCEL_NEEDS_TIME)
+    results = client.user.order_many(OrderAction.CANCEL, orders, max_workers=1, reschedule_interval=0.05)
+    assert [result.status for result in results] == [Status.CANCELED] * 3
+    assert [result.id for result in results] == [order.id for order in orders]
+    assert stub.get_request_count()["user/cancel"] == 4
+
+
+def test_order_many_stops_rescheduling_after_timeout(client, stub):
+    orders = client.user.buy_many(ActivationProduct.TELEGRAM, 1).orders
+    stub.fail_next(ErrorType.CANCEL_NEEDS_TIME, 100)
+    start = time.monotonic()
+    results = client.user.order_many(OrderAction.CANCEL, orders, reschedule_interval=0.05, reschedule_timeout=0.2)
+    assert time.monotonic() - start < 2
+    assert isinstance(results[0], FiveSimError)
+    assert results[0].get_error() == ErrorType.CANCEL_NEEDS_TIME
+    assert 2 <= stub.get_request_count()["user/cancel"] <= 5
+
+
+def test_order_many_returns_other_exceptions_in_place(client, monkeypatch):
+    orders = client.user.buy_many(ActivationProduct.TELEGRAM, 3).orders
+    order = client.user.order
+
+    def fail_second(action, target):
+        if target.id == orders[1].id:
+            raise KeyError("hook")
+        return order(action, target)
+
+    monkeypatch.setattr(client.user, "order", fail_second)
+    results = client.user.order_many(OrderAction.FINISH, orders)
+    assert results[0].status == results[2].status == Status.FINISHED
+    assert isinstance(results[1], KeyError)
+
+
+def test_async_order_many_returns_other_exceptions_in_place(stub):
+    async def main():
+        async with AsyncFiveSim("stub", base_url=stub.get_base_url()) as client:
+            orders = (await client.user.buy_many(ActivationProduct.TELEGRAM, 2)).orders
+            order = client.user.order
+
+            async def fail_first(action, target):
+                if target.id == orders[0].id:
+                    raise KeyError("hook")
+                return await order(action, target)
+
+            client.user.order = fail_first
+            return await client.user.order_many(OrderAction.FINISH, orders)
+
+    results = asyncio.run(main())
+    assert isinstance(results[0], KeyError)
+    assert results[1].status == Status.FINISHED
@@ -0,0 +1,66 @@
+import time
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from fivesim import Country, FiveSim, ResponseCache
+from fivesim.testing import StubServer
+
+
+def _client(stub, cache: ResponseCache) -> FiveSim:
+    return FiveSim("stub", base_url=stub.get_base_url(), cache=cache)
+
+
+def _wait_for_requests(stub, endpoint: str, count: int) -> None:
+    deadline = time.monotonic() + 5
+    while stub.get_request_count().get(endpoint, 0) < count and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def test_fresh_entry_is_served_from_the_cache(stub):
+    with _client(stub, ResponseCache()) as client:
+        first = client.guest.get_prices()
+        assert client.guest.get_prices() is first
+    assert stub.get_request_count()["guest/prices"] == 1
+
+
+def test_least_recently_used_entry_is_evicted(stub):
+    with _client(stub, ResponseCache(max_size=2)) as client:
+        client.guest.get_countries()
+        client.guest.get_prices()
+        # Used again, so the prices become the least recently used entry
+        client.guest.get_countries()
+        client.guest.get_prices(Country.ENGLAND)
+        client.guest.get_countries()
+        assert stub.get_request_count()["guest/countries"] == 1
+        client.guest.get_prices()
+    assert stub.get_request_count()["guest/prices"] == 3
+
+
+def test_expired_entry_is_loaded_again(stub):
+    with _client(stub, ResponseCache(ttl={"prices": 0.05}, stale_ttl=0)) as client:
+        first = client.guest.get_prices()
+        time.sleep(0.1)
+        assert client.guest.get_prices() is not first
+    assert stub.get_request_count()["guest/prices"] == 2
+
+
+def test_invalid_size_is_rejected():
+    with pytest.raises(ValueError):
+        ResponseCache(max_size=0)
+
+
+def test_stale_entry_is_served_while_refreshed_once():
+    with StubServer(latency=0.3, seed=0) as stub:
+        with _client(stub, ResponseCache(ttl={"prices": 0.05}, stale_ttl=10)) as client:
+            first = client.guest.get_prices()
+            time.sleep(0.1)
+            start = time.monotonic()
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(lambda _: client.guest.get_prices(), range(8)))
+            # Served without waiting for the refresh
+            assert time.monotonic() - start < 0.3
+            assert all(result is first for result in results)
+            _wait_for_requests(stub, "guest/prices", 2)
+            # Longer than the latency, the refresh has been stored
+            time.sleep(0.5)
+            assert stub.get_request_count()["guest/prices"] == 2
+            assert client.guest.get_prices() is not first
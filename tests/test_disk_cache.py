@@ -0,0 +1,30 @@
+from fivesim import DiskCache, FiveSim, RequestHooks
+
+
+class _RecordStatus(RequestHooks):
+    def __init__(self) -> None:
+        self.status_codes: list[int] = []
+
+    def after_response(self, request, status_code: int, size: int, elapsed: float) -> None:
+        self.status_codes.append(status_code)
+
+
+def test_cache_survives_reopening(stub, tmp_path):
+    path = str(tmp_path / "catalogue.db")
+    with DiskCache(path) as cache, FiveSim("stub", base_url=stub.get_base_url(), disk_cache=cache) as client:
+        countries = client.guest.get_countries()
+    with DiskCache(path) as cache, FiveSim("stub", base_url=stub.get_base_url(), disk_cache=cache) as client:
+        assert client.guest.get_countries() == countries
+    assert stub.get_request_count()["guest/countries"] == 1
+
+
+def test_not_modified_response_reuses_the_stored_body(stub, tmp_path):
+    hooks = _RecordStatus()
+    # Always too old, every call revalidates the stored copy before returning
+    with DiskCache(str(tmp_path / "catalogue.db"), max_age={"countries": 0}, max_stale=0) as cache:
+        with FiveSim("stub", base_url=stub.get_base_url(), disk_cache=cache, hooks=[hooks]) as client:
+            countries = client.guest.get_countries()
+            assert client.guest.get_countries() == countries
+    # The stub answers 304 only when If-None-Match has the ETag of the first response
+    assert hooks.status_codes == [200, 304]
+    assert stub.get_request_count()["guest/countries"] == 2
@@ -0,0 +1,26 @@
+import pytest
+from fivesim import ErrorType, FiveSim, FiveSimError, JSONBackend, RequestHooks
+
+
+class _InvalidJSON(JSONBackend):
+    def loads(self, data, object_hook=None):
+        raise ValueError("invalid body")
+
+
+class _RecordErrors(RequestHooks):
+    def __init__(self) -> None:
+        self.causes: list[BaseException | None] = []
+
+    def on_error(self, request, error: FiveSimError, elapsed: float) -> None:
+        self.causes.append(error.__cause__)
+
+
+def test_parse_error_is_reported_with_its_cause(stub):
+    hooks = _RecordErrors()
+    with FiveSim("stub", base_url=stub.get_base_url(), json_backend=_InvalidJSON(), hooks=[hooks]) as client:
+        with pytest.raises(FiveSimError) as raised:
+            client.guest.get_countries()
+    assert raised.value.get_error() == ErrorType.INVALID_RESULT
+    # Already chained when the hook is called
+    assert hooks.causes == [raised.value.__cause__]
+    assert isinstance(raised.value.__cause__, ValueError)
@@ -0,0 +1,39 @@
+import subprocess
+import sys
+
+# Imported only when a client, a matrix or an async method needs them
+_HEAVY_MODULES = ("requests", "numpy", "aiohttp", "dateutil", "asyncio", "orjson", "ujson")
+
+
+def _run(code: str, *options: str) -> subprocess.CompletedProcess:
+    # A new interpreter, the modules imported by pytest would hide the regressions
+    return subprocess.run([sys.executable, *options, "-c", code], capture_output=True, text=True, check=True)
+
+
+def test_import_loads_no_heavy_module():
+    result = _run(
+        "import sys, fivesim\n"
+        "print(','.join(sorted(name for name in sys.modules if name.split('.')[0] in {} or name.startswith('fivesim.'))))".format(set(_HEAVY_MODULES))
+    )
+    assert result.stdout.strip() == ""
+
+
+def test_client_class_does_not_load_requests():
+    result = _run("import sys, fivesim\nfivesim.FiveSim\nprint('requests' in sys.modules, 'dateutil' in sys.modules)")
+    assert result.stdout.split() == ["False", "False"]
+
+
+def test_import_time():
+    result = _run("import fivesim", "-X", "importtime")
+    # Lines like "import time: self [us] | cumulative | package"
+    cumulative = [int(line.split("|")[1]) for line in result.stderr.splitlines() if line.split("|")[-1].strip() == "fivesim"]
+    assert len(cumulative) == 1
+    assert cumulative[0] < 50_000
+
+
+def test_submodules_are_attributes():
+    result = _run(
+        "import sys, fivesim\n"
+        "print('fivesim.errors' in sys.modules, fivesim.errors.ErrorType is fivesim.ErrorType, fivesim.enums.Country.ENGLAND.value, hasattr(fivesim, 'missing'))"
+    )
+    assert result.stdout.split() == ["False", "True", "england", "False"]
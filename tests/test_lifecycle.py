@@ -0,0 +1,54 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from fivesim import ActivationProduct, Country, Operator, OrderManager, SmsWaiter, Status
+
+
+def _buy(client):
+    return client.user.buy_number(Country.ENGLAND, Operator.ANY_OPERATOR, ActivationProduct.TELEGRAM)
+
+
+def test_order_with_sms_is_finished(client, stub):
+    received = []
+    with OrderManager(client.user, waiter=SmsWaiter(client.user, fast_interval=0.01)) as manager:
+        order = manager.add(_buy(client), lambda order, sms: received.append(sms)).result(timeout=5)
+        assert manager.pending() == 0
+    assert order.status == Status.FINISHED
+    assert len(received) == 1
+    assert stub.get_request_count()["user/finish"] == 1
+
+
+def test_order_without_auto_finish_is_left_open(client, stub):
+    with OrderManager(client.user, auto_finish=False, waiter=SmsWaiter(client.user, fast_interval=0.01)) as manager:
+        order = manager.add(_buy(client)).result(timeout=5)
+    assert len(order.sms) == 1
+    assert "user/finish" not in stub.get_request_count()
+
+
+def test_duplicate_add_returns_same_future(client, stub):
+    first_calls, second_calls = [], []
+    order = _buy(client)
+    with OrderManager(client.user, waiter=SmsWaiter(client.user, fast_interval=0.2)) as manager:
+        first = manager.add(order, lambda order, sms: first_calls.append(sms))
+        second = manager.add(order, lambda order, sms: second_calls.append(sms))
+        assert second is first
+        assert manager.pending() == 1
+        assert first.result(timeout=5).status == Status.FINISHED
+    assert len(first_calls) == len(second_calls) == 1
+    assert stub.get_request_count()["user/finish"] == 1
+
+
+def test_order_without_sms_is_canceled_before_expiry(client, stub):
+    order = _buy(client)._replace(expires_at=datetime.now(timezone.utc) + timedelta(seconds=1))
+    waiter = SmsWaiter(client.user, fast_interval=60)
+    with OrderManager(client.user, cancel_margin=0.5, waiter=waiter) as manager:
+        canceled = manager.add(order).result(timeout=5)
+    waiter.close()
+    assert canceled.status == Status.CANCELED
+    assert "user/check" not in stub.get_request_count()
+
+
+def test_closed_manager_rejects_orders(client):
+    manager = OrderManager(client.user)
+    manager.close()
+    with pytest.raises(RuntimeError):
+        manager.add(_buy(client))
@@ -0,0 +1,30 @@
+from fivesim import Category
+from fivesim.api import _history_parameters
+
+
+def test_iter_orders_until_naive_date_is_utc(client):
+    orders = list(client.user.iter_orders(Category.ACTIVATION, results_per_page=5, reverse_order=True))
+    until_date = orders[7].created_at
+    assert until_date.tzinfo is not None
+
+    aware = list(client.user.iter_orders(Category.ACTIVATION, results_per_page=5, reverse_order=True, until_date=until_date))
+    naive = list(client.user.iter_orders(Category.ACTIVATION, results_per_page=5, reverse_order=True, until_date=until_date.replace(tzinfo=None)))
+    assert [order.id for order in naive] == [order.id for order in aware] == [order.id for order in orders[:8]]
+
+
+def test_iter_payments_until_naive_date_is_utc(client):
+    payments = list(client.user.iter_payments(results_per_page=5, reverse_order=True))
+    until_date = payments[3].created_at.replace(tzinfo=None)
+    assert [payment.id for payment in client.user.iter_payments(results_per_page=5, reverse_order=True, until_date=until_date)] == [payment.id for payment in payments[:4]]
+
+
+def test_page_number_is_sent_as_row_offset():
+    assert _history_parameters(results_per_page=5, page_number=2) == {"limit": "5", "offset": "10"}
+    assert _history_parameters(page_number=2) == {"limit": "15", "offset": "30"}
+    assert _history_parameters(results_per_page=5) == {"limit": "5"}
+
+
+def test_pages_do_not_overlap(client):
+    orders = client.user.iter_orders(Category.ACTIVATION, results_per_page=3)
+    exported = client.user.export_orders(Category.ACTIVATION, results_per_page=3)
+    assert [order.id for order in orders] == [order.id for order in exported] == list(range(1, 21))
@@ -0,0 +1,101 @@
+import json
+import pickle
+import pytest
+from fivesim import (
+    ActivationProduct,
+    Category,
+    Country,
+    FiveSim,
+    HistorySync,
+    HostingProduct,
+    HostingProductSymbol,
+    Operator,
+    ProductSymbol,
+    RequestHooks,
+    get_symbols,
+    refresh_registry
+)
+from fivesim.enums import _ACTIVATION_PRODUCTS, _COUNTRIES, _HOSTING_PRODUCTS, _intern_product
+from fivesim.testing import StubServer
+from fivesim.testing.stub_server import _default_fixtures
+
+
+class _RecordURLs(RequestHooks):
+    def __init__(self) -> None:
+        self.urls: list[str] = []
+
+    def before_request(self, request) -> None:
+        self.urls.append(request.url)
+
+
+def _write_fixture(directory, name, value) -> None:
+    api, file_name = name.split("/")
+    (directory / api).mkdir(exist_ok=True)
+    (directory / api / (file_name + ".json")).write_text(json.dumps(value))
+
+
+def test_lookup_tables_are_not_changed_by_intern():
+    symbol = _COUNTRIES.intern("registry-test-country")
+    assert symbol == "registry-test-country"
+    assert _COUNTRIES.intern("registry-test-country") is symbol
+    assert _COUNTRIES.get("registry-test-country") is None
+    assert "registry-test-country" not in _COUNTRIES
+    with pytest.raises(KeyError):
+        _COUNTRIES["registry-test-country"]
+    assert _COUNTRIES.find("registry-test-country") is symbol
+    assert symbol in get_symbols()
+    assert pickle.loads(pickle.dumps(symbol)) is symbol
+
+
+def test_intern_product_by_category():
+    assert _intern_product("telegram") is ActivationProduct.TELEGRAM
+    assert _intern_product("1day") is HostingProduct.ONE_DAY
+    assert _intern_product("1day", Category.HOSTING) is HostingProduct.ONE_DAY
+    hosting = _intern_product("registry-test-hosting", Category.HOSTING)
+    assert isinstance(hosting, HostingProductSymbol)
+    # Without the category, a hosting product already seen keeps its type
+    assert _intern_product("registry-test-hosting") is hosting
+    assert isinstance(_intern_product("registry-test-activation"), ProductSymbol)
+    assert _HOSTING_PRODUCTS.get("registry-test-hosting") is None
+    assert _ACTIVATION_PRODUCTS.get("registry-test-activation") is None
+
+
+def test_unknown_hosting_product_is_bought_as_hosting(tmp_path):
+    products = _default_fixtures()["guest/products"]
+    products["registry-test-2weeks"] = {"Category": "hosting", "Qty": 10, "Price": 100}
+    _write_fixture(tmp_path, "guest/products", products)
+    hooks = _RecordURLs()
+    with StubServer(fixtures=str(tmp_path)) as stub:
+        with FiveSim("stub", base_url=stub.get_base_url(), hooks=[hooks]) as client:
+            found = client.guest.get_products(Country.ANY_COUNTRY, Operator.ANY_OPERATOR)
+            product = next(key for key in found if key == "registry-test-2weeks")
+            assert isinstance(product, HostingProductSymbol)
+            order = client.user.buy_number(Country.ENGLAND, Operator.ANY_OPERATOR, product)
+    assert hooks.urls[-1].endswith("user/buy/hosting/england/any/registry-test-2weeks")
+    assert order.product is product
+
+
+def test_sync_keeps_hosting_category(tmp_path):
+    orders = _default_fixtures()["user/orders"]
+    for row in orders["Data"]:
+        row["product"] = "registry-test-3weeks"
+    _write_fixture(tmp_path, "user/orders", orders)
+    with StubServer(fixtures=str(tmp_path)) as stub:
+        with FiveSim("stub", base_url=stub.get_base_url()) as client:
+            with HistorySync(client.user, str(tmp_path / "history.db")) as sync:
+                sync.sync_orders(Category.HOSTING)
+                stored = sync.get_orders(Category.HOSTING)
+    assert len(stored) == 20
+    assert all(isinstance(order.product, HostingProductSymbol) for order in stored)
+
+
+def test_refresh_registry_registers_hosting_products(tmp_path):
+    products = _default_fixtures()["guest/products"]
+    products["registry-test-4weeks"] = {"Category": "hosting", "Qty": 10, "Price": 100}
+    _write_fixture(tmp_path, "guest/products", products)
+    with StubServer(fixtures=str(tmp_path)) as stub:
+        with FiveSim("stub", base_url=stub.get_base_url()) as client:
+            registered = refresh_registry(client.guest)
+    product = next(symbol for symbol in registered if symbol == "registry-test-4weeks")
+    assert isinstance(product, HostingProductSymbol)
+    assert _HOSTING_PRODUCTS.find("registry-test-4weeks") is product
@@ -0,0 +1,62 @@
+import time
+import pytest
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from fivesim import ActivationProduct, Country, ErrorType, FiveSim, FiveSimError, Operator, RetryPolicy
+from fivesim.retry import _parse_retry_after
+from fivesim.testing import StubServer
+
+
+def test_retry_waits_for_retry_after():
+    with StubServer(retry_after=0.2) as stub:
+        stub.fail_next(ErrorType.API_KEY_LIMIT, 2)
+        with FiveSim("stub", base_url=stub.get_base_url(), retry_policy=RetryPolicy(base_delay=0.01)) as client:
+            start = time.monotonic()
+            client.user.get_profile_data()
+            assert time.monotonic() - start >= 0.4
+        assert stub.get_request_count()["user/profile"] == 3
+
+
+def test_retry_after_longer_than_max_delay_gives_up():
+    with StubServer(retry_after=30) as stub:
+        stub.fail_next(ErrorType.LIMIT_ERROR)
+        with FiveSim("stub", base_url=stub.get_base_url(), retry_policy=RetryPolicy(max_delay=1)) as client:
+            with pytest.raises(FiveSimError) as error:
+                client.user.get_profile_data()
+        assert error.value.get_error() == ErrorType.LIMIT_ERROR
+        assert error.value.get_retry_after() == 30
+        assert stub.get_request_count()["user/profile"] == 1
+
+
+def test_retry_stops_after_max_attempts():
+    with StubServer() as stub:
+        stub.fail_next(ErrorType.SERVER_ERROR, 10)
+        with FiveSim("stub", base_url=stub.get_base_url(), retry_policy=RetryPolicy(max_attempts=3, base_delay=0.01)) as client:
+            with pytest.raises(FiveSimError) as error:
+                client.guest.get_countries()
+        assert error.value.get_error() == ErrorType.SERVER_ERROR
+        assert stub.get_request_count()["guest/countries"] == 3
+
+
+def test_purchases_are_not_retried():
+    with StubServer(retry_after=0) as stub:
+        stub.fail_next(ErrorType.LIMIT_ERROR)
+        with FiveSim("stub", base_url=stub.get_base_url(), retry_policy=RetryPolicy(base_delay=0.01)) as client:
+            with pytest.raises(FiveSimError):
+                client.user.buy_number(Country.ENGLAND, Operator.ANY_OPERATOR, ActivationProduct.TELEGRAM)
+        assert stub.get_request_count()["user/buy"] == 1
+
+
+def test_retry_budget_limits_the_retries():
+    policy = RetryPolicy(base_delay=0, budget_ratio=0, budget_reserve=1)
+    error = FiveSimError(ErrorType.SERVER_ERROR)
+    assert policy.get_retry_delay(error, 1) is not None
+    assert policy.get_retry_delay(error, 1) is None
+
+
+def test_parse_retry_after():
+    assert _parse_retry_after("2.5") == 2.5
+    assert _parse_retry_after(None) is None
+    assert _parse_retry_after("soon") is None
+    seconds = _parse_retry_after(format_datetime(datetime.now(timezone.utc) + timedelta(seconds=60), usegmt=True))
+    assert 55 < seconds <= 60
@@ -0,0 +1,52 @@
+import pytest
+from fivesim import ActivationProduct, CheapestNumberRouter, ErrorType, FiveSimError, OrderAction, RoutingResult
+
+
+def test_routing_result_default_is_immutable_tuple():
+    result = RoutingResult(order=None, attempts=[])
+    assert result.extra_orders == ()
+    assert isinstance(result.extra_orders, tuple)
+
+
+def test_buy_cheapest_buys_one_order_by_default(client, stub):
+    result = CheapestNumberRouter(client).buy_cheapest(ActivationProduct.TELEGRAM)
+    assert result.order is not None
+    assert result.extra_orders == ()
+    assert stub.get_request_count()["user/buy"] == 1
+    assert "user/cancel" not in stub.get_request_count()
+
+
+def test_parallel_retries_cancel_that_needs_time(client, stub, monkeypatch):
+    order = client.user.order
+    failures = []
+
+    def cancel_later(action, order_to_cancel):
+        if action == OrderAction.CANCEL and len(failures) == 0:
+            failures.append(order_to_cancel)
+            raise FiveSimError(ErrorType.CANCEL_NEEDS_TIME)
+        return order(action, order_to_cancel)
+
+    monkeypatch.setattr(client.user, "order", cancel_later)
+    router = CheapestNumberRouter(client, parallel=2, reschedule_interval=0.05)
+    result = router.buy_cheapest(ActivationProduct.TELEGRAM)
+    assert result.order is not None
+    assert result.extra_orders == ()
+    assert len(failures) == 1
+    assert stub.get_request_count()["user/cancel"] == 1
+
+
+def test_parallel_returns_orders_not_canceled_in_time(client, monkeypatch):
+    def never_cancel(action, order):
+        raise FiveSimError(ErrorType.CANCEL_NEEDS_TIME)
+
+    monkeypatch.setattr(client.user, "order", never_cancel)
+    router = CheapestNumberRouter(client, parallel=2, reschedule_interval=0.05, reschedule_timeout=0.1)
+    result = router.buy_cheapest(ActivationProduct.TELEGRAM)
+    assert result.order is not None
+    assert len(result.extra_orders) == 1
+    assert result.extra_orders[0].id != result.order.id
+
+
+def test_router_arguments_are_checked(client):
+    with pytest.raises(ValueError):
+        CheapestNumberRouter(client, reschedule_interval=0)
@@ -0,0 +1,78 @@
+import asyncio
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from fivesim import AsyncFiveSim, Country, ErrorType, FiveSim, FiveSimError, Operator
+from fivesim.testing import StubServer
+
+
+@pytest.fixture
+def slow_stub():
+    # Slow enough that the concurrent calls overlap
+    with StubServer(latency=0.3, seed=0) as server:
+        yield server
+
+
+def _concurrent(call, count: int = 8) -> list:
+    with ThreadPoolExecutor(max_workers=count) as executor:
+        futures = [executor.submit(call) for _ in range(count)]
+        return [future.exception() or future.result() for future in futures]
+
+
+def test_identical_calls_share_one_request(slow_stub):
+    with FiveSim("stub", base_url=slow_stub.get_base_url()) as client:
+        results = _concurrent(client.guest.get_prices)
+    assert slow_stub.get_request_count()["guest/prices"] == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_different_calls_are_not_shared(slow_stub):
+    with FiveSim("stub", base_url=slow_stub.get_base_url()) as client:
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            everything = executor.submit(client.guest.get_prices)
+            england = executor.submit(client.guest.get_prices, Country.ENGLAND)
+            assert everything.result() is not england.result()
+    assert slow_stub.get_request_count()["guest/prices"] == 2
+
+
+def test_price_matrix_shares_only_the_download(slow_stub):
+    pytest.importorskip("numpy")
+    with FiveSim("stub", base_url=slow_stub.get_base_url()) as client:
+        matrices = _concurrent(client.guest.get_price_matrix, 4)
+    assert slow_stub.get_request_count()["guest/prices"] == 1
+    assert len({id(matrix) for matrix in matrices}) == 4
+
+
+def test_error_is_shared_and_not_kept(slow_stub):
+    slow_stub.fail_next(ErrorType.INCORRECT_COUNTRY)
+    with FiveSim("stub", base_url=slow_stub.get_base_url()) as client:
+        results = _concurrent(client.guest.get_countries)
+        assert all(isinstance(result, FiveSimError) and result.get_error() == ErrorType.INCORRECT_COUNTRY for result in results)
+        assert slow_stub.get_request_count()["guest/countries"] == 1
+        # The failed call isn't reused by the next one
+        client.guest.get_countries()
+    assert slow_stub.get_request_count()["guest/countries"] == 2
+
+
+def test_async_identical_calls_share_one_request(slow_stub):
+    async def main():
+        async with AsyncFiveSim("stub", base_url=slow_stub.get_base_url()) as client:
+            return await asyncio.gather(*(client.guest.get_products(Country.ANY_COUNTRY, Operator.ANY_OPERATOR) for _ in range(8)))
+
+    results = asyncio.run(main())
+    assert slow_stub.get_request_count()["guest/products"] == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_async_cancelled_caller_does_not_cancel_the_others(slow_stub):
+    async def main():
+        async with AsyncFiveSim("stub", base_url=slow_stub.get_base_url()) as client:
+            first = asyncio.ensure_future(client.guest.get_countries())
+            second = asyncio.ensure_future(client.guest.get_countries())
+            await asyncio.sleep(0.05)
+            first.cancel()
+            return first, await second
+
+    first, countries = asyncio.run(main())
+    assert first.cancelled()
+    assert len(countries) > 0
+    assert slow_stub.get_request_count()["guest/countries"] == 1
@@ -0,0 +1,68 @@
+import json
+from datetime import timedelta, timezone
+from fivesim import Category, FiveSim, HistorySync, Status
+from fivesim.testing import StubServer
+from fivesim.testing.stub_server import _default_fixtures
+
+
+def test_sync_orders_stops_at_checkpoint(client, stub, tmp_path):
+    with HistorySync(client.user, str(tmp_path / "history.db"), results_per_page=5) as sync:
+        assert sync.get_checkpoint("orders:activation") is None
+        assert sync.sync_orders(Category.ACTIVATION) == 20
+        assert stub.get_request_count()["user/orders"] == 4
+        checkpoint = sync.get_checkpoint("orders:activation")
+        assert checkpoint.last_id == "20"
+        assert checkpoint.last_created_at.tzinfo is not None
+
+        # All the orders are closed, only the newest one is downloaded again
+        assert sync.sync_orders(Category.ACTIVATION) == 1
+        assert stub.get_request_count()["user/orders"] == 5
+        assert [order.id for order in sync.get_orders(Category.ACTIVATION)] == list(range(20, 0, -1))
+
+
+def test_sync_orders_restarts_from_oldest_open_order(tmp_path):
+    orders = _default_fixtures()["user/orders"]
+    for row in orders["Data"]:
+        if row["id"] in (12, 15):
+            row["status"] = Status.RECEIVED.name
+    (tmp_path / "user").mkdir()
+    (tmp_path / "user" / "orders.json").write_text(json.dumps(orders))
+
+    with StubServer(fixtures=str(tmp_path)) as stub:
+        with FiveSim("stub", base_url=stub.get_base_url()) as client:
+            with HistorySync(client.user, str(tmp_path / "history.db"), results_per_page=5) as sync:
+                assert sync.sync_orders(Category.ACTIVATION) == 20
+                assert sync.get_checkpoint("orders:activation").last_id == "12"
+                assert sync.sync_orders(Category.ACTIVATION) == 9
+                assert len(sync.get_orders(status=Status.RECEIVED)) == 2
+
+
+def test_sync_payments_stops_at_checkpoint(client, stub, tmp_path):
+    with HistorySync(client.user, str(tmp_path / "history.db"), results_per_page=5) as sync:
+        assert sync.sync_payments() == 20
+        assert sync.get_checkpoint("payments").last_id == "20"
+        assert sync.sync_payments() == 0
+        assert stub.get_request_count()["user/payments"] == 5
+        assert len(sync.get_payments()) == 20
+
+
+def test_checkpoint_survives_reopening(client, tmp_path):
+    path = str(tmp_path / "history.db")
+    with HistorySync(client.user, path) as sync:
+        sync.sync_orders(Category.ACTIVATION)
+    with HistorySync(client.user, path) as sync:
+        assert sync.get_checkpoint("orders:activation").last_id == "20"
+        assert sync.sync_orders(Category.ACTIVATION) == 1
+
+
+def test_since_is_compared_in_utc(client, tmp_path):
+    with HistorySync(client.user, str(tmp_path / "history.db")) as sync:
+        sync.sync_orders(Category.ACTIVATION)
+        sync.sync_payments()
+        order = next(order for order in sync.get_orders() if order.id == 10)
+        payment = next(payment for payment in sync.get_payments() if payment.id == "10")
+        # Naive dates are UTC, the others are converted to UTC
+        for since in (order.created_at.replace(tzinfo=None), order.created_at.astimezone(timezone(timedelta(hours=2)))):
+            assert [order.id for order in sync.get_orders(since=since)] == list(range(20, 9, -1))
+        for since in (payment.created_at.replace(tzinfo=None), payment.created_at.astimezone(timezone(timedelta(hours=-5)))):
+            assert [int(payment.id) for payment in sync.get_payments(since=since)] == list(range(20, 9, -1))
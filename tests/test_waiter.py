@@ -0,0 +1,47 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from fivesim import ActivationProduct, Country, ErrorType, FiveSimError, Operator, SmsWaiter
+
+
+def _buy(client):
+    return client.user.buy_number(Country.ENGLAND, Operator.ANY_OPERATOR, ActivationProduct.TELEGRAM)
+
+
+def test_waiter_resolves_with_first_sms(client):
+    with SmsWaiter(client.user, fast_interval=0.01) as waiter:
+        sms = waiter.add(_buy(client)).result(timeout=5)
+    assert sms.activation_code != ""
+
+
+def test_duplicate_add_returns_same_future(client, stub):
+    first_calls, second_calls = [], []
+    order = _buy(client)
+    with SmsWaiter(client.user, fast_interval=0.5) as waiter:
+        first = waiter.add(order, lambda order, sms: first_calls.append(sms))
+        assert waiter.add(order, lambda order, sms: second_calls.append(sms)) is first
+        assert waiter.pending() == 1
+        first.result(timeout=5)
+    # Closing waits for the callbacks
+    assert len(first_calls) == len(second_calls) == 1
+    assert stub.get_request_count()["user/check"] == 1
+
+
+def test_errors_stop_after_max_errors(client, stub):
+    order = _buy(client)
+    stub.fail_next(ErrorType.HOSTING_ORDER, 3)
+    with SmsWaiter(client.user, fast_interval=0.01, max_errors=3) as waiter:
+        with pytest.raises(FiveSimError) as error:
+            waiter.add(order).result(timeout=5)
+        assert waiter.pending() == 0
+    assert error.value.get_error() == ErrorType.HOSTING_ORDER
+    assert stub.get_request_count()["user/check"] == 3
+
+
+def test_expired_order_stops_on_error(client, stub):
+    order = _buy(client)._replace(expires_at=datetime.now(timezone.utc) - timedelta(minutes=1))
+    stub.fail_next(ErrorType.HOSTING_ORDER, 10)
+    with SmsWaiter(client.user, fast_interval=0.01) as waiter:
+        with pytest.raises(FiveSimError) as error:
+            waiter.add(order).result(timeout=5)
+    assert error.value.get_error() == ErrorType.ORDER_NO_SMS
+    assert stub.get_request_count()["user/check"] == 1